@@ -7,12 +7,14 @@ class BaseRequest(BaseModel):
     model_provider: str = "shared"
     model_name: str = "qwen-instruct"
     method_name: str = "genmentor"
+    learner_id: Optional[str] = None  # fair-share key; the X-Learner-Id header takes precedence
 
 
 class ChatWithAutorRequest(BaseRequest):
 
     messages: str
     learner_profile: str = ""
+    conversation_id: Optional[str] = None
 
 
 class LearningGoalRefinementRequest(BaseRequest):
@@ -174,3 +176,4 @@ class LearningDocumentIntegrationRequest(BaseModel):
 class SocraticTutorRequest(BaseRequest):
     learning_topic: str
     messages: str
+    conversation_id: Optional[str] = None
@@ -0,0 +1,101 @@
+"""
+Admission control for inference endpoints.
+
+Under load, requests used to pile up behind the model until clients timed
+out and retried, wasting GPU time on answers nobody was waiting for. Before
+an inference request is accepted, the controller estimates how long it would
+wait for the model: queued requests served before it (by priority class),
+each costing its agent's recent service time, plus the batch in progress
+(see `InferenceScheduler.estimate_wait`). If that exceeds the SLO of the
+request's class, main.py rejects it with 429 and a `Retry-After` of roughly
+the excess. Configured under `inference.admission`.
+"""
+
+import logging
+import math
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from utils.config import get_config_section
+from .inference_priority import PRIORITY_CLASSES, PRIORITY_RANK
+from .model_registry import get_model_registry
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """Rejects new work whose estimated queue wait exceeds its class SLO."""
+
+    def __init__(self, slo_seconds: Dict[str, float], default_service_seconds: float = 2.0, min_retry_after: int = 1):
+        unknown = set(slo_seconds) - set(PRIORITY_RANK)
+        if unknown:
+            raise ValueError(f"Unknown inference priorities in admission SLOs: {sorted(unknown)}")
+        self.slo_seconds = {name: float(value) for name, value in slo_seconds.items()}
+        self.default_service_seconds = float(default_service_seconds)
+        self.min_retry_after = max(int(min_retry_after), 1)
+        self._lock = threading.Lock()
+        self._admitted = Counter()
+        self._rejected = Counter()
+        self._last_estimate: Dict[str, float] = {}
+
+    @staticmethod
+    def from_config(config: Dict[str, Any]) -> Optional["AdmissionController"]:
+        """Build from the `inference.admission` section, or None if disabled."""
+        if not config.get("enabled", True):
+            return None
+        return AdmissionController(
+            slo_seconds=config.get("slo_seconds") or {"interactive": 5, "standard": 30, "background": 120},
+            default_service_seconds=config.get("default_service_seconds", 2.0),
+            min_retry_after=config.get("min_retry_after", 1),
+        )
+
+    def estimate_wait(self, priority: str) -> float:
+        """Longest estimated wait for a `priority` request across the loaded models."""
+        waits = [
+            llm._scheduler.estimate_wait(priority, self.default_service_seconds)
+            for llm in get_model_registry().models().values()
+            if llm._scheduler is not None
+        ]
+        return max(waits, default=0.0)
+
+    def check(self, priority: str) -> Optional[int]:
+        """Admit a `priority` request (None) or return the Retry-After seconds to reject it with."""
+        slo = self.slo_seconds.get(priority)
+        estimate = self.estimate_wait(priority) if slo is not None else 0.0
+        with self._lock:
+            self._last_estimate[priority] = estimate
+            if slo is None or estimate <= slo:
+                self._admitted[priority] += 1
+                return None
+            self._rejected[priority] += 1
+        logger.warning(f"🚦 Rejecting {priority} request: estimated queue wait {estimate:.1f}s exceeds SLO {slo:.0f}s")
+        return max(math.ceil(estimate - slo), self.min_retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                name: {
+                    "slo_s": self.slo_seconds.get(name),
+                    "admitted": self._admitted[name],
+                    "rejected": self._rejected[name],
+                    "last_estimated_wait_s": self._last_estimate.get(name),
+                }
+                for name in PRIORITY_CLASSES
+            }
+
+
+_controller: Optional[AdmissionController] = None
+_controller_loaded = False
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """Process-wide controller configured from `inference.admission` (None if disabled)."""
+    global _controller, _controller_loaded
+    if not _controller_loaded:
+        with _controller_lock:
+            if not _controller_loaded:
+                _controller = AdmissionController.from_config(get_config_section("inference").get("admission", {}))
+                _controller_loaded = True
+    return _controller
@@ -0,0 +1,148 @@
+"""
+Process-wide pool of prebuilt agents, plus per-agent call counters.
+
+Agents hold no per-call state once constructed (prompts, model and options
+are fixed in `__init__`), so one instance per agent class, LLM client and
+constructor arguments can serve every request concurrently. The `*_with_llm`
+helpers take their agents from here instead of building one per call (or per
+knowledge point). LLM clients are memoized by base/llm_registry.py, so the
+client object itself is the LLM identity.
+
+Every `BaseAgent` call, pooled or not, is counted: invocations, failures and
+latency per agent class, reported by `GET /inference-stats` under `agents`.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterator, Optional, Tuple, Type, TypeVar
+
+from utils.config import get_config_section
+
+logger = logging.getLogger(__name__)
+
+A = TypeVar("A")
+
+
+@dataclass
+class _AgentCounters:
+    invocations: int = 0
+    failures: int = 0
+    latency_s: float = 0.0
+    max_latency_s: float = 0.0
+
+
+def _argument_key(value: Any) -> Hashable:
+    # Plain values compare by value; objects such as a SearchRagManager by identity
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return ("id", id(value))
+
+
+class AgentPool:
+    """Hands out shared agent instances keyed by class, LLM client and arguments."""
+
+    def __init__(self, max_agents: int = 256, enabled: bool = True):
+        self.max_agents = max(int(max_agents), 1)
+        self.enabled = enabled
+        self._agents: "OrderedDict[Tuple[Hashable, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[Hashable, ...], threading.Lock] = {}
+        self._counters: Dict[str, _AgentCounters] = {}
+        self._built = 0
+        self._reused = 0
+
+    @staticmethod
+    def from_config(config: Dict[str, Any]) -> "AgentPool":
+        """Build from the `inference.agent_pool` section."""
+        return AgentPool(max_agents=config.get("max_agents", 256), enabled=config.get("enabled", True))
+
+    def get(self, agent_cls: Type[A], llm: Any, **kwargs: Any) -> A:
+        """The shared `agent_cls(llm, **kwargs)`, built on first use."""
+        if not self.enabled:
+            return agent_cls(llm, **kwargs)
+        key = (agent_cls, id(llm), tuple(sorted((name, _argument_key(value)) for name, value in kwargs.items())))
+        with self._lock:
+            agent = self._agents.get(key)
+            if agent is not None:
+                self._agents.move_to_end(key)
+                self._reused += 1
+                return agent
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Construct outside the pool lock so a slow agent doesn't block the others
+        with key_lock:
+            with self._lock:
+                agent = self._agents.get(key)
+                if agent is not None:
+                    self._reused += 1
+                    return agent
+            agent = agent_cls(llm, **kwargs)
+            with self._lock:
+                # The entry keeps `llm` alive, so its id can't be reused while pooled
+                self._agents[key] = agent
+                self._built += 1
+                while len(self._agents) > self.max_agents:
+                    evicted, _ = self._agents.popitem(last=False)
+                    self._key_locks.pop(evicted, None)
+            logger.debug(f"🧩 Built pooled {agent_cls.__name__}")
+            return agent
+
+    @contextmanager
+    def observe(self, agent_name: str) -> Iterator[None]:
+        """Count one call of `agent_name`, its latency and whether it raised."""
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                counters = self._counters.setdefault(agent_name, _AgentCounters())
+                counters.invocations += 1
+                counters.failures += failed
+                counters.latency_s += elapsed
+                counters.max_latency_s = max(counters.max_latency_s, elapsed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._agents.clear()
+            self._key_locks.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pooled": len(self._agents),
+                "built": self._built,
+                "reused": self._reused,
+                "by_agent": {
+                    name: {
+                        "invocations": c.invocations,
+                        "failures": c.failures,
+                        "failure_rate": c.failures / c.invocations if c.invocations else 0.0,
+                        "mean_latency_s": c.latency_s / c.invocations if c.invocations else 0.0,
+                        "max_latency_s": c.max_latency_s,
+                    }
+                    for name, c in sorted(self._counters.items())
+                },
+            }
+
+
+_pool: Optional[AgentPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_agent_pool() -> AgentPool:
+    """Process-wide pool configured from `inference.agent_pool`."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = AgentPool.from_config(get_config_section("inference").get("agent_pool", {}))
+    return _pool
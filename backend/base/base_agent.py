@@ -1,4 +1,6 @@
-from typing import Any, Dict, Optional, Sequence
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 try:
     from langgraph.prebuilt import create_react_agent as create_agent
@@ -10,9 +12,17 @@ except ImportError:
         
 from langchain_core.language_models import BaseChatModel
 
-from utils.llm_output import preprocess_response, convert_json_output
+from utils.config import get_config_section
+from utils.json_stream import Path, StreamingJSONParser
+from utils.llm_output import preprocess_response, convert_json_output, filter_think_stream
+from .agent_pool import get_agent_pool
+from .context_budget import get_context_budget
+from .inference_executor import run_inference
+from .inference_priority import inference_agent, inference_priority, resolve_priority
+from .prompt_encoding import prompt_encoder
+from .speculative import speculative_attempts
 from json import JSONDecodeError
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
 
 # Try to import langgraph types, but make them optional
 try:
@@ -40,6 +50,17 @@ valid_agent_arg_list = [
     "cache"
 ]
 
+DECODING_PROFILES = ("sample", "greedy")
+
+
+def decoding_profile(agent_name: str) -> str:
+    """Decoding profile of an agent class from `inference.decoding_profiles`."""
+    config = get_config_section("inference").get("decoding_profiles", {})
+    profile = (config.get("agents") or {}).get(agent_name, config.get("default", "sample"))
+    if profile not in DECODING_PROFILES:
+        raise ValueError(f"Unknown decoding profile '{profile}' for {agent_name}; expected one of {DECODING_PROFILES}")
+    return profile
+
 
 class BaseAgent:
 
@@ -55,9 +76,22 @@ class BaseAgent:
         self._system_prompt = system_prompt
         self._tools = tools
         self._agent_kwargs = {k: v for k, v in kwargs.items() if k in valid_agent_arg_list}
-        self._agent = self._build_agent()
+        self._agent = self._build_agent() if self._uses_graph else None
         self.exclude_think = kwargs.get("exclude_think", True)
         self.jsonalize_output = kwargs.get("jsonalize_output", True)
+        self.decoding = kwargs.get("decoding") or decoding_profile(type(self).__name__)
+        self.prompt_encoder = kwargs.get("prompt_encoder") or prompt_encoder(type(self).__name__)
+        speculative = kwargs.get("speculative") or speculative_attempts(type(self).__name__)
+        if speculative.attempts > 1 and not getattr(model, "stops_abandoned_attempts", False):
+            # Losing attempts on this model could not be stopped and would decode to the end
+            speculative = replace(speculative, attempts=1)
+        self.speculative = speculative
+
+    @property
+    def _uses_graph(self) -> bool:
+        """Only agents with tools (or graph options such as `response_format`)
+        need the react agent graph; the rest call the chat model directly."""
+        return bool(self._tools or self._agent_kwargs)
 
     def _build_agent(self):
         # LangGraph's create_react_agent uses 'prompt' parameter
@@ -74,13 +108,14 @@ class BaseAgent:
             self._system_prompt = system_prompt
         if task_prompt is not None:
             self._task_prompt = task_prompt
-        self._agent = self._build_agent()
+        if self._uses_graph:
+            self._agent = self._build_agent()
 
     def _build_prompt(self, variables: Dict[str, Any], task_prompt: Optional[str] = None) -> _InputAgentState:
         """Build chat messages for model call."""
         assert task_prompt is not None, "Either self._task_prompt or task_prompt must be provided."
         task_prompt = task_prompt
-        formatted_task = task_prompt.format(**variables)  # type: ignore[union-attr]
+        formatted_task = task_prompt.format(**self.prompt_encoder.encode_variables(variables))  # type: ignore[union-attr]
         prompt = {
             "messages": [
                 {"role": "user", "content": formatted_task}
@@ -88,35 +123,207 @@ class BaseAgent:
         }
         return prompt
 
-    def invoke(self, input_dict: dict, task_prompt: Optional[str] = None) -> Any:
-        """Invoke the agent with the given input text."""
-        input_prompt = self._build_prompt(input_dict, task_prompt=task_prompt)
-        raw_output = self._agent.invoke(input_prompt)
-        try:
-            output = preprocess_response(
-                raw_output, only_text=True, exclude_think=self.exclude_think, json_output=self.jsonalize_output
-            )
-            return output
-        except JSONDecodeError:
-            # Attempt a self-healing JSON repair using the base model directly
-            if not self.jsonalize_output:
-                raise
-
-            repair_system = "You are a strict JSON reformatter. Return ONLY valid JSON. No code fences, no prose."
-            repair_user = (
-                "Fix the following content into a valid JSON that strictly matches the 'Final Output Format'\n"
-                "described in the instruction below. If fields are missing, infer minimal placeholders.\n\n"
-                f"Instruction (schema hint):\n{self._system_prompt}\n\n"
-                f"Content to fix:\n{raw_output}"
+    def _build_messages(self, variables: Dict[str, Any], task_prompt: Optional[str] = None) -> List[BaseMessage]:
+        """Build system/user messages for calling the chat model directly."""
+        input_prompt = self._build_prompt(variables, task_prompt=task_prompt)
+        messages: List[BaseMessage] = []
+        if self._system_prompt:
+            messages.append(SystemMessage(content=self._system_prompt))
+        messages.extend(HumanMessage(content=m["content"]) for m in input_prompt["messages"])
+        return messages
+
+    def _model_call_kwargs(self, **kwargs: Any) -> Dict[str, Any]:
+        """Keep only the call options the underlying chat model understands.
+
+        e.g. `json_schema` (a Pydantic output model) enables constrained
+        decoding on models that support it and is dropped for the rest.
+        """
+        supported = getattr(self._model, "call_options", ())
+        return {k: v for k, v in kwargs.items() if v is not None and k in supported}
+
+    def _fit_context(self, variables: Dict[str, Any], task_prompt: Optional[str]) -> Dict[str, Any]:
+        """Shrink low-priority prompt variables until the prompt fits the model's input budget.
+
+        Only models that expose `max_input_tokens` and `count_tokens` (e.g.
+        SharedLLMWrapper) are budgeted; see base/context_budget.py.
+        """
+        budget = get_context_budget()
+        max_tokens = getattr(self._model, "max_input_tokens", None)
+        if budget is None or max_tokens is None or task_prompt is None:
+            return variables
+
+        def render(values: Dict[str, Any]) -> str:
+            return f"{self._system_prompt or ''}\n{task_prompt.format(**self.prompt_encoder.encode_variables(values))}"
+
+        fitted, _ = budget.fit(
+            variables, render, self._model.count_tokens, max_tokens, summarize=self._summarize_for_context
+        )
+        return fitted
+
+    def _summarize_for_context(self, text: str, max_tokens: int) -> str:
+        messages = [
+            SystemMessage(content=(
+                f"Summarize the content below in at most {max_tokens * 3 // 4} words. Keep the names, facts "
+                "and numbers a downstream task may need. Return only the summary."
+            )),
+            HumanMessage(content=text),
+        ]
+        return preprocess_response(self._model.invoke(messages), only_text=True, exclude_think=True, json_output=False)
+
+    def stream(self, input_dict: dict, task_prompt: Optional[str] = None, **model_kwargs: Any) -> Iterator[str]:
+        """Stream the reply text as it is generated (text agents only).
+
+        Like `invoke`, the model call is attributed to this agent (see
+        `_call_scope`), so its service time feeds admission control.
+        """
+        if self.jsonalize_output:
+            raise ValueError("Streaming is only supported for agents with plain-text output.")
+        with self._call_scope():
+            input_dict = self._fit_context(input_dict, task_prompt)
+            messages = self._build_messages(input_dict, task_prompt=task_prompt)
+            call_kwargs = self._model_call_kwargs(
+                agent_name=type(self).__name__, priority=self._inference_priority(), **model_kwargs
             )
-            # Build messages for direct model call
-            messages = [
-                SystemMessage(content=repair_system),
-                HumanMessage(content=repair_user),
-            ]
-            repaired = self._model.invoke(messages)
-            # Extract text and convert to JSON
-            repaired_text = preprocess_response(
-                repaired, only_text=True, exclude_think=True, json_output=False
+            chunks = (chunk.content for chunk in self._model.stream(messages, **call_kwargs) if chunk.content)
+            if self.exclude_think:
+                chunks = filter_think_stream(chunks)
+            yield from chunks
+
+    def stream_json(
+        self, input_dict: dict, task_prompt: Optional[str] = None, **model_kwargs: Any
+    ) -> Iterator[Tuple[Path, Any]]:
+        """Stream the reply of a JSON agent as parsed values (JSON agents only).
+
+        Yields `(path, value)` for every object or array the moment it
+        closes (see utils/json_stream.py), so callers can validate and hand
+        out list items while later ones are still being generated. The
+        top-level value comes last with path `()`; a truncated reply is
+        closed and yielded as such. The model stops once the value is
+        complete.
+        """
+        if not self.jsonalize_output:
+            raise ValueError("Structured streaming is only supported for agents with JSON output.")
+        model_kwargs = {"json_output": True, **model_kwargs}
+        if self.decoding == "greedy":
+            model_kwargs = {"greedy": True, **model_kwargs}
+        with self._call_scope():
+            input_dict = self._fit_context(input_dict, task_prompt)
+            messages = self._build_messages(input_dict, task_prompt=task_prompt)
+            call_kwargs = self._model_call_kwargs(
+                agent_name=type(self).__name__, priority=self._inference_priority(), **model_kwargs
             )
-            return convert_json_output(repaired_text)
+            chunks = (chunk.content for chunk in self._model.stream(messages, **call_kwargs) if chunk.content)
+            if self.exclude_think:
+                chunks = filter_think_stream(chunks)
+            closed: List[Tuple[Path, Any]] = []
+            parser = StreamingJSONParser(on_value=lambda path, value: closed.append((path, value)))
+            for chunk in chunks:
+                parser.feed(chunk)
+                yield from closed
+                closed.clear()
+                if parser.done:
+                    break
+            if not parser.done:
+                yield (), parser.close()
+
+    @contextmanager
+    def _call_scope(self) -> Iterator[None]:
+        """Attribute model calls to this agent and its priority class, and count the call."""
+        name = type(self).__name__
+        with get_agent_pool().observe(name), inference_agent(name), inference_priority(self._inference_priority()):
+            yield
+
+    def _inference_priority(self) -> str:
+        """Scheduling class of this agent's model calls: the current endpoint's,
+        else the one configured for the agent (`inference.priorities`)."""
+        return resolve_priority(type(self).__name__)
+
+    def _prepare_call(self, input_dict: dict, task_prompt: Optional[str], model_kwargs: Dict[str, Any]):
+        """Return (runnable, input, call kwargs) for one agent call.
+
+        Agents without tools call the chat model directly with
+        [SystemMessage, HumanMessage]; the react agent graph is only used for
+        tool calling. Extra keyword arguments (e.g. `conversation_id`) are
+        forwarded to the chat model when it supports them, in which case the
+        model is called directly as well. JSON agents without
+        tools also ask the model to stop once the JSON value is complete, and
+        agents with the greedy decoding profile ask for greedy decoding.
+        Routing models also receive the agent's class name (`agent_name`).
+        """
+        if self.jsonalize_output and not self._tools:
+            model_kwargs = {**model_kwargs, "json_output": True}
+        if self.decoding == "greedy":
+            model_kwargs = {"greedy": True, **model_kwargs}
+        model_kwargs = {"agent_name": type(self).__name__, **model_kwargs}
+        call_kwargs = self._model_call_kwargs(**model_kwargs)
+        if call_kwargs or not self._uses_graph:
+            return self._model, self._build_messages(input_dict, task_prompt=task_prompt), call_kwargs
+        return self._agent, self._build_prompt(input_dict, task_prompt=task_prompt), {}
+
+    def _parse_output(self, raw_output: Any) -> Any:
+        return preprocess_response(
+            raw_output, only_text=True, exclude_think=self.exclude_think, json_output=self.jsonalize_output
+        )
+
+    def _repair_messages(self, raw_output: Any) -> List[BaseMessage]:
+        """Messages asking the model to turn malformed output into valid JSON."""
+        repair_system = "You are a strict JSON reformatter. Return ONLY valid JSON. No code fences, no prose."
+        repair_user = (
+            "Fix the following content into a valid JSON that strictly matches the 'Final Output Format'\n"
+            "described in the instruction below. If fields are missing, infer minimal placeholders.\n\n"
+            f"Instruction (schema hint):\n{self._system_prompt}\n\n"
+            f"Content to fix:\n{raw_output}"
+        )
+        return [
+            SystemMessage(content=repair_system),
+            HumanMessage(content=repair_user),
+        ]
+
+    def _repair_kwargs(self, model_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        # The repair call keeps the output schema but not session state such as conversation_id
+        return self._model_call_kwargs(
+            json_schema=model_kwargs.get("json_schema"),
+            json_output=True,
+            greedy=self.decoding == "greedy" or None,
+            agent_name=type(self).__name__,
+        )
+
+    @staticmethod
+    def _parse_repaired(repaired: Any) -> Any:
+        # Extract text and convert to JSON
+        repaired_text = preprocess_response(
+            repaired, only_text=True, exclude_think=True, json_output=False
+        )
+        return convert_json_output(repaired_text)
+
+    def invoke(self, input_dict: dict, task_prompt: Optional[str] = None, **model_kwargs: Any) -> Any:
+        """Invoke the agent with the given input text."""
+        with self._call_scope():
+            input_dict = self._fit_context(input_dict, task_prompt)
+            runnable, model_input, call_kwargs = self._prepare_call(input_dict, task_prompt, model_kwargs)
+            raw_output = runnable.invoke(model_input, **call_kwargs)
+            try:
+                return self._parse_output(raw_output)
+            except JSONDecodeError:
+                # Attempt a self-healing JSON repair using the base model directly
+                if not self.jsonalize_output:
+                    raise
+                repaired = self._model.invoke(self._repair_messages(raw_output), **self._repair_kwargs(model_kwargs))
+                return self._parse_repaired(repaired)
+
+    async def ainvoke(self, input_dict: dict, task_prompt: Optional[str] = None, **model_kwargs: Any) -> Any:
+        """Async variant of :meth:`invoke`; model calls are awaited, not run on the event loop."""
+        with self._call_scope():
+            # Token counting (and any summarization) is blocking work
+            input_dict = await run_inference(self._fit_context, input_dict, task_prompt)
+            runnable, model_input, call_kwargs = self._prepare_call(input_dict, task_prompt, model_kwargs)
+            raw_output = await runnable.ainvoke(model_input, **call_kwargs)
+            try:
+                return self._parse_output(raw_output)
+            except JSONDecodeError:
+                if not self.jsonalize_output:
+                    raise
+                repaired = await self._model.ainvoke(
+                    self._repair_messages(raw_output), **self._repair_kwargs(model_kwargs)
+                )
+                return self._parse_repaired(repaired)
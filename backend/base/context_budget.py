@@ -0,0 +1,187 @@
+"""
+Token budget for agent prompts.
+
+Task prompts are formatted from variables such as learner_profile,
+learning_path, knowledge_drafts, external_resources and chat history. When the
+rendered prompt would not fit the model's input budget (context window minus
+the reply budget), `ContextBudget.fit` shrinks the variables with the lowest
+priority first until it does, and logs every cut. Variables without a
+configured priority are never touched.
+
+Strategies:
+
+- `trim`: keep the beginning (list items from the front, text by tokens)
+- `trim_oldest`: keep the end, e.g. the most recent chat turns
+- `drop`: replace the value with a short omission note
+- `summarize`: ask the model for a summary that fits (falls back to `trim`)
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.config import get_config_section
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("trim", "trim_oldest", "drop", "summarize")
+
+_TRIMMED = " …[trimmed to fit the context window]"
+_OMITTED = "(omitted to fit the context window)"
+_SLACK_TOKENS = 8  # tokenization at the cut rarely matches the estimate exactly
+
+
+@dataclass
+class ContextVariable:
+    priority: int  # lower is shrunk first
+    strategy: str = "trim"
+
+    def __post_init__(self):
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Unknown context strategy '{self.strategy}'; expected one of {STRATEGIES}")
+
+
+@dataclass
+class ContextCut:
+    """One variable shrunk by `ContextBudget.fit`."""
+
+    variable: str
+    strategy: str
+    tokens_before: int
+    tokens_after: int
+
+
+def _longest_fitting(size: int, fits: Callable[[int], bool]) -> int:
+    """Largest n in [0, size] with fits(n), for a monotone `fits`."""
+    low, high = 0, size
+    while low < high:
+        middle = (low + high + 1) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class ContextBudget:
+    """Shrinks low-priority prompt variables until a prompt fits its token budget."""
+
+    def __init__(self, variables: Dict[str, ContextVariable], min_variable_tokens: int = 32):
+        self.variables = variables
+        self.min_variable_tokens = max(int(min_variable_tokens), 0)
+
+    @staticmethod
+    def from_config(config: Dict[str, Any]) -> Optional["ContextBudget"]:
+        """Build from the `inference.context_budget` section, or None if disabled."""
+        if not config.get("enabled", True):
+            return None
+        variables = {
+            name: ContextVariable(priority=int(spec.get("priority", 0)), strategy=spec.get("strategy", "trim"))
+            for name, spec in (config.get("variables") or {}).items()
+        }
+        return ContextBudget(variables, min_variable_tokens=config.get("min_variable_tokens", 32))
+
+    def fit(
+        self,
+        variables: Dict[str, Any],
+        render: Callable[[Dict[str, Any]], str],
+        count_tokens: Callable[[str], int],
+        max_tokens: int,
+        summarize: Optional[Callable[[str, int], str]] = None,
+    ) -> Tuple[Dict[str, Any], List[ContextCut]]:
+        """Return (variables that fit, cuts made).
+
+        Args:
+            variables: Prompt variables as passed to the agent
+            render: Renders the full prompt text from variables
+            count_tokens: Token count of a text for the target model
+            max_tokens: Input token budget of the rendered prompt
+            summarize: Optional `(text, max_tokens) -> summary` used by the
+                `summarize` strategy
+        """
+        text = render(variables)
+        # Every token covers at least one byte, so short prompts skip tokenization
+        if len(text.encode("utf-8")) <= max_tokens:
+            return variables, []
+        total = count_tokens(text)
+        if total <= max_tokens:
+            return variables, []
+
+        fitted = dict(variables)
+        cuts: List[ContextCut] = []
+        shrinkable = sorted((name for name in fitted if name in self.variables), key=lambda n: self.variables[n].priority)
+        for name in shrinkable:
+            if total <= max_tokens:
+                break
+            before = count_tokens(str(fitted[name]))
+            if before == 0:
+                continue
+            target = before - (total - max_tokens) - _SLACK_TOKENS
+            fitted[name], strategy = self._shrink(fitted[name], target, self.variables[name].strategy, count_tokens, summarize)
+            cut = ContextCut(name, strategy, before, count_tokens(str(fitted[name])))
+            cuts.append(cut)
+            logger.info(f"✂️ Context budget: {name} {cut.tokens_before} -> {cut.tokens_after} tokens ({strategy})")
+            total = count_tokens(render(fitted))
+
+        if total > max_tokens:
+            logger.warning(
+                f"⚠️ Prompt is still {total} tokens (budget {max_tokens}) after shrinking {[c.variable for c in cuts]}"
+            )
+        return fitted, cuts
+
+    def _shrink(
+        self,
+        value: Any,
+        target: int,
+        strategy: str,
+        count_tokens: Callable[[str], int],
+        summarize: Optional[Callable[[str, int], str]],
+    ) -> Tuple[Any, str]:
+        """Shrink one value to at most `target` tokens; returns (value, strategy applied)."""
+        if strategy == "drop" or target < self.min_variable_tokens:
+            return _OMITTED, "drop"
+        text = str(value)
+        if strategy == "summarize":
+            if summarize is not None:
+                try:
+                    summary = summarize(text, target)
+                    if summary and count_tokens(summary) <= target:
+                        return summary, "summarize"
+                except Exception as e:
+                    logger.warning(f"⚠️ Context summarization failed, trimming instead: {e}")
+            strategy = "trim"
+
+        keep_end = strategy == "trim_oldest"
+        if isinstance(value, list):
+            def kept(n: int) -> List[Any]:
+                items = value[len(value) - n:] if keep_end else value[:n]
+                omitted = len(value) - n
+                note = [f"({omitted} more items omitted to fit the context window)"] if omitted else []
+                return note + items if keep_end else items + note
+
+            count = _longest_fitting(len(value), lambda n: count_tokens(str(kept(n))) <= target)
+            if count > 0:
+                return kept(count), strategy
+
+        def cut(n: int) -> str:
+            return _TRIMMED.strip() + " " + text[len(text) - n:] if keep_end else text[:n] + _TRIMMED
+
+        length = _longest_fitting(len(text), lambda n: count_tokens(cut(n)) <= target)
+        return (cut(length), strategy) if length > 0 else (_OMITTED, "drop")
+
+
+_budget: Optional[ContextBudget] = None
+_budget_loaded = False
+_budget_lock = threading.Lock()
+
+
+def get_context_budget() -> Optional[ContextBudget]:
+    """Process-wide budget configured from `inference.context_budget` (None if disabled)."""
+    global _budget, _budget_loaded
+    if not _budget_loaded:
+        with _budget_lock:
+            if not _budget_loaded:
+                _budget = ContextBudget.from_config(get_config_section("inference").get("context_budget", {}))
+                _budget_loaded = True
+    return _budget
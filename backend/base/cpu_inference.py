@@ -0,0 +1,80 @@
+"""
+CPU inference profile for SharedLLM.
+
+Used when no GPU is available. The profile picks how weights are held on the
+CPU and how many threads torch may use:
+
+- `fp32`: full precision (the previous behaviour)
+- `bf16`: bfloat16 weights, roughly half the memory; fast on CPUs with AVX512-BF16/AMX
+- `int8`: dynamic int8 quantization of every `nn.Linear`, activations stay float
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+CPU_MODES = ("fp32", "bf16", "int8")
+
+_threads_lock = threading.Lock()
+_threads_applied = False
+
+
+@dataclass
+class CPUInferenceProfile:
+    mode: str = "fp32"
+    intra_op_threads: int = 0  # 0 keeps torch's default
+    inter_op_threads: int = 0
+
+    def __post_init__(self):
+        self.mode = str(self.mode).lower()
+        if self.mode not in CPU_MODES:
+            raise ValueError(f"Unknown CPU inference mode '{self.mode}'; expected one of {CPU_MODES}")
+
+    @staticmethod
+    def from_config(config: Dict[str, Any]) -> "CPUInferenceProfile":
+        """Build from the `inference.cpu` section."""
+        return CPUInferenceProfile(
+            mode=config.get("mode", "fp32"),
+            intra_op_threads=int(config.get("intra_op_threads", 0) or 0),
+            inter_op_threads=int(config.get("inter_op_threads", 0) or 0),
+        )
+
+    @property
+    def torch_dtype(self) -> torch.dtype:
+        """dtype to load the checkpoint with (int8 quantizes a float32 model)."""
+        return torch.bfloat16 if self.mode == "bf16" else torch.float32
+
+    def apply_threads(self) -> None:
+        """Set torch thread pools once per process.
+
+        The inter-op pool can only be sized before torch starts parallel work,
+        so a late call keeps the current size and logs why.
+        """
+        global _threads_applied
+        with _threads_lock:
+            if _threads_applied:
+                return
+            _threads_applied = True
+            if self.intra_op_threads > 0:
+                torch.set_num_threads(self.intra_op_threads)
+            if self.inter_op_threads > 0:
+                try:
+                    torch.set_num_interop_threads(self.inter_op_threads)
+                except RuntimeError as exc:
+                    logger.warning(f"⚠️ Could not set inter-op threads: {exc}")
+            logger.info(
+                f"🧵 CPU threads - intra-op: {torch.get_num_threads()}, inter-op: {torch.get_num_interop_threads()}"
+            )
+
+    def prepare(self, model: Any) -> Any:
+        """Apply post-load optimizations (int8 dynamic quantization) to an eval-mode model."""
+        if self.mode != "int8":
+            return model
+        quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        logger.info("🗜️ Applied dynamic int8 quantization to linear layers")
+        return quantized
@@ -0,0 +1,90 @@
+"""
+Fair sharing of the inference queue between learners.
+
+Requests are tagged with the learner (or session) they serve, taken from the
+`X-Learner-Id` header or the `learner_id` body field by main.py. Within a
+priority class the batching scheduler serves queued requests by start-time
+fair queueing: every learner's requests get consecutive virtual start tags
+spaced 1 / weight apart, so a learner with a backlog of regenerations
+takes turns with everyone else instead of occupying the model, and a
+learner of weight 2 gets twice the slots of one of weight 1. Requests
+without a learner id are not chained and simply start at the current virtual
+time. Optionally, a learner may occupy at most `max_concurrent_per_learner`
+slots of a batch. Configured under `inference.fair_share`.
+"""
+
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from utils.config import get_config_section
+
+_current: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("inference_learner", default=None)
+
+_MAX_TRACKED_FLOWS = 1024
+
+
+def fair_share_config() -> Dict[str, Any]:
+    """The `inference.fair_share` section ({} when absent)."""
+    return get_config_section("inference").get("fair_share", {})
+
+
+@contextmanager
+def inference_learner(learner_id: Optional[str]) -> Iterator[None]:
+    """Attribute the enclosed model calls to `learner_id` (None: anonymous)."""
+    token = _current.set(str(learner_id) if learner_id not in (None, "") else None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def current_learner() -> Optional[str]:
+    return _current.get()
+
+
+class FairShare:
+    """Virtual-time bookkeeping for start-time fair queueing.
+
+    Not thread-safe; the scheduler calls it under its queue lock.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, default_weight: float = 1.0, max_concurrent_per_learner: int = 0):
+        self.weights = {str(k): float(v) for k, v in (weights or {}).items()}
+        self.default_weight = float(default_weight)
+        self.max_concurrent_per_learner = max(int(max_concurrent_per_learner), 0)  # 0: no cap
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+
+    @staticmethod
+    def from_config(config: Dict[str, Any]) -> Optional["FairShare"]:
+        """Build from the `inference.fair_share` section, or None if disabled."""
+        if not config.get("enabled", True):
+            return None
+        return FairShare(
+            weights=config.get("weights") or {},
+            default_weight=config.get("default_weight", 1.0),
+            max_concurrent_per_learner=config.get("max_concurrent_per_learner", 0),
+        )
+
+    def weight(self, learner_id: str) -> float:
+        return max(self.weights.get(learner_id, self.default_weight), 1e-6)
+
+    def start_tag(self, learner_id: Optional[str]) -> float:
+        """Virtual start tag of a newly queued request of `learner_id`."""
+        if learner_id is None:
+            return self._virtual_time
+        start = max(self._virtual_time, self._last_finish.get(learner_id, 0.0))
+        self._last_finish[learner_id] = start + 1.0 / self.weight(learner_id)
+        return start
+
+    def served(self, start_tag: float) -> None:
+        """Advance virtual time to the tag of a request entering service."""
+        self._virtual_time = max(self._virtual_time, start_tag)
+        if len(self._last_finish) > _MAX_TRACKED_FLOWS:
+            # Learners whose last finish is in the past restart at virtual time anyway
+            self._last_finish = {k: v for k, v in self._last_finish.items() if v > self._virtual_time}
+
+    def capped(self, learner_id: Optional[str], in_batch: int) -> bool:
+        """Whether `learner_id` already holds its share of a batch."""
+        return bool(self.max_concurrent_per_learner) and learner_id is not None and in_batch >= self.max_concurrent_per_learner
@@ -0,0 +1,220 @@
+"""
+InferenceExecutor - bounded worker pool for blocking model calls.
+
+FastAPI endpoints are coroutines, but the agent pipelines call synchronous
+model code. Running that code on the event loop stalls every other request
+(health checks included), so endpoints hand it to this executor and await the
+result. The pool size bounds how many pipelines touch the models at once, and
+`max_pending` bounds how many more may wait for a worker before new calls are
+rejected with `InferenceExecutorBusy`, which main.py turns into a 503 with a
+`Retry-After` of `retry_after_seconds`.
+
+Streamed responses are admitted the same way: `stream` takes a slot before
+the response starts and holds it until the stream ends, and a generation
+feeding an admitted stream (`submit_generation`) runs on the pool under
+that slot rather than on a thread of its own.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, TypeVar
+
+from utils.config import get_config_section
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class InferenceExecutorBusy(RuntimeError):
+    """Raised when every worker is busy and the pending queue is full."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _StreamAdmission:
+    """The slot of a stream admitted by `InferenceExecutor.stream`."""
+
+    def __init__(self):
+        self.claimed = False  # a generation already runs on this slot
+
+
+_admitted_stream: contextvars.ContextVar[Optional[_StreamAdmission]] = contextvars.ContextVar(
+    "admitted_stream", default=None
+)
+
+
+class _AdmittedStream:
+    """Async iterator over a blocking one that holds an executor slot until it
+    is exhausted, fails, is closed or is garbage collected (a response that
+    never started streaming)."""
+
+    _DONE = object()
+
+    def __init__(self, iterator: Any, context: contextvars.Context, pool: ThreadPoolExecutor, release: Callable[[], None]):
+        self._iterator = iterator
+        self._context = context
+        self._pool = pool
+        self._release = release
+        # Serializes stepping and closing the iterator across threads
+        self._lock = threading.Lock()
+        self._finished = False
+
+    def __aiter__(self) -> "_AdmittedStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._finished:
+            raise StopAsyncIteration
+        try:
+            item = await asyncio.get_running_loop().run_in_executor(None, self._step)
+        except BaseException:
+            self._finish_later()
+            raise
+        if item is self._DONE:
+            self._finish_later()
+            raise StopAsyncIteration
+        return item
+
+    async def aclose(self) -> None:
+        self._finish_later()
+
+    def __del__(self):
+        self._finish_later()
+
+    def _step(self) -> Any:
+        with self._lock:
+            return self._context.run(next, self._iterator, self._DONE)
+
+    def _finish_later(self) -> None:
+        # Off the loop: if a step is still running (we were cancelled mid-step), closing waits for it
+        if not self._finished:
+            self._finished = True
+            try:
+                self._pool.submit(self._finish)
+            except RuntimeError:  # the pool is shut down
+                self._finish()
+
+    def _finish(self) -> None:
+        try:
+            with self._lock:
+                close = getattr(self._iterator, "close", None)
+                if close is not None:
+                    self._context.run(close)
+        finally:
+            self._release()
+
+
+class InferenceExecutor:
+    """Thread pool with a bounded backlog for blocking inference work."""
+
+    def __init__(self, max_workers: int = 16, max_pending: int = 64, retry_after_seconds: int = 5):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = int(max_workers)
+        self.max_pending = max(int(max_pending), 0)
+        self.retry_after_seconds = max(int(retry_after_seconds), 1)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+
+    @staticmethod
+    def from_config(config: Dict[str, Any]) -> "InferenceExecutor":
+        """Build from the `inference.executor` section."""
+        return InferenceExecutor(
+            max_workers=config.get("max_workers", 16),
+            max_pending=config.get("max_pending", 64),
+            retry_after_seconds=config.get("retry_after_seconds", 5),
+        )
+
+    def submit(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        """Schedule `func(*args, **kwargs)` on a worker thread, in a copy of the
+        caller's context (so e.g. the request's inference priority follows it)."""
+        self._acquire()
+        try:
+            future = self._pool.submit(contextvars.copy_context().run, func, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Await `func(*args, **kwargs)` without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def submit_generation(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        """Like `submit`, but the first generation started by a stream admitted
+        with `stream` runs on that stream's slot instead of taking another."""
+        admission = _admitted_stream.get()
+        if admission is None or admission.claimed:
+            return self.submit(func, *args, **kwargs)
+        admission.claimed = True
+        return self._pool.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+    def stream(self, items: Iterable[T]) -> AsyncIterator[T]:
+        """Admit a streamed response now and iterate `items` off the event loop.
+
+        Raises `InferenceExecutorBusy` right away when the executor is
+        saturated, so the caller can still answer 503. The slot is held until
+        the stream is exhausted or closed. Items are produced on the event
+        loop's default executor, in a copy of the caller's context.
+        """
+        self._acquire()
+        context = contextvars.copy_context()
+        context.run(_admitted_stream.set, _StreamAdmission())
+        return _AdmittedStream(iter(items), context, self._pool, self._release)
+
+    def _acquire(self) -> None:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise InferenceExecutorBusy(
+                f"Inference executor is saturated ({self.max_workers} running, {self.max_pending} pending)",
+                retry_after=self.retry_after_seconds,
+            )
+        with self._lock:
+            self._in_flight += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+_executor: Optional[InferenceExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """Process-wide executor configured from `inference.executor`."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = InferenceExecutor.from_config(get_config_section("inference").get("executor", {}))
+    return _executor
+
+
+async def run_inference(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking model call on the shared inference executor."""
+    return await get_inference_executor().run(func, *args, **kwargs)
@@ -0,0 +1,78 @@
+"""
+Priority classes for queued inference.
+
+Every SharedLLM request carries one of `PRIORITY_CLASSES`. The batching
+scheduler serves interactive turns before standard and background work, and
+ages waiting requests so bulk jobs cannot starve.
+
+A request's class is, in order: the class of the HTTP endpoint being served
+(set for the request by main.py through `inference_priority`), the class
+configured for the calling agent, or the configured default. All of it is
+configured under `inference.priorities`.
+
+The calling agent is tracked the same way (`inference_agent`) so queued
+requests can be attributed to it, e.g. for per-agent service times.
+"""
+
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from utils.config import get_config_section
+
+PRIORITY_CLASSES = ("interactive", "standard", "background")
+PRIORITY_RANK = {name: rank for rank, name in enumerate(PRIORITY_CLASSES)}
+
+_current: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("inference_priority", default=None)
+_agent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("inference_agent", default=None)
+
+
+def priority_config() -> Dict[str, Any]:
+    """The `inference.priorities` section ({} when absent)."""
+    return get_config_section("inference").get("priorities", {})
+
+
+def _checked(priority: Optional[str]) -> Optional[str]:
+    if priority is not None and priority not in PRIORITY_RANK:
+        raise ValueError(f"Unknown inference priority '{priority}'; expected one of {PRIORITY_CLASSES}")
+    return priority
+
+
+@contextmanager
+def inference_priority(priority: Optional[str]) -> Iterator[None]:
+    """Run the enclosed calls (and the worker threads they spawn via the
+    inference executor) in `priority`; None leaves the class undecided."""
+    token = _current.set(_checked(priority))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def endpoint_priority(path: str) -> Optional[str]:
+    """Configured class of an HTTP endpoint path, if any."""
+    return _checked((priority_config().get("endpoints") or {}).get(path))
+
+
+def resolve_priority(agent_name: Optional[str] = None) -> str:
+    """Priority class for a call made now by `agent_name`."""
+    current = _current.get()
+    if current is not None:
+        return current
+    config = priority_config()
+    priority = (config.get("agents") or {}).get(agent_name or "") or config.get("default", "standard")
+    return _checked(priority)
+
+
+@contextmanager
+def inference_agent(agent_name: Optional[str]) -> Iterator[None]:
+    """Attribute the enclosed model calls to the agent class `agent_name`."""
+    token = _agent.set(agent_name)
+    try:
+        yield
+    finally:
+        _agent.reset(token)
+
+
+def current_agent() -> Optional[str]:
+    return _agent.get()
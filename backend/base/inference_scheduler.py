@@ -0,0 +1,442 @@
+"""
+InferenceScheduler - batches concurrent SharedLLM prompts onto one model.
+
+Callers submit rendered prompts and get a Future back. A single worker thread
+owns the model: it takes the most urgent queued request, waits up to
+`max_wait_ms` for compatible requests (same decoding parameters) to arrive,
+and decodes them together as one left-padded batch of at most
+`max_batch_size` prompts. Requests that carry per-request generation options
+(e.g. a token streamer) are decoded on their own.
+
+Urgency is the request's priority class (see base/inference_priority.py).
+A waiting request gains one class of urgency every `aging_seconds`, so
+background work is delayed by interactive traffic but never starved. Within
+a class, requests are served in fair-share order across learners (see
+base/fair_share.py), oldest first for equal shares. A batch being filled
+stops waiting as soon as a more urgent request is queued; a batch already
+decoding is not preempted, but a caller can abandon its own request in it
+(see `InferenceFuture.abandon`).
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .fair_share import FairShare
+from .inference_priority import PRIORITY_CLASSES, PRIORITY_RANK
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceFuture(Future):
+    """Future of a queued prompt that can also be abandoned while it decodes."""
+
+    def __init__(self, abandoned: Optional[threading.Event] = None):
+        super().__init__()
+        # Setting this event (e.g. a caller's cancel event) abandons the request
+        self.abandoned = abandoned if abandoned is not None else threading.Event()
+
+    def abandon(self) -> None:
+        """Cancel the request if it is still queued, else stop decoding it at
+        the next token (the truncated output still resolves the future)."""
+        if not self.cancel():
+            self.abandoned.set()
+
+
+@dataclass
+class InferenceRequest:
+    """A single prompt waiting for generation."""
+
+    text: str
+    max_new_tokens: int
+    temperature: float
+    top_p: float
+    greedy: bool = False
+    prefix: Optional[str] = None
+    json_schema: Optional[Any] = None
+    stop: Tuple[str, ...] = ()
+    json_output: bool = False
+    priority: str = "standard"
+    learner: Optional[str] = None
+    agent: Optional[str] = None  # calling agent class, for service-time estimates
+    fair_tag: float = 0.0  # virtual start tag among learners
+    options: Dict[str, Any] = field(default_factory=dict)
+    future: InferenceFuture = field(default_factory=InferenceFuture)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def batch_key(self) -> Optional[Tuple[Any, ...]]:
+        """Requests can share a batch only if they decode with the same parameters,
+        start with the same cached prefix, follow the same output schema and
+        stop on the same conditions."""
+        if self.options:
+            return None
+        schema_key = self.json_schema if self.json_schema is None or isinstance(self.json_schema, type) else id(self.json_schema)
+        sampling = ("greedy",) if self.greedy else (self.temperature, self.top_p)
+        return (self.max_new_tokens, sampling, self.prefix, schema_key, self.stop, self.json_output)
+
+    @property
+    def rank(self) -> int:
+        return PRIORITY_RANK[self.priority]
+
+    def urgency(self, now: float, aging_seconds: float) -> Tuple[int, float, float]:
+        """Sort key: aged class rank, then fair-share tag, then arrival (lower is served first)."""
+        rank = self.rank
+        if aging_seconds > 0:
+            rank = max(rank - int((now - self.enqueued_at) // aging_seconds), 0)
+        return rank, self.fair_tag, self.enqueued_at
+
+
+class BatchMetrics:
+    """Thread-safe counters describing how full the scheduled batches are and
+    how long each priority class and learner waits in the queue."""
+
+    _WAIT_SAMPLES = 1024  # recent waits kept per class for the p95
+    _MAX_LEARNERS = 256  # most recently served learners reported
+    _SERVICE_SAMPLES = 50  # recent batch times kept per agent
+
+    def __init__(self, max_batch_size: int):
+        self._lock = threading.Lock()
+        self._max_batch_size = max_batch_size
+        self._batches = 0
+        self._requests = 0
+        self._occupancy = Counter()
+        self._queue_wait = 0.0
+        self._batch_time = 0.0
+        self._class_waits: Dict[str, Deque[float]] = {name: deque(maxlen=self._WAIT_SAMPLES) for name in PRIORITY_CLASSES}
+        self._class_requests = Counter()
+        self._class_wait_total = Counter()
+        self._class_wait_max: Dict[str, float] = {}
+        self._learners: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._service_times: Dict[Optional[str], Deque[float]] = {}
+
+    def record(self, batch: List[InferenceRequest], started_at: float, finished_at: float) -> None:
+        with self._lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._occupancy[len(batch)] += 1
+            self._queue_wait += sum(started_at - item.enqueued_at for item in batch)
+            self._batch_time += finished_at - started_at
+            for agent in {item.agent for item in batch}:
+                samples = self._service_times.setdefault(agent, deque(maxlen=self._SERVICE_SAMPLES))
+                samples.append(finished_at - started_at)
+            for item in batch:
+                wait = started_at - item.enqueued_at
+                self._class_waits[item.priority].append(wait)
+                self._class_requests[item.priority] += 1
+                self._class_wait_total[item.priority] += wait
+                self._class_wait_max[item.priority] = max(self._class_wait_max.get(item.priority, 0.0), wait)
+                self._record_learner(item.learner or "anonymous", wait)
+
+    def _record_learner(self, learner: str, wait: float) -> None:
+        stats = self._learners.pop(learner, None) or {"requests": 0, "queue_wait": 0.0, "max_queue_wait": 0.0}
+        stats["requests"] += 1
+        stats["queue_wait"] += wait
+        stats["max_queue_wait"] = max(stats["max_queue_wait"], wait)
+        self._learners[learner] = stats
+        if len(self._learners) > self._MAX_LEARNERS:
+            self._learners.popitem(last=False)
+
+    def service_time(self, agent: Optional[str] = None) -> Optional[float]:
+        """Recent mean time a request of `agent` spends decoding (its batch's
+        duration), falling back to the overall mean; None before any batch."""
+        with self._lock:
+            samples = self._service_times.get(agent)
+            if samples:
+                return sum(samples) / len(samples)
+            return self._batch_time / self._batches if self._batches else None
+
+    def _class_snapshot(self, priority: str) -> Dict[str, Any]:
+        requests = self._class_requests[priority]
+        waits = sorted(self._class_waits[priority])
+        return {
+            "requests": requests,
+            "mean_queue_wait_s": self._class_wait_total[priority] / requests if requests else 0.0,
+            "p95_queue_wait_s": waits[min(int(len(waits) * 0.95), len(waits) - 1)] if waits else 0.0,
+            "max_queue_wait_s": self._class_wait_max.get(priority, 0.0),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            batches = self._batches or 1
+            requests = self._requests or 1
+            return {
+                "batches": self._batches,
+                "requests": self._requests,
+                "max_batch_size": self._max_batch_size,
+                "mean_batch_size": self._requests / batches,
+                "mean_occupancy": self._requests / (batches * self._max_batch_size),
+                "batch_size_histogram": dict(sorted(self._occupancy.items())),
+                "mean_queue_wait_s": self._queue_wait / requests,
+                "mean_batch_time_s": self._batch_time / batches,
+                "service_time_s_by_agent": {
+                    agent or "unknown": sum(samples) / len(samples) for agent, samples in self._service_times.items()
+                },
+                "priority_classes": {name: self._class_snapshot(name) for name in PRIORITY_CLASSES},
+                "learners": {
+                    learner: {
+                        "requests": int(stats["requests"]),
+                        "mean_queue_wait_s": stats["queue_wait"] / stats["requests"],
+                        "max_queue_wait_s": stats["max_queue_wait"],
+                    }
+                    for learner, stats in self._learners.items()
+                },
+            }
+
+
+class InferenceScheduler:
+    """Owns generation for one SharedLLM and serves queued prompts in batches."""
+
+    def __init__(
+        self,
+        llm: Any,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 15.0,
+        aging_seconds: float = 5.0,
+        fair_share: Optional[FairShare] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self._llm = llm
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait = max(float(max_wait_ms), 0.0) / 1000.0
+        self.aging_seconds = max(float(aging_seconds), 0.0)  # 0: strict priority
+        self.fair_share = fair_share
+        self._batch_started_at: Optional[float] = None
+        self.metrics = BatchMetrics(self.max_batch_size)
+
+        self._queue: Deque[InferenceRequest] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._worker = threading.Thread(
+            target=self._run,
+            name=f"inference-scheduler-{getattr(llm, '_model_name', 'llm')}",
+            daemon=True,
+        )
+        self._worker.start()
+
+    @staticmethod
+    def from_config(
+        llm: Any,
+        config: Dict[str, Any],
+        priorities: Optional[Dict[str, Any]] = None,
+        fair_share: Optional[Dict[str, Any]] = None,
+    ) -> Optional["InferenceScheduler"]:
+        """Build a scheduler from the `inference.batching` section (plus the aging
+        rate of `inference.priorities` and `inference.fair_share`), or None if
+        batching is disabled."""
+        if not config.get("enabled", True):
+            return None
+        return InferenceScheduler(
+            llm,
+            max_batch_size=config.get("max_batch_size", 8),
+            max_wait_ms=config.get("max_wait_ms", 15.0),
+            aging_seconds=(priorities or {}).get("aging_seconds", 5.0),
+            fair_share=FairShare.from_config(fair_share or {}),
+        )
+
+    def submit(
+        self,
+        text: str,
+        *,
+        max_new_tokens: int,
+        temperature: float,
+        top_p: float,
+        greedy: bool = False,
+        prefix: Optional[str] = None,
+        json_schema: Optional[Any] = None,
+        stop: Optional[Sequence[str]] = None,
+        json_output: bool = False,
+        priority: str = "standard",
+        learner: Optional[str] = None,
+        agent: Optional[str] = None,
+        cancel: Optional[threading.Event] = None,
+        **options: Any,
+    ) -> InferenceFuture:
+        """Queue a rendered prompt; the returned Future resolves to the completion text.
+
+        `priority` is one of `PRIORITY_CLASSES`; `learner` identifies whose
+        request it is for fair sharing (None: anonymous) and `agent` the agent
+        class that made it, for service-time estimates. Setting `cancel`
+        abandons the request like `InferenceFuture.abandon`: it is dropped if
+        still queued, else stops decoding at the next token. Extra keyword
+        options are forwarded to `generate_batch` and make the request run
+        unbatched.
+        """
+        if priority not in PRIORITY_RANK:
+            raise ValueError(f"Unknown inference priority '{priority}'; expected one of {PRIORITY_CLASSES}")
+        request = InferenceRequest(
+            text=text,
+            max_new_tokens=max_new_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            greedy=greedy,
+            prefix=prefix,
+            json_schema=json_schema,
+            stop=tuple(stop or ()),
+            json_output=json_output,
+            priority=priority,
+            learner=learner,
+            agent=agent,
+            options={k: v for k, v in options.items() if v is not None},
+            future=InferenceFuture(abandoned=cancel),
+        )
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("InferenceScheduler has been shut down")
+            if self.fair_share is not None:
+                request.fair_tag = self.fair_share.start_tag(learner)
+            self._queue.append(request)
+            self._cond.notify()
+        return request.future
+
+    @property
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def queue_depth_by_class(self) -> Dict[str, int]:
+        with self._cond:
+            depth = Counter(item.priority for item in self._queue)
+        return {name: depth[name] for name in PRIORITY_CLASSES}
+
+    def estimate_wait(self, priority: str, default_service_s: float = 1.0) -> float:
+        """Rough seconds before a new `priority` request would start decoding.
+
+        Sums the recent service time of each queued request that would be
+        served first (same or more urgent class), spread over the batch slots,
+        plus what is left of the batch being decoded. Agents without a
+        measurement yet count `default_service_s`.
+        """
+        rank = PRIORITY_RANK[priority]
+        with self._cond:
+            ahead = [item.agent for item in self._queue if item.rank <= rank]
+            started_at = self._batch_started_at
+        service_times: Dict[Optional[str], float] = {}
+        for agent in set(ahead):
+            measured = self.metrics.service_time(agent)
+            service_times[agent] = measured if measured is not None else default_service_s
+        wait = sum(service_times[agent] for agent in ahead) / self.max_batch_size
+        if started_at is not None:
+            running = self.metrics.service_time()
+            wait += max((running if running is not None else default_service_s) - (time.perf_counter() - started_at), 0.0)
+        return wait
+
+    def queue_depth_by_learner(self) -> Dict[str, int]:
+        with self._cond:
+            return dict(Counter(item.learner or "anonymous" for item in self._queue))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work; queued requests are still served before the worker exits."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            self._worker.join()
+
+    def _pop_most_urgent(self) -> InferenceRequest:
+        now = time.perf_counter()
+        index = min(range(len(self._queue)), key=lambda i: self._queue[i].urgency(now, self.aging_seconds))
+        item = self._queue[index]
+        del self._queue[index]
+        if self.fair_share is not None:
+            self.fair_share.served(item.fair_tag)
+        return item
+
+    def _take_compatible(self, batch: List[InferenceRequest]) -> None:
+        """Move the most urgent queued requests sharing the head's decoding
+        parameters into `batch`, up to each learner's per-batch cap."""
+        key = batch[0].batch_key
+        if key is None or len(batch) >= self.max_batch_size:
+            return
+        now = time.perf_counter()
+        compatible = [item for item in self._queue if item.batch_key == key]
+        if not compatible:
+            return
+        compatible.sort(key=lambda item: item.urgency(now, self.aging_seconds))
+        per_learner = Counter(item.learner for item in batch)
+        taken = set()
+        for item in compatible:
+            if len(batch) >= self.max_batch_size:
+                break
+            if self.fair_share is not None:
+                if self.fair_share.capped(item.learner, per_learner[item.learner]):
+                    continue
+                self.fair_share.served(item.fair_tag)
+            per_learner[item.learner] += 1
+            batch.append(item)
+            taken.add(id(item))
+        if taken:
+            self._queue = deque(item for item in self._queue if id(item) not in taken)
+
+    def _more_urgent_queued(self, head: InferenceRequest) -> bool:
+        return any(item.rank < head.rank for item in self._queue)
+
+    def _collect_batch(self) -> List[InferenceRequest]:
+        with self._cond:
+            while not self._queue:
+                if self._closed:
+                    return []
+                self._cond.wait()
+
+            batch = [self._pop_most_urgent()]
+            deadline = time.perf_counter() + self.max_wait
+            while True:
+                self._take_compatible(batch)
+                remaining = deadline - time.perf_counter()
+                if (
+                    batch[0].batch_key is None
+                    or len(batch) >= self.max_batch_size
+                    or remaining <= 0
+                    or self._closed
+                    # Don't hold a more urgent (incompatible) request back to fill this batch
+                    or self._more_urgent_queued(batch[0])
+                ):
+                    return batch
+                self._cond.wait(timeout=remaining)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            if not batch:
+                return
+            # Drop requests whose callers cancelled or abandoned them while they were queued
+            for item in batch:
+                if item.future.abandoned.is_set():
+                    item.future.cancel()
+            batch = [item for item in batch if item.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            head = batch[0]
+            started_at = time.perf_counter()
+            self._batch_started_at = started_at
+            try:
+                outputs = self._llm.generate_batch(
+                    [item.text for item in batch],
+                    max_new_tokens=head.max_new_tokens,
+                    temperature=head.temperature,
+                    top_p=head.top_p,
+                    greedy=head.greedy,
+                    prefix=head.prefix,
+                    json_schema=head.json_schema,
+                    stop=head.stop,
+                    json_output=head.json_output,
+                    abandoned=[item.future.abandoned for item in batch],
+                    **head.options,
+                )
+            except Exception as exc:
+                self._batch_started_at = None
+                logger.error(f"Batched generation failed ({len(batch)} prompts): {exc}")
+                for item in batch:
+                    item.future.set_exception(exc)
+                continue
+
+            self._batch_started_at = None
+            self.metrics.record(batch, started_at, time.perf_counter())
+            for item, output in zip(batch, outputs):
+                item.future.set_result(output)
@@ -0,0 +1,664 @@
+"""
+Schema-constrained JSON decoding for SharedLLM.
+
+`compile_schema` turns a Pydantic model (or a JSON schema dict) into a tree of
+schema nodes. `JSONSchemaMatcher` walks generated text through that tree one
+character at a time, and `JSONSchemaLogitsProcessor` masks every candidate
+token whose text the matcher rejects. The first pass therefore always yields
+JSON that parses and has the schema's shape: declared keys only, required keys
+present, enum values respected, and nothing after the closing brace.
+
+Only the highest-scoring `candidate_tokens` of each step are checked. When
+none of them fit, the rest of the vocabulary is searched in score order, but
+only among tokens whose first character the matcher can take next (looked up
+in an index of the vocabulary by first character).
+
+`JSONEndCriteria` is the lighter, unconstrained counterpart: it only stops
+generation once the top-level JSON value is balanced.
+"""
+
+import copy
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import torch
+from transformers import LogitsProcessor, StoppingCriteria
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_START = "-0123456789"
+_ESCAPES = '"\\/bfnrt'
+_HEX = "0123456789abcdefABCDEF"
+
+
+# ---------------------------------------------------------------------------
+# Schema nodes
+# ---------------------------------------------------------------------------
+
+
+class _AnyNode:
+    """Any JSON value."""
+
+
+@dataclass(eq=False)
+class _ObjectNode:
+    properties: Dict[str, Any]
+    required: FrozenSet[str]
+    additional: Optional[Any]  # node for undeclared keys, or None to forbid them
+
+
+@dataclass(eq=False)
+class _ArrayNode:
+    items: Any
+    min_items: int = 0
+    max_items: Optional[int] = None
+
+
+class _StringNode:
+    """Any JSON string."""
+
+
+@dataclass(eq=False)
+class _NumberNode:
+    integer: bool = False
+
+
+@dataclass(eq=False)
+class _LiteralNode:
+    values: Tuple[str, ...]  # serialized JSON texts, e.g. 'true', '"beginner"', '3'
+
+
+@dataclass(eq=False)
+class _UnionNode:
+    options: Tuple[Any, ...]
+
+
+@dataclass(eq=False)
+class _RefNode:
+    target: Any = None
+
+
+ANY = _AnyNode()
+_STRING = _StringNode()
+_GENERIC_OBJECT = _ObjectNode(properties={}, required=frozenset(), additional=ANY)
+_GENERIC_ARRAY = _ArrayNode(items=ANY)
+_GENERIC_NUMBER = _NumberNode()
+_GENERIC_LITERALS = _LiteralNode(values=("true", "false", "null"))
+
+
+def _resolve(node: Any) -> Any:
+    while isinstance(node, _RefNode):
+        node = node.target
+    return node
+
+
+def _literal(values: Sequence[Any]) -> _LiteralNode:
+    return _LiteralNode(values=tuple(json.dumps(v, ensure_ascii=False) for v in values))
+
+
+def _compile(schema: Any, defs: Dict[str, Any], refs: Dict[str, _RefNode]) -> Any:
+    if schema is True or not isinstance(schema, dict) or not schema:
+        return ANY
+    if "$ref" in schema:
+        name = schema["$ref"].rsplit("/", 1)[-1]
+        if name not in refs:
+            refs[name] = _RefNode()
+            refs[name].target = _compile(defs.get(name, {}), defs, refs)
+        return refs[name]
+    if "const" in schema:
+        return _literal([schema["const"]])
+    if "enum" in schema:
+        return _literal(schema["enum"])
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            options = tuple(_compile(option, defs, refs) for option in schema[key])
+            return options[0] if len(options) == 1 else _UnionNode(options)
+    if "allOf" in schema and len(schema["allOf"]) == 1:
+        return _compile(schema["allOf"][0], defs, refs)
+
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        return _UnionNode(tuple(_compile({**schema, "type": t}, defs, refs) for t in schema_type))
+    if schema_type == "object" or (schema_type is None and "properties" in schema):
+        properties = {name: _compile(sub, defs, refs) for name, sub in schema.get("properties", {}).items()}
+        additional = schema.get("additionalProperties")
+        if isinstance(additional, dict):
+            additional_node = _compile(additional, defs, refs)
+        elif additional is False or (additional is None and properties):
+            additional_node = None  # Pydantic models: only declared fields
+        else:
+            additional_node = ANY
+        return _ObjectNode(properties, frozenset(schema.get("required", ())), additional_node)
+    if schema_type == "array":
+        return _ArrayNode(
+            items=_compile(schema.get("items", {}), defs, refs),
+            min_items=int(schema.get("minItems", 0)),
+            max_items=schema.get("maxItems"),
+        )
+    if schema_type == "string":
+        return _STRING
+    if schema_type in ("integer", "number"):
+        return _NumberNode(integer=schema_type == "integer")
+    if schema_type == "boolean":
+        return _LiteralNode(values=("true", "false"))
+    if schema_type == "null":
+        return _LiteralNode(values=("null",))
+    return ANY
+
+
+_compiled: Dict[Any, Any] = {}
+
+
+def compile_schema(schema: Any) -> Any:
+    """Compile a Pydantic model class or JSON schema dict into matcher nodes (cached)."""
+    key = schema if isinstance(schema, type) else json.dumps(schema, sort_keys=True)
+    node = _compiled.get(key)
+    if node is None:
+        json_schema = schema.model_json_schema() if hasattr(schema, "model_json_schema") else schema
+        node = _compile(json_schema, json_schema.get("$defs", {}), {})
+        _compiled[key] = node
+    return node
+
+
+# ---------------------------------------------------------------------------
+# Character-level matcher
+# ---------------------------------------------------------------------------
+
+# Frame.feed results
+_ACCEPT, _REJECT, _POP, _POP_RETRY, _RETRY = range(5)
+
+
+def _start_frame(node: Any, char: str) -> Optional[Any]:
+    """Frame for a value of `node` whose first character is `char`, or None."""
+    node = _resolve(node)
+    if isinstance(node, _UnionNode):
+        frames = [frame for frame in (_start_frame(option, char) for option in node.options) if frame is not None]
+        if len(frames) == 1:
+            return frames[0]
+        # Several alternatives start alike (e.g. two object shapes): accept any JSON value
+        return _start_frame(ANY, char) if frames else None
+    if isinstance(node, _AnyNode):
+        for generic in (_GENERIC_OBJECT, _GENERIC_ARRAY, _STRING, _GENERIC_NUMBER, _GENERIC_LITERALS):
+            frame = _start_frame(generic, char)
+            if frame is not None:
+                return frame
+        return None
+    if isinstance(node, _ObjectNode):
+        return _ObjectFrame(node) if char == "{" else None
+    if isinstance(node, _ArrayNode):
+        return _ArrayFrame(node) if char == "[" else None
+    if isinstance(node, _StringNode):
+        return _StringFrame() if char == '"' else None
+    if isinstance(node, _NumberNode):
+        return _NumberFrame(node.integer) if char in _NUMBER_START else None
+    if isinstance(node, _LiteralNode):
+        return _LiteralFrame(node.values) if any(v.startswith(char) for v in node.values) else None
+    return None
+
+
+@dataclass
+class _ValueFrame:
+    node: Any
+
+    def feed(self, char: str, stack: List[Any]) -> int:
+        if char in _WHITESPACE:
+            return _ACCEPT
+        frame = _start_frame(self.node, char)
+        if frame is None:
+            return _REJECT
+        stack[-1] = frame
+        return _RETRY
+
+
+@dataclass
+class _ObjectFrame:
+    node: _ObjectNode
+    state: str = "open"
+    key: str = ""
+    escaped: bool = False
+    seen: FrozenSet[str] = frozenset()
+
+    def _open_keys(self) -> List[str]:
+        return [name for name in self.node.properties if name not in self.seen]
+
+    def _can_add_key(self) -> bool:
+        return self.node.additional is not None or bool(self._open_keys())
+
+    def _can_close(self) -> bool:
+        return self.node.required <= self.seen
+
+    def feed(self, char: str, stack: List[Any]) -> int:
+        state = self.state
+        if state == "open":
+            if char != "{":
+                return _REJECT
+            self.state = "key_or_end"
+            return _ACCEPT
+        if state == "in_key":
+            return self._feed_key(char)
+        if char in _WHITESPACE:
+            return _ACCEPT
+        if state in ("key_or_end", "key") and char == '"' and self._can_add_key():
+            self.state, self.key, self.escaped = "in_key", "", False
+            return _ACCEPT
+        if state in ("key_or_end", "after_value") and char == "}":
+            return _POP if self._can_close() else _REJECT
+        if state == "colon" and char == ":":
+            self.state = "after_value"
+            self.seen = self.seen | {self.key}
+            value_node = self.node.properties.get(self.key, self.node.additional)
+            stack.append(_ValueFrame(value_node))
+            return _ACCEPT
+        if state == "after_value" and char == "," and self._can_add_key():
+            self.state = "key"
+            return _ACCEPT
+        return _REJECT
+
+    def _feed_key(self, char: str) -> int:
+        if self.node.additional is not None:
+            # Free-form key: any JSON string not used yet
+            if self.escaped:
+                if char not in _ESCAPES:
+                    return _REJECT
+                self.escaped = False
+                self.key += char
+                return _ACCEPT
+            if char == "\\":
+                self.escaped = True
+                return _ACCEPT
+            if char == '"':
+                if self.key in self.seen:
+                    return _REJECT
+                self.state = "colon"
+                return _ACCEPT
+            if ord(char) < 0x20:
+                return _REJECT
+            self.key += char
+            return _ACCEPT
+        # Declared keys only: the key so far must prefix one not used yet
+        open_keys = self._open_keys()
+        if char == '"':
+            if self.key not in open_keys:
+                return _REJECT
+            self.state = "colon"
+            return _ACCEPT
+        candidate = self.key + char
+        if not any(name.startswith(candidate) for name in open_keys):
+            return _REJECT
+        self.key = candidate
+        return _ACCEPT
+
+
+@dataclass
+class _ArrayFrame:
+    node: _ArrayNode
+    state: str = "open"
+    count: int = 0
+
+    def feed(self, char: str, stack: List[Any]) -> int:
+        if self.state == "open":
+            if char != "[":
+                return _REJECT
+            self.state = "first"
+            return _ACCEPT
+        if char in _WHITESPACE:
+            return _ACCEPT
+        max_items = self.node.max_items
+        if char == "]":
+            return _POP if self.count >= self.node.min_items else _REJECT
+        if self.state == "first":
+            if max_items == 0:
+                return _REJECT
+            self.state, self.count = "after_item", 1
+            stack.append(_ValueFrame(self.node.items))
+            return _RETRY
+        if char == "," and (max_items is None or self.count < max_items):
+            self.count += 1
+            stack.append(_ValueFrame(self.node.items))
+            return _ACCEPT
+        return _REJECT
+
+
+@dataclass
+class _StringFrame:
+    state: str = "open"
+    hex_left: int = 0
+
+    def feed(self, char: str, stack: List[Any]) -> int:
+        state = self.state
+        if state == "body":
+            if char == '"':
+                return _POP
+            if char == "\\":
+                self.state = "escape"
+                return _ACCEPT
+            return _REJECT if ord(char) < 0x20 else _ACCEPT
+        if state == "open":
+            if char != '"':
+                return _REJECT
+            self.state = "body"
+            return _ACCEPT
+        if state == "escape":
+            if char == "u":
+                self.state, self.hex_left = "unicode", 4
+                return _ACCEPT
+            if char in _ESCAPES:
+                self.state = "body"
+                return _ACCEPT
+            return _REJECT
+        # unicode escape
+        if char not in _HEX:
+            return _REJECT
+        self.hex_left -= 1
+        if self.hex_left == 0:
+            self.state = "body"
+        return _ACCEPT
+
+
+# state -> (accepting, {char class: next state})
+_NUMBER_STATES = {
+    "start": (False, {"-": "minus", "0": "zero", "1-9": "int"}),
+    "minus": (False, {"0": "zero", "1-9": "int"}),
+    "zero": (True, {".": "dot", "e": "exp"}),
+    "int": (True, {"0": "int", "1-9": "int", ".": "dot", "e": "exp"}),
+    "dot": (False, {"0": "frac", "1-9": "frac"}),
+    "frac": (True, {"0": "frac", "1-9": "frac", "e": "exp"}),
+    "exp": (False, {"+-": "exp_sign", "0": "exp_digits", "1-9": "exp_digits"}),
+    "exp_sign": (False, {"0": "exp_digits", "1-9": "exp_digits"}),
+    "exp_digits": (True, {"0": "exp_digits", "1-9": "exp_digits"}),
+}
+
+
+def _char_class(char: str) -> str:
+    if char == "0":
+        return "0"
+    if "1" <= char <= "9":
+        return "1-9"
+    if char in "eE":
+        return "e"
+    if char in "+-":
+        return "+-" if char == "+" else "-"
+    return char
+
+
+@dataclass
+class _NumberFrame:
+    integer: bool
+    state: str = "start"
+
+    def feed(self, char: str, stack: List[Any]) -> int:
+        accepting, transitions = _NUMBER_STATES[self.state]
+        cls = _char_class(char)
+        if self.state == "exp" and cls == "-":
+            cls = "+-"
+        next_state = transitions.get(cls)
+        if next_state is not None and not (self.integer and next_state in ("dot", "exp")):
+            self.state = next_state
+            return _ACCEPT
+        # The number ends at the first character that cannot extend it
+        return _POP_RETRY if accepting else _REJECT
+
+
+@dataclass
+class _LiteralFrame:
+    values: Tuple[str, ...]
+    text: str = ""
+
+    def feed(self, char: str, stack: List[Any]) -> int:
+        candidate = self.text + char
+        matches = [v for v in self.values if v.startswith(candidate)]
+        if matches:
+            self.text = candidate
+            if candidate in self.values and len(matches) == 1:
+                return _POP
+            return _ACCEPT
+        return _POP_RETRY if self.text in self.values else _REJECT
+
+
+class JSONSchemaMatcher:
+    """Incremental validator for JSON text against a compiled schema."""
+
+    def __init__(self, node: Any):
+        self._stack: List[Any] = [_ValueFrame(node)]
+
+    def clone(self) -> "JSONSchemaMatcher":
+        other = JSONSchemaMatcher.__new__(JSONSchemaMatcher)
+        other._stack = [copy.copy(frame) for frame in self._stack]
+        return other
+
+    @property
+    def complete(self) -> bool:
+        """True once a whole top-level value has been matched."""
+        return not self._stack
+
+    def feed(self, text: str) -> bool:
+        """Advance over `text`; returns False (leaving the matcher unusable) on the first invalid character."""
+        for char in text:
+            if not self._feed_char(char):
+                return False
+        return True
+
+    def _feed_char(self, char: str) -> bool:
+        stack = self._stack
+        while True:
+            if not stack:
+                return char in _WHITESPACE
+            result = stack[-1].feed(char, stack)
+            if result == _ACCEPT:
+                return True
+            if result == _REJECT:
+                return False
+            if result == _POP:
+                stack.pop()
+                return True
+            if result == _POP_RETRY:
+                stack.pop()
+            # _RETRY: the top of the stack changed; feed the same character again
+
+
+# ---------------------------------------------------------------------------
+# Token-level masking
+# ---------------------------------------------------------------------------
+
+
+class TokenVocabulary:
+    """Decoded text of every token id, as it appears when appended to generated text."""
+
+    def __init__(self, tokenizer: Any):
+        size = len(tokenizer)
+        # Decoding after an anchor token keeps leading spaces that SentencePiece
+        # tokenizers drop when a token is decoded on its own
+        anchor = tokenizer("a", add_special_tokens=False)["input_ids"][-1]
+        anchor_text = tokenizer.decode([anchor])
+        decoded = tokenizer.batch_decode([[anchor, token_id] for token_id in range(size)])
+        special = set(tokenizer.all_special_ids)
+        self.texts: List[str] = [
+            "" if token_id in special else (text[len(anchor_text):] if text.startswith(anchor_text) else text)
+            for token_id, text in enumerate(decoded)
+        ]
+        # Token ids by first character: a token can only fit where its first character does
+        self.by_first_char: Dict[str, List[int]] = {}
+        for token_id, text in enumerate(self.texts):
+            if text:
+                self.by_first_char.setdefault(text[0], []).append(token_id)
+
+    def text(self, token_id: int) -> str:
+        return self.texts[token_id] if 0 <= token_id < len(self.texts) else ""
+
+
+@dataclass
+class _RowState:
+    token_ids: List[int] = field(default_factory=list)
+    matchers: List[JSONSchemaMatcher] = field(default_factory=list)  # matchers[i] is the state after i tokens
+    failed: bool = False
+
+
+class JSONSchemaLogitsProcessor(LogitsProcessor):
+    """Masks tokens that would take each sequence outside the JSON schema.
+
+    Matcher states are kept per generated position, so the processor also
+    works when assisted decoding rolls back rejected draft tokens.
+    """
+
+    def __init__(self, node: Any, vocabulary: TokenVocabulary, eos_token_ids: Sequence[int], candidate_tokens: int = 32):
+        self._node = node
+        self._vocabulary = vocabulary
+        self._eos = [int(t) for t in eos_token_ids]
+        self._candidate_tokens = max(int(candidate_tokens), 1)
+        self._prompt_length: Optional[int] = None
+        self._rows: List[_RowState] = []
+
+    def _advance(self, row: _RowState, generated: List[int]) -> Optional[JSONSchemaMatcher]:
+        """Matcher state after `generated`, reusing the states computed for a common prefix."""
+        common = 0
+        limit = min(len(row.token_ids), len(generated))
+        while common < limit and row.token_ids[common] == generated[common]:
+            common += 1
+        del row.token_ids[common:]
+        del row.matchers[common + 1:]
+        matcher = row.matchers[common]
+        for token_id in generated[common:]:
+            if matcher.complete:
+                break  # tokens after the end of the value (EOS, padding) are not JSON
+            matcher = matcher.clone()
+            if not matcher.feed(self._vocabulary.text(token_id)):
+                return None
+            row.token_ids.append(token_id)
+            row.matchers.append(matcher)
+        return matcher
+
+    def _accepts(self, matcher: JSONSchemaMatcher, token_id: int) -> bool:
+        text = self._vocabulary.text(token_id)
+        return bool(text) and matcher.clone().feed(text)
+
+    def _allowed(self, matcher: JSONSchemaMatcher, scores: torch.Tensor) -> List[int]:
+        if matcher.complete:
+            return self._eos
+        k = min(self._candidate_tokens, scores.shape[-1])
+        top = torch.topk(scores, k).indices.tolist()
+        allowed = [t for t in top if self._accepts(matcher, t)]
+        if not allowed:
+            fallback = self._best_fitting(matcher, scores, skip=set(top))
+            if fallback is not None:
+                allowed.append(fallback)
+        return allowed or self._eos
+
+    def _best_fitting(self, matcher: JSONSchemaMatcher, scores: torch.Tensor, skip: set) -> Optional[int]:
+        """Highest-scoring token the matcher accepts, checking only tokens whose first character it accepts."""
+        candidates = [
+            token_id
+            for char, token_ids in self._vocabulary.by_first_char.items()
+            if matcher.clone().feed(char)
+            for token_id in token_ids
+            if token_id not in skip and token_id < scores.shape[-1]
+        ]
+        if not candidates:
+            return None
+        order = torch.argsort(scores[torch.tensor(candidates, device=scores.device)], descending=True)
+        for index in order.tolist():
+            if self._accepts(matcher, candidates[index]):
+                return candidates[index]
+        return None
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        if self._prompt_length is None:
+            self._prompt_length = input_ids.shape[1]
+            self._rows = [_RowState(matchers=[JSONSchemaMatcher(self._node)]) for _ in range(input_ids.shape[0])]
+
+        mask = torch.full_like(scores, float("-inf"))
+        for index, row in enumerate(self._rows):
+            if row.failed:
+                mask[index] = 0
+                continue
+            matcher = self._advance(row, input_ids[index, self._prompt_length:].tolist())
+            if matcher is None:
+                # Only reachable if a token was forced past the mask; stop constraining this row
+                logger.warning("Constrained decoding lost track of the JSON schema; continuing unconstrained")
+                row.failed = True
+                mask[index] = 0
+                continue
+            mask[index, self._allowed(matcher, scores[index])] = 0
+        return scores + mask
+
+
+# ---------------------------------------------------------------------------
+# Stopping at the end of the top-level value
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _BalanceState:
+    text: str = ""
+    start: int = 0  # where the answer begins (after a <think> block)
+    scanned: int = 0
+    depth: int = 0
+    started: bool = False
+    in_string: bool = False
+    escaped: bool = False
+    done: bool = False
+
+
+class JSONEndCriteria(StoppingCriteria):
+    """Stops each sequence once its first top-level JSON object/array is balanced.
+
+    Braces inside strings are ignored, and so is a leading `<think>...</think>`
+    block of reasoning models. Prose may precede an object, but an array only
+    counts when it opens the answer (optionally inside a code fence), so a
+    bracketed aside is not mistaken for the value.
+    """
+
+    def __init__(self, vocabulary: TokenVocabulary, prompt_length: int):
+        self._vocabulary = vocabulary
+        self._prompt_length = prompt_length
+        self._rows: List[_BalanceState] = []
+        self._seen: List[int] = []
+
+    def _scan(self, row: _BalanceState) -> None:
+        text = row.text
+        answer = text.lstrip()
+        if row.scanned == 0 and (answer.startswith("<think>") or "<think>".startswith(answer)):
+            end = text.find("</think>")
+            if end == -1:
+                return  # still thinking (or not yet sure whether a think block opens)
+            row.start = row.scanned = end + len("</think>")
+        for index in range(row.scanned, len(text)):
+            char = text[index]
+            if row.in_string:
+                if row.escaped:
+                    row.escaped = False
+                elif char == "\\":
+                    row.escaped = True
+                elif char == '"':
+                    row.in_string = False
+            elif char == '"' and row.started:
+                row.in_string = True
+            elif char == "{" or (char == "[" and (row.started or self._opens_answer(text[row.start:index]))):
+                row.started = True
+                row.depth += 1
+            elif char in "}]" and row.started:
+                row.depth -= 1
+                if row.depth == 0:
+                    row.done = True
+                    break
+        row.scanned = len(text)
+
+    @staticmethod
+    def _opens_answer(preceding: str) -> bool:
+        return preceding.strip() in ("", "```", "```json")
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        if not self._rows:
+            self._rows = [_BalanceState() for _ in range(input_ids.shape[0])]
+            self._seen = [self._prompt_length] * input_ids.shape[0]
+        finished = []
+        for index, row in enumerate(self._rows):
+            if not row.done:
+                new_ids = input_ids[index, self._seen[index]:].tolist()
+                self._seen[index] = input_ids.shape[1]
+                row.text += "".join(self._vocabulary.text(token_id) for token_id in new_ids)
+                self._scan(row)
+            finished.append(row.done)
+        return torch.tensor(finished, dtype=torch.bool, device=input_ids.device)
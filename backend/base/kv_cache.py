@@ -0,0 +1,242 @@
+"""
+KV-cache stores for SharedLLM.
+
+`PrefixKVCache` keeps precomputed `past_key_values` for static prompt prefixes
+(the rendered system prompt of each agent) so generation only prefills the
+request-specific suffix. Entries are evicted least-recently-used once the
+configured memory budget is exceeded.
+
+`ConversationKVCache` keeps the KV state of multi-turn sessions between
+turns, keyed by conversation id.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def cache_nbytes(past_key_values: Any) -> int:
+    """Approximate device memory held by a transformers KV cache."""
+    tensors = []
+    layers = getattr(past_key_values, "layers", None)
+    if layers is not None:
+        for layer in layers:
+            tensors.extend((getattr(layer, "keys", None), getattr(layer, "values", None)))
+    elif hasattr(past_key_values, "key_cache"):
+        tensors.extend(past_key_values.key_cache)
+        tensors.extend(past_key_values.value_cache)
+    else:
+        for layer in past_key_values:
+            tensors.extend(layer)
+    return sum(t.numel() * t.element_size() for t in tensors if t is not None and hasattr(t, "numel"))
+
+
+def token_key(model_name: str, token_ids: Any) -> Tuple[str, str]:
+    """Cache key for a model plus an exact token sequence."""
+    ids = token_ids.tolist() if hasattr(token_ids, "tolist") else list(token_ids)
+    digest = hashlib.sha1(",".join(map(str, ids)).encode("utf-8")).hexdigest()
+    return (model_name, digest)
+
+
+class PrefixKVCache:
+    """LRU store of prefix KV caches bounded by a memory budget."""
+
+    def __init__(self, max_bytes: int, min_prefix_tokens: int = 32):
+        self.max_bytes = int(max_bytes)
+        self.min_prefix_tokens = int(min_prefix_tokens)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def from_config(config: Dict[str, Any]) -> Optional["PrefixKVCache"]:
+        """Build from the `inference.prefix_cache` section, or None if disabled."""
+        if not config.get("enabled", True):
+            return None
+        return PrefixKVCache(
+            max_bytes=int(float(config.get("max_memory_mb", 1024)) * 1024 ** 2),
+            min_prefix_tokens=config.get("min_prefix_tokens", 32),
+        )
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached KV state for `key` (callers must copy before mutating it)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, past_key_values: Any) -> None:
+        nbytes = cache_nbytes(past_key_values)
+        if nbytes > self.max_bytes:
+            logger.warning(f"Prefix KV cache entry ({nbytes / 1024 ** 2:.1f}MB) exceeds the memory budget; not cached")
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (past_key_values, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "memory_mb": self._bytes / 1024 ** 2,
+                "max_memory_mb": self.max_bytes / 1024 ** 2,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+
+@dataclass
+class _ConversationState:
+    token_ids: List[int]
+    past_key_values: Any
+    nbytes: int
+    last_used: float = field(default_factory=time.monotonic)
+
+
+def _common_prefix_length(a: List[int], b: List[int]) -> int:
+    limit = min(len(a), len(b))
+    idx = 0
+    while idx < limit and a[idx] == b[idx]:
+        idx += 1
+    return idx
+
+
+class ConversationKVCache:
+    """Per-conversation KV state so each turn only prefills newly appended tokens.
+
+    A conversation's entry holds the tokens already processed (prompt plus the
+    generated reply) and their KV cache. The next turn reuses the longest
+    common token prefix with its new prompt; everything after it is cropped
+    and recomputed. Idle conversations expire after `ttl_seconds`, and the
+    least recently used ones are evicted beyond `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float = 1800.0):
+        self.max_bytes = int(max_bytes)
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries: "OrderedDict[str, _ConversationState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._reused_tokens = 0
+        self._prefilled_tokens = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @staticmethod
+    def from_config(config: Dict[str, Any]) -> Optional["ConversationKVCache"]:
+        """Build from the `inference.conversation_cache` section, or None if disabled."""
+        if not config.get("enabled", True):
+            return None
+        return ConversationKVCache(
+            max_bytes=int(float(config.get("max_memory_mb", 4096)) * 1024 ** 2),
+            ttl_seconds=config.get("ttl_seconds", 1800),
+        )
+
+    def _drop(self, conversation_id: str) -> Optional[_ConversationState]:
+        state = self._entries.pop(conversation_id, None)
+        if state is not None:
+            self._bytes -= state.nbytes
+        return state
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        for conversation_id, state in list(self._entries.items()):
+            if state.last_used < cutoff:
+                self._drop(conversation_id)
+                self._expirations += 1
+
+    def checkout(self, conversation_id: str, token_ids: List[int]) -> Tuple[Optional[Any], int]:
+        """Take the reusable KV state for a new prompt of `conversation_id`.
+
+        Returns `(past_key_values, reused_tokens)`; the cache is cropped to the
+        reused prefix and removed from the store until `store` is called again,
+        so concurrent turns of one conversation never share a mutable cache.
+        """
+        with self._lock:
+            self._expire()
+            state = self._drop(conversation_id)
+            if state is None:
+                self._misses += 1
+                self._prefilled_tokens += len(token_ids)
+                return None, 0
+            # generate() needs at least one uncached token to produce logits from
+            reused = min(_common_prefix_length(state.token_ids, token_ids), len(token_ids) - 1)
+            if reused <= 0:
+                self._misses += 1
+                self._prefilled_tokens += len(token_ids)
+                return None, 0
+            self._hits += 1
+            self._reused_tokens += reused
+            self._prefilled_tokens += len(token_ids) - reused
+        past_key_values = state.past_key_values
+        past_key_values.crop(reused)
+        return past_key_values, reused
+
+    def store(self, conversation_id: str, token_ids: List[int], past_key_values: Any) -> None:
+        """Record the processed tokens of a finished turn and their KV state."""
+        nbytes = cache_nbytes(past_key_values)
+        if nbytes > self.max_bytes:
+            logger.warning(f"Conversation {conversation_id} KV cache ({nbytes / 1024 ** 2:.1f}MB) exceeds the memory budget; not cached")
+            return
+        with self._lock:
+            self._drop(conversation_id)
+            self._entries[conversation_id] = _ConversationState(list(token_ids), past_key_values, nbytes)
+            self._bytes += nbytes
+            self._expire()
+            while self._bytes > self.max_bytes and self._entries:
+                evicted_id = next(iter(self._entries))
+                self._drop(evicted_id)
+                self._evictions += 1
+
+    def invalidate(self, conversation_id: str) -> bool:
+        with self._lock:
+            return self._drop(conversation_id) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire()
+            return {
+                "conversations": len(self._entries),
+                "memory_mb": self._bytes / 1024 ** 2,
+                "max_memory_mb": self.max_bytes / 1024 ** 2,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "reused_tokens": self._reused_tokens,
+                "prefilled_tokens": self._prefilled_tokens,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
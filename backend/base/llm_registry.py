@@ -0,0 +1,164 @@
+"""
+Process-wide registry of LLM clients.
+
+Building a client per request is not free: a `SharedLLMWrapper` re-resolves
+its model, and an external provider client opens a new HTTP connection pool
+(and TLS handshake) on first use. The registry memoizes clients by provider,
+model, temperature, max_tokens and base_url (plus any other creation
+argument) and hands the same instance to every caller. The chat model classes
+used here keep no per-call state, so instances are safe to share across
+threads.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+
+from .llm_factory import LLMFactory
+from .llm_router import RouterChatModel, create_router, routing_config
+from .shared_llm_wrapper import create_shared_llm_wrapper
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Client:
+    llm: BaseChatModel
+    label: str
+    construction_s: float
+    hits: int = 0
+
+
+def _secret_digest(value: Optional[str]) -> Optional[str]:
+    # Keys stay distinct per credential without keeping the credential itself in the key
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:16] if value else None
+
+
+class LLMClientRegistry:
+    """Memoizes LLM clients by their construction parameters."""
+
+    def __init__(self):
+        self._clients: Dict[Hashable, _Client] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._misses = 0
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], BaseChatModel], label: str = "") -> BaseChatModel:
+        """Return the client registered under `key`, building it with `factory` once."""
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                client.hits += 1
+                return client.llm
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Construct outside the registry lock so slow clients don't block other keys
+        with key_lock:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is not None:
+                    client.hits += 1
+                    return client.llm
+            start = time.perf_counter()
+            llm = factory()
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._clients[key] = _Client(llm=llm, label=label or repr(key), construction_s=elapsed)
+                self._misses += 1
+            logger.info(f"🔌 Created LLM client {label or key} in {elapsed * 1000:.1f}ms")
+            return llm
+
+    def create(
+        self,
+        model: Optional[str] = None,
+        model_provider: Optional[str] = None,
+        temperature: float = 0.3,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        use_shared_llm: bool = True,
+        **kwargs: Any,
+    ) -> BaseChatModel:
+        """Memoized `LLMFactory.create` (same arguments)."""
+        key: Tuple[Any, ...] = (
+            "factory",
+            model_provider,
+            model,
+            temperature,
+            kwargs.get("max_tokens"),
+            base_url,
+            use_shared_llm,
+            _secret_digest(api_key),
+            tuple(sorted((name, repr(value)) for name, value in kwargs.items())),
+        )
+        label = f"{model_provider}:{model} (temperature={temperature}, max_tokens={kwargs.get('max_tokens')})"
+        return self.get_or_create(
+            key,
+            lambda: LLMFactory.create(
+                model=model,
+                model_provider=model_provider,
+                temperature=temperature,
+                base_url=base_url,
+                api_key=api_key,
+                use_shared_llm=use_shared_llm,
+                **kwargs,
+            ),
+            label=label,
+        )
+
+    def shared_wrapper(self, temperature: float = 0.3, max_tokens: int = 6144, model_name: Optional[str] = None) -> BaseChatModel:
+        """Memoized `create_shared_llm_wrapper`."""
+        key = ("shared_wrapper", model_name, temperature, max_tokens)
+        label = f"shared:{model_name or 'default'} (temperature={temperature}, max_tokens={max_tokens})"
+        return self.get_or_create(
+            key,
+            lambda: create_shared_llm_wrapper(temperature=temperature, max_tokens=max_tokens, model_name=model_name),
+            label=label,
+        )
+
+    def router(self) -> RouterChatModel:
+        """The router over the backends of `inference.routing` (built once)."""
+
+        def create_backend(provider: str, model: Optional[str] = None, **settings: Any) -> BaseChatModel:
+            return self.create(model=model, model_provider=provider, use_shared_llm=provider == "shared", **settings)
+
+        return self.get_or_create(("router",), lambda: create_router(routing_config(), create_backend), label="router")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+            self._key_locks.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = sum(client.hits for client in self._clients.values())
+            lookups = hits + self._misses
+            return {
+                "clients": len(self._clients),
+                "hits": hits,
+                "misses": self._misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "construction_s_total": sum(client.construction_s for client in self._clients.values()),
+                "by_client": {
+                    client.label: {"construction_ms": client.construction_s * 1000, "hits": client.hits}
+                    for client in self._clients.values()
+                },
+            }
+
+
+_registry: Optional[LLMClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_llm_registry() -> LLMClientRegistry:
+    """Process-wide LLM client registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LLMClientRegistry()
+    return _registry
@@ -0,0 +1,362 @@
+"""
+Latency-aware router over several chat model backends.
+
+`RouterChatModel` fronts named backends (the local SharedLLM, an
+OpenAI-compatible vLLM server, external providers, ...). Each call goes to the
+healthy, unsaturated backend with the lowest rolling latency among those the
+calling agent's policy allows; a backend that errors or exceeds the timeout is
+skipped in favour of the next one. Backends that accept a `cancel` event (see
+their `call_options`) are told to stop a call that timed out. A backend is unhealthy for `cooldown_seconds`
+once its rolling error rate passes `max_error_rate`, and saturated while its
+in-flight calls (or, for SharedLLM, its batching queue) reach the configured
+limit, so overflow spills to other capacity instead of queueing.
+
+Configured under `inference.routing`; policies map agent class names to
+ordered backend lists.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, AsyncIterator, Callable, ClassVar, Deque, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from utils.config import get_config_section
+
+logger = logging.getLogger(__name__)
+
+
+class BackendStats:
+    """Rolling latency and error rate of one backend."""
+
+    def __init__(self, window: int = 20):
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self.in_flight = 0
+        self.unhealthy_until = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def start(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.calls += 1
+
+    def finish(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def record(self, ok: bool, latency: Optional[float] = None, timed_out: bool = False) -> None:
+        with self._lock:
+            self._outcomes.append(ok)
+            if ok and latency is not None:
+                self._latencies.append(latency)
+            if not ok:
+                self.errors += 1
+            if timed_out:
+                self.timeouts += 1
+
+    @property
+    def latency(self) -> Optional[float]:
+        with self._lock:
+            return sum(self._latencies) / len(self._latencies) if self._latencies else None
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            return self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0
+
+    @property
+    def samples(self) -> int:
+        with self._lock:
+            return len(self._outcomes)
+
+    def snapshot(self) -> Dict[str, Any]:
+        latency = self.latency
+        return {
+            "mean_latency_s": latency,
+            "error_rate": self.error_rate,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "healthy": time.monotonic() >= self.unhealthy_until,
+        }
+
+
+class RouterChatModel(BaseChatModel):
+    """
+    Chat model that routes each call to the fastest healthy backend, with failover
+    """
+
+    timeout_seconds: float = 120.0
+    max_error_rate: float = 0.5
+    min_samples: int = 3
+    cooldown_seconds: float = 30.0
+
+    # Forwarded to backends that support them; agent_name selects the policy
+    call_options: ClassVar[Tuple[str, ...]] = ("conversation_id", "json_schema", "json_output", "greedy", "priority", "agent_name")
+
+    def __init__(
+        self,
+        backends: Dict[str, BaseChatModel],
+        policies: Optional[Dict[str, List[str]]] = None,
+        limits: Optional[Dict[str, int]] = None,
+        latency_window: int = 20,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        if not backends:
+            raise ValueError("RouterChatModel needs at least one backend")
+        self._backends = backends
+        self._policies = policies or {}
+        self._limits = limits or {}  # backend -> max in-flight (or queued) calls
+        self._stats = {name: BackendStats(latency_window) for name in backends}
+        self._pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-router")
+        for agent, names in self._policies.items():
+            unknown = [name for name in names if name not in backends]
+            if unknown:
+                raise ValueError(f"Routing policy '{agent}' names unknown backends {unknown}")
+
+    @property
+    def stops_abandoned_attempts(self) -> bool:
+        """Whether every backend can stop a losing speculative attempt."""
+        return all(getattr(backend, "stops_abandoned_attempts", False) for backend in self._backends.values())
+
+    def _policy(self, agent_name: Optional[str]) -> List[str]:
+        return self._policies.get(agent_name or "", self._policies.get("default", list(self._backends)))
+
+    def _saturated(self, name: str) -> bool:
+        limit = self._limits.get(name, 0)
+        if not limit:
+            return False
+        load = max(self._stats[name].in_flight, getattr(self._backends[name], "queue_depth", 0))
+        return load >= limit
+
+    def _route(self, agent_name: Optional[str]) -> List[str]:
+        """Backends to try, best first: available ones by rolling latency, then the rest in policy order."""
+        policy = self._policy(agent_name)
+        now = time.monotonic()
+        available = [
+            name for name in policy
+            if now >= self._stats[name].unhealthy_until and not self._saturated(name)
+        ]
+        # Unmeasured backends sort first so each gets a latency sample
+        available.sort(key=lambda name: self._stats[name].latency or 0.0)
+        return available + [name for name in policy if name not in available]
+
+    def _record(self, name: str, ok: bool, latency: Optional[float] = None, timed_out: bool = False) -> None:
+        stats = self._stats[name]
+        stats.record(ok, latency, timed_out)
+        if not ok and stats.samples >= self.min_samples and stats.error_rate > self.max_error_rate:
+            stats.unhealthy_until = time.monotonic() + self.cooldown_seconds
+            logger.warning(
+                f"⚠️ LLM backend '{name}' unhealthy (error rate {stats.error_rate:.0%}); "
+                f"skipping it for {self.cooldown_seconds:.0f}s"
+            )
+
+    def _options(self, name: str, kwargs: Dict[str, Any], cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        supported = getattr(self._backends[name], "call_options", ())
+        options = {k: v for k, v in kwargs.items() if k in supported and k not in ("agent_name", "cancel")}
+        if cancel is not None and "cancel" in supported:
+            # Set on timeout, so the backend stops work nobody waits for any more
+            options["cancel"] = cancel
+        return options
+
+    def _call(self, name: str, call: Callable[[], Any], cancel: Optional[threading.Event] = None) -> Any:
+        """Run a blocking backend call with the routing timeout; `cancel` is set if it times out."""
+        stats = self._stats[name]
+        stats.start()
+        start = time.perf_counter()
+        future = self._pool.submit(contextvars.copy_context().run, call)
+        # A timed-out call that cannot be cancelled stays in flight until it really ends
+        future.add_done_callback(lambda _: stats.finish())
+        try:
+            result = future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            future.cancel()
+            if cancel is not None:
+                cancel.set()
+            self._record(name, False, timed_out=True)
+            raise TimeoutError(f"LLM backend '{name}' timed out after {self.timeout_seconds:.0f}s")
+        except Exception:
+            self._record(name, False)
+            raise
+        self._record(name, True, time.perf_counter() - start)
+        return result
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        last_error: Optional[Exception] = None
+        for name in self._route(kwargs.get("agent_name")):
+            cancel = threading.Event()
+            backend, options = self._backends[name], self._options(name, kwargs, cancel)
+            try:
+                message = self._call(name, lambda: backend.invoke(messages, stop=stop, **options), cancel)
+                return ChatResult(generations=[ChatGeneration(message=message)])
+            except Exception as e:
+                last_error = e
+                logger.warning(f"LLM backend '{name}' failed, failing over: {e}")
+        raise last_error if last_error is not None else RuntimeError("No LLM backend available")
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        last_error: Optional[Exception] = None
+        for name in self._route(kwargs.get("agent_name")):
+            cancel = threading.Event()
+            backend, options, stats = self._backends[name], self._options(name, kwargs, cancel), self._stats[name]
+            stats.start()
+            start = time.perf_counter()
+            try:
+                message = await asyncio.wait_for(
+                    backend.ainvoke(messages, stop=stop, **options), timeout=self.timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                # Cancelling the await does not stop generation running on a worker thread
+                cancel.set()
+                self._record(name, False, timed_out=True)
+                last_error = TimeoutError(f"LLM backend '{name}' timed out after {self.timeout_seconds:.0f}s")
+                logger.warning(f"{last_error}, failing over")
+                continue
+            except Exception as e:
+                self._record(name, False)
+                last_error = e
+                logger.warning(f"LLM backend '{name}' failed, failing over: {e}")
+                continue
+            finally:
+                stats.finish()
+            self._record(name, True, time.perf_counter() - start)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        raise last_error if last_error is not None else RuntimeError("No LLM backend available")
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        """Stream from the best backend; failover is only possible before the first chunk."""
+        last_error: Optional[Exception] = None
+        for name in self._route(kwargs.get("agent_name")):
+            backend, options, stats = self._backends[name], self._options(name, kwargs), self._stats[name]
+            stats.start()
+            start = time.perf_counter()
+            started = False
+            try:
+                for chunk in backend.stream(messages, stop=stop, **options):
+                    started = True
+                    text = chunk.content if isinstance(chunk.content, str) else str(chunk.content)
+                    generation = ChatGenerationChunk(message=chunk)
+                    if run_manager:
+                        run_manager.on_llm_new_token(text, chunk=generation)
+                    yield generation
+            except Exception as e:
+                self._record(name, False)
+                if started:
+                    raise
+                last_error = e
+                logger.warning(f"LLM backend '{name}' failed to stream, failing over: {e}")
+                continue
+            finally:
+                stats.finish()
+            self._record(name, True, time.perf_counter() - start)
+            return
+        raise last_error if last_error is not None else RuntimeError("No LLM backend available")
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """Async variant of `_stream`."""
+        last_error: Optional[Exception] = None
+        for name in self._route(kwargs.get("agent_name")):
+            backend, options, stats = self._backends[name], self._options(name, kwargs), self._stats[name]
+            stats.start()
+            start = time.perf_counter()
+            started = False
+            try:
+                async for chunk in backend.astream(messages, stop=stop, **options):
+                    started = True
+                    text = chunk.content if isinstance(chunk.content, str) else str(chunk.content)
+                    generation = ChatGenerationChunk(message=chunk)
+                    if run_manager:
+                        await run_manager.on_llm_new_token(text, chunk=generation)
+                    yield generation
+            except Exception as e:
+                self._record(name, False)
+                if started:
+                    raise
+                last_error = e
+                logger.warning(f"LLM backend '{name}' failed to stream, failing over: {e}")
+                continue
+            finally:
+                stats.finish()
+            self._record(name, True, time.perf_counter() - start)
+            return
+        raise last_error if last_error is not None else RuntimeError("No LLM backend available")
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: stats.snapshot() for name, stats in self._stats.items()}
+
+    @property
+    def _llm_type(self) -> str:
+        return "router"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"backends": list(self._backends), "policies": self._policies}
+
+
+def create_router(config: Dict[str, Any], create_backend: Callable[..., BaseChatModel]) -> RouterChatModel:
+    """Build a router from the `inference.routing` section.
+
+    `create_backend` receives each backend's settings (provider, model,
+    base_url, temperature, ...) as keyword arguments and returns its client.
+    """
+    backends: Dict[str, BaseChatModel] = {}
+    limits: Dict[str, int] = {}
+    for name, spec in (config.get("backends") or {}).items():
+        spec = dict(spec)
+        limit = int(spec.pop("max_in_flight", 0) or 0)
+        if limit:
+            limits[name] = limit
+        backends[name] = create_backend(**spec)
+    return RouterChatModel(
+        backends,
+        policies={agent: list(names) for agent, names in (config.get("policies") or {}).items()},
+        limits=limits,
+        latency_window=config.get("latency_window", 20),
+        timeout_seconds=config.get("timeout_seconds", 120.0),
+        max_error_rate=config.get("max_error_rate", 0.5),
+        min_samples=config.get("min_samples", 3),
+        cooldown_seconds=config.get("cooldown_seconds", 30.0),
+    )
+
+
+def routing_config() -> Dict[str, Any]:
+    """The `inference.routing` section ({} when absent)."""
+    return get_config_section("inference").get("routing", {})
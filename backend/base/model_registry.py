@@ -0,0 +1,217 @@
+"""
+ModelRegistry - memory-budgeted residency for SharedLLM models.
+
+Models are registered on first request but their weights are only loaded when
+a generation actually needs them. The registry tracks each model's footprint
+and, when loading one would exceed `max_memory_mb`, unloads the least recently
+used models that are not serving a request. A background reaper also unloads
+models that have been idle for longer than `idle_ttl_seconds`; an unloaded
+model is transparently reloaded on its next use.
+
+Registered models must provide `is_loaded`, `load()`, `unload()` and
+`memory_bytes()`. A model's footprint is everything it may hold while
+loaded: for SharedLLM the weights plus the budgets of its prefix and
+conversation KV caches, which fill up after the load.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from utils.config import get_config_section
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Resident:
+    model: Any
+    load_lock: threading.Lock = field(default_factory=threading.Lock)
+    in_use: int = 0
+    footprint: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    loads: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+class ModelRegistry:
+    """LRU registry of lazily loaded models bounded by a memory budget."""
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        idle_ttl_seconds: Optional[float] = None,
+        reap_interval_seconds: float = 60.0,
+    ):
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.idle_ttl_seconds = float(idle_ttl_seconds) if idle_ttl_seconds else None
+        self.reap_interval_seconds = max(float(reap_interval_seconds), 1.0)
+        self._entries: "OrderedDict[str, _Resident]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._create_locks: Dict[str, threading.Lock] = {}
+        self._reaper: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @staticmethod
+    def from_config(config: Dict[str, Any]) -> "ModelRegistry":
+        """Build from the `inference.model_registry` section (0 disables a limit)."""
+        return ModelRegistry(
+            max_bytes=int(float(config.get("max_memory_mb", 0) or 0) * 1024 ** 2),
+            idle_ttl_seconds=config.get("idle_ttl_seconds", 0),
+            reap_interval_seconds=config.get("reap_interval_seconds", 60),
+        )
+
+    def get_or_create(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return the registered model for `name`, creating (not loading) it on first use."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                return entry.model
+            create_lock = self._create_locks.setdefault(name, threading.Lock())
+
+        # Construct outside the registry lock: creating a model reads its tokenizer
+        # and config from disk or the hub, which must not stall leases of other models
+        with create_lock:
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is not None:
+                    return entry.model
+            model = factory()
+            with self._lock:
+                self._entries[name] = _Resident(model=model)
+                self._start_reaper()
+            return model
+
+    def models(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: entry.model for name, entry in self._entries.items()}
+
+    @contextmanager
+    def lease(self, name: str) -> Iterator[Any]:
+        """Mark `name` in use (so it cannot be evicted) and make sure it is loaded."""
+        with self._lock:
+            entry = self._entries[name]
+            entry.in_use += 1
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(name)
+        try:
+            self._ensure_loaded(name, entry)
+            yield entry.model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+
+    def _ensure_loaded(self, name: str, entry: _Resident) -> None:
+        with entry.load_lock:
+            if entry.model.is_loaded:
+                return
+            # Known footprint from a previous load lets us make room up front
+            self._make_room(entry.footprint, keep=name)
+            started = time.perf_counter()
+            entry.model.load()
+            with self._lock:
+                entry.footprint = entry.model.memory_bytes()
+                entry.loads += 1
+            logger.info(
+                f"📦 Loaded {name} ({entry.footprint / 1024 ** 2:.0f}MB) in {time.perf_counter() - started:.1f}s"
+            )
+            self._make_room(0, keep=name)
+
+    def _resident_bytes(self) -> int:
+        return sum(entry.footprint for entry in self._entries.values() if entry.model.is_loaded)
+
+    def _make_room(self, incoming: int, keep: str) -> None:
+        """Unload idle models, least recently used first, until `incoming` bytes fit the budget."""
+        if self.max_bytes is None:
+            return
+        with self._lock:
+            resident = self._resident_bytes()
+            for name, entry in list(self._entries.items()):
+                if resident + incoming <= self.max_bytes:
+                    return
+                if name == keep or entry.in_use or not entry.model.is_loaded:
+                    continue
+                logger.info(f"♻️ Evicting {name} to stay within the model memory budget")
+                entry.model.unload()
+                entry.evictions += 1
+                resident -= entry.footprint
+            if resident + incoming > self.max_bytes:
+                logger.warning(
+                    f"⚠️ Model memory budget exceeded ({(resident + incoming) / 1024 ** 2:.0f}MB > "
+                    f"{self.max_bytes / 1024 ** 2:.0f}MB); remaining models are in use"
+                )
+
+    def unload_idle(self) -> List[str]:
+        """Unload every model idle for longer than the TTL; returns their names."""
+        if self.idle_ttl_seconds is None:
+            return []
+        cutoff = time.monotonic() - self.idle_ttl_seconds
+        unloaded = []
+        with self._lock:
+            for name, entry in self._entries.items():
+                if entry.model.is_loaded and not entry.in_use and entry.last_used < cutoff:
+                    logger.info(f"💤 Unloading {name} after {self.idle_ttl_seconds:.0f}s idle")
+                    entry.model.unload()
+                    entry.expirations += 1
+                    unloaded.append(name)
+        return unloaded
+
+    def _start_reaper(self) -> None:
+        if self.idle_ttl_seconds is None or self._reaper is not None:
+            return
+
+        def reap() -> None:
+            while not self._stopped.wait(self.reap_interval_seconds):
+                try:
+                    self.unload_idle()
+                except Exception as exc:
+                    logger.error(f"Idle model reaper failed: {exc}")
+
+        self._reaper = threading.Thread(target=reap, name="model-registry-reaper", daemon=True)
+        self._reaper.start()
+
+    def residency(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            models = [
+                {
+                    "model_name": name,
+                    "loaded": entry.model.is_loaded,
+                    "memory_mb": entry.footprint / 1024 ** 2,
+                    "in_use": entry.in_use,
+                    "idle_seconds": now - entry.last_used,
+                    "loads": entry.loads,
+                    "evictions": entry.evictions,
+                    "expirations": entry.expirations,
+                }
+                for name, entry in reversed(self._entries.items())
+            ]
+            return {
+                "resident_memory_mb": self._resident_bytes() / 1024 ** 2,
+                "max_memory_mb": self.max_bytes / 1024 ** 2 if self.max_bytes else None,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "models": models,
+            }
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide registry configured from `inference.model_registry`."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry.from_config(get_config_section("inference").get("model_registry", {}))
+    return _registry
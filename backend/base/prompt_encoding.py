@@ -0,0 +1,152 @@
+"""
+Token-efficient rendering of structured prompt variables.
+
+`str.format` renders dicts and lists with Python `repr`: spaced separators,
+single quotes, `None`/`True` literals and every key spelled out in every
+item. Agents instead pass their variables through a `PromptEncoder`:
+
+- `repr`: the legacy rendering (values are left to `str.format`).
+- `json`: minified JSON (also applied to strings holding a JSON or Python
+  literal, as profiles and paths often arrive from the API).
+- `drop_empty`: omit None, "", [] and {} fields. Off by default: an empty
+  field can carry meaning (no mastered skills yet), so enable it only for
+  agents that don't reason about what is missing.
+- `abbreviate_keys`: replace long keys repeated within a value by short codes
+  and prefix the value with a legend, when that is shorter overall. Off by
+  default: models tend to echo abbreviations back, so enable it only for
+  agents whose output keys don't mirror their input.
+
+Encoders are selected per agent class under `inference.prompt_encoding`.
+"""
+
+import ast
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterator, Mapping
+
+from utils.config import get_config_section
+
+FORMATS = ("repr", "json")
+
+_EMPTY = (None, "", [], {})
+
+
+def _walk_keys(value: Any) -> Iterator[str]:
+    if isinstance(value, Mapping):
+        for key, item in value.items():
+            yield str(key)
+            yield from _walk_keys(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _walk_keys(item)
+
+
+def _abbreviation(key: str) -> str:
+    words = [word for word in re.split(r"[_\W]+", key) if word]
+    if len(words) > 1:
+        return "".join(word[0] for word in words).lower()
+    return key[:3].lower()
+
+
+@dataclass(frozen=True)
+class PromptEncoder:
+    """Renders prompt variables; see the module docstring for the options."""
+
+    format: str = "json"
+    drop_empty: bool = False
+    abbreviate_keys: bool = False
+    min_key_length: int = 8
+
+    def __post_init__(self):
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown prompt encoding '{self.format}'; expected one of {FORMATS}")
+
+    @staticmethod
+    def from_config(config: Mapping[str, Any]) -> "PromptEncoder":
+        return PromptEncoder(
+            format=config.get("format", "json"),
+            drop_empty=config.get("drop_empty", False),
+            abbreviate_keys=config.get("abbreviate_keys", False),
+            min_key_length=config.get("min_key_length", 8),
+        )
+
+    def encode_variables(self, variables: Mapping[str, Any]) -> Dict[str, Any]:
+        """Variables ready for `task_prompt.format(**...)`."""
+        if self.format == "repr":
+            return dict(variables)
+        return {name: self.encode(value) for name, value in variables.items()}
+
+    def encode(self, value: Any) -> Any:
+        structured = self._structured(value)
+        if structured is None:
+            return value
+        if self.drop_empty:
+            structured = self._without_empty(structured)
+        text = self._dumps(structured)
+        if self.abbreviate_keys:
+            abbreviated = self._abbreviated(structured)
+            if abbreviated is not None and len(abbreviated) < len(text):
+                return abbreviated
+        return text
+
+    @staticmethod
+    def _structured(value: Any) -> Any:
+        """The dict/list behind `value`, or None if it isn't structured data."""
+        if isinstance(value, (Mapping, list, tuple)):
+            return value
+        if isinstance(value, str) and value.lstrip()[:1] in ("{", "["):
+            for parse in (json.loads, ast.literal_eval):
+                try:
+                    parsed = parse(value)
+                except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+                    continue
+                if isinstance(parsed, (dict, list, tuple)):
+                    return parsed
+        return None
+
+    def _without_empty(self, value: Any) -> Any:
+        if isinstance(value, Mapping):
+            cleaned = {key: self._without_empty(item) for key, item in value.items()}
+            return {key: item for key, item in cleaned.items() if item not in _EMPTY}
+        if isinstance(value, (list, tuple)):
+            return [self._without_empty(item) for item in value]
+        return value
+
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+    def _abbreviated(self, value: Any) -> Any:
+        counts = Counter(_walk_keys(value))
+        candidates = sorted(key for key, count in counts.items() if count > 1 and len(key) >= self.min_key_length)
+        if not candidates:
+            return None
+        taken = set(counts)
+        codes: Dict[str, str] = {}
+        for key in candidates:
+            code, suffix = _abbreviation(key), 2
+            while code in taken:
+                code, suffix = f"{_abbreviation(key)}{suffix}", suffix + 1
+            taken.add(code)
+            codes[key] = code
+
+        def rename(item: Any) -> Any:
+            if isinstance(item, Mapping):
+                return {codes.get(str(k), k): rename(v) for k, v in item.items()}
+            if isinstance(item, (list, tuple)):
+                return [rename(v) for v in item]
+            return item
+
+        legend = ",".join(f"{code}={key}" for key, code in codes.items())
+        return f"(keys: {legend})\n{self._dumps(rename(value))}"
+
+
+def prompt_encoder(agent_name: str) -> PromptEncoder:
+    """Encoder of an agent class from `inference.prompt_encoding`: the default
+    settings, overridden field by field by the agent's entry."""
+    config = get_config_section("inference").get("prompt_encoding", {})
+    encoder = PromptEncoder.from_config(config.get("default") or {})
+    overrides = (config.get("agents") or {}).get(agent_name) or {}
+    return replace(encoder, **overrides) if overrides else encoder
@@ -0,0 +1,169 @@
+"""
+Persistent exact-match cache of SharedLLM responses.
+
+Entries are keyed by model, rendered prompt and decoding parameters and stored
+in SQLite so they survive restarts and are shared by worker processes. Entries
+expire after `ttl_seconds`; once the stored responses exceed `max_size_mb`,
+the least recently used ones are evicted. By default only greedy generations
+are cached, since a sampled response is just one draw from the model.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from utils.config import get_config_section
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def _schema_name(json_schema: Any) -> Optional[str]:
+    if json_schema is None:
+        return None
+    if isinstance(json_schema, type):
+        return f"{json_schema.__module__}.{json_schema.__qualname__}"
+    return json.dumps(json_schema, sort_keys=True)
+
+
+class ResponseCache:
+    """SQLite-backed response store with TTL expiry and size-bounded LRU eviction."""
+
+    def __init__(self, path: str, ttl_seconds: float = 0, max_bytes: int = 0, greedy_only: bool = True):
+        self.path = path
+        self.ttl_seconds = max(float(ttl_seconds), 0.0)  # 0: never expire
+        self.max_bytes = max(int(max_bytes), 0)  # 0: unbounded
+        self.greedy_only = greedy_only
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def from_config(config: Dict[str, Any]) -> Optional["ResponseCache"]:
+        """Build from the `inference.response_cache` section, or None if disabled."""
+        if not config.get("enabled", True):
+            return None
+        return ResponseCache(
+            path=config.get("path", "data/response_cache.sqlite3"),
+            ttl_seconds=config.get("ttl_seconds", 7 * 24 * 3600),
+            max_bytes=int(float(config.get("max_size_mb", 256)) * 1024 ** 2),
+            greedy_only=config.get("greedy_only", True),
+        )
+
+    def accepts(self, greedy: bool) -> bool:
+        return greedy or not self.greedy_only
+
+    @staticmethod
+    def key(model_name: str, text: str, **params: Any) -> str:
+        """Digest of the model, the rendered prompt and every decoding parameter."""
+        if "json_schema" in params:
+            params["json_schema"] = _schema_name(params["json_schema"])
+        payload = json.dumps([model_name, text, params], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._hits += 1
+            return row[0]
+
+    def put(self, key: str, model_name: str, response: str) -> None:
+        size = len(response.encode("utf-8"))
+        if self.max_bytes and size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model_name, response, size, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        if not self.max_bytes:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if total - freed <= self.max_bytes:
+                break
+            evicted.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self._evictions += len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            lookups = self._hits + self._misses
+            return {
+                "entries": entries,
+                "size_mb": total / 1024 ** 2,
+                "max_size_mb": self.max_bytes / 1024 ** 2,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+
+_cache: Optional[ResponseCache] = None
+_cache_loaded = False
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide cache configured from `inference.response_cache` (None if disabled)."""
+    global _cache, _cache_loaded
+    if not _cache_loaded:
+        with _cache_lock:
+            if not _cache_loaded:
+                try:
+                    _cache = ResponseCache.from_config(get_config_section("inference").get("response_cache", {}))
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ Response cache disabled: {e}")
+                    _cache = None
+                _cache_loaded = True
+    return _cache
@@ -0,0 +1,198 @@
+"""
+Embedding-similarity cache for repetitive LLM calls.
+
+Short natural-language queries such as learning goals are embedded with the
+application's embedder; a new query is answered from the cache when an
+earlier one in the same namespace and context (model identity plus any exact
+inputs) is at least `similarity_threshold` cosine-similar. "I want to be a data
+scientist" and "become a data scientist" therefore share one LLM result.
+
+The cache is process-wide and disabled until `configure_semantic_cache` hands
+it the already-loaded embedder (done by main.py at startup).
+"""
+
+import copy
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from utils.config import get_config_section
+
+logger = logging.getLogger(__name__)
+
+
+def llm_identity(llm: Any) -> str:
+    """Stable description of the model (and sampling temperature) behind an LLM client."""
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or ""
+    return f"{type(llm).__name__}:{model}:{getattr(llm, 'temperature', None)}"
+
+
+@dataclass
+class _Entry:
+    query: str
+    embedding: np.ndarray  # unit length
+    value: Any
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class SemanticCache:
+    """Bounded in-memory cache matching queries by embedding similarity."""
+
+    def __init__(
+        self,
+        embedder: Embeddings,
+        similarity_threshold: float = 0.9,
+        max_entries: int = 2048,
+        ttl_seconds: float = 0,
+    ):
+        self.embedder = embedder
+        self.similarity_threshold = float(similarity_threshold)
+        self.max_entries = max(int(max_entries), 1)
+        self.ttl_seconds = max(float(ttl_seconds), 0.0)  # 0: never expire
+        self._entries: Dict[Tuple[str, str], List[_Entry]] = {}
+        self._lock = threading.Lock()
+        self._hits: Counter = Counter()
+        self._misses: Counter = Counter()
+        self._evictions = 0
+
+    @staticmethod
+    def from_config(embedder: Embeddings, config: Dict[str, Any]) -> Optional["SemanticCache"]:
+        """Build from the `inference.semantic_cache` section, or None if disabled."""
+        if not config.get("enabled", True):
+            return None
+        return SemanticCache(
+            embedder,
+            similarity_threshold=config.get("similarity_threshold", 0.9),
+            max_entries=config.get("max_entries", 2048),
+            ttl_seconds=config.get("ttl_seconds", 0),
+        )
+
+    @staticmethod
+    def context_key(*parts: Any) -> str:
+        """Digest of the inputs that must match exactly (model, extra arguments)."""
+        return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embedder.embed_query(text.strip()), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _best_match(self, bucket: List[_Entry], embedding: np.ndarray) -> Tuple[Optional[_Entry], float]:
+        if not bucket:
+            return None, 0.0
+        similarities = np.stack([entry.embedding for entry in bucket]) @ embedding
+        index = int(np.argmax(similarities))
+        return bucket[index], float(similarities[index])
+
+    def _expire(self, now: float) -> None:
+        if not self.ttl_seconds:
+            return
+        for key, bucket in list(self._entries.items()):
+            bucket[:] = [entry for entry in bucket if now - entry.created_at <= self.ttl_seconds]
+            if not bucket:
+                del self._entries[key]
+
+    def lookup(self, namespace: str, query: str, context: str = "") -> Tuple[Optional[Any], np.ndarray]:
+        """Return (cached value or None, query embedding)."""
+        embedding = self._embed(query)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry, similarity = self._best_match(self._entries.get((namespace, context), []), embedding)
+            if entry is None or similarity < self.similarity_threshold:
+                self._misses[namespace] += 1
+                return None, embedding
+            entry.last_used = now
+            self._hits[namespace] += 1
+        logger.info(f"🧠 Semantic cache hit ({namespace}, similarity {similarity:.3f}): '{query}' ~ '{entry.query}'")
+        return copy.deepcopy(entry.value), embedding
+
+    def store(self, namespace: str, query: str, value: Any, context: str = "", embedding: Optional[np.ndarray] = None) -> None:
+        if embedding is None:
+            embedding = self._embed(query)
+        with self._lock:
+            self._entries.setdefault((namespace, context), []).append(_Entry(query, embedding, copy.deepcopy(value)))
+            total = sum(len(bucket) for bucket in self._entries.values())
+            while total > self.max_entries:
+                key, bucket = min(self._entries.items(), key=lambda item: min(e.last_used for e in item[1]))
+                bucket.remove(min(bucket, key=lambda e: e.last_used))
+                if not bucket:
+                    del self._entries[key]
+                total -= 1
+                self._evictions += 1
+
+    def get_or_compute(self, namespace: str, query: str, compute: Callable[[], Any], context: str = "") -> Any:
+        """Serve `query` from the cache, or run `compute()` and cache its result."""
+        try:
+            cached, embedding = self.lookup(namespace, query, context)
+        except Exception as e:
+            logger.warning(f"⚠️ Semantic cache lookup failed, calling the model: {e}")
+            return compute()
+        if cached is not None:
+            return cached
+        value = compute()
+        self.store(namespace, query, value, context, embedding=embedding)
+        return value
+
+    def invalidate(self, namespace: Optional[str] = None, query: Optional[str] = None) -> int:
+        """Drop entries of `namespace` (all namespaces if None); with `query`, only
+        those similar enough to be served for it. Returns the number removed."""
+        embedding = self._embed(query) if query else None
+        removed = 0
+        with self._lock:
+            for key, bucket in list(self._entries.items()):
+                if namespace is not None and key[0] != namespace:
+                    continue
+                kept = [] if embedding is None else [
+                    e for e in bucket if float(e.embedding @ embedding) < self.similarity_threshold
+                ]
+                removed += len(bucket) - len(kept)
+                if kept:
+                    self._entries[key] = kept
+                else:
+                    del self._entries[key]
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            namespaces = sorted(set(self._hits) | set(self._misses) | {key[0] for key in self._entries})
+            per_namespace = {}
+            for namespace in namespaces:
+                hits, misses = self._hits[namespace], self._misses[namespace]
+                per_namespace[namespace] = {
+                    "entries": sum(len(b) for k, b in self._entries.items() if k[0] == namespace),
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                }
+            return {
+                "similarity_threshold": self.similarity_threshold,
+                "max_entries": self.max_entries,
+                "evictions": self._evictions,
+                "namespaces": per_namespace,
+            }
+
+
+_cache: Optional[SemanticCache] = None
+_cache_lock = threading.Lock()
+
+
+def configure_semantic_cache(embedder: Embeddings) -> Optional[SemanticCache]:
+    """Create the process-wide cache around `embedder` from `inference.semantic_cache`."""
+    global _cache
+    with _cache_lock:
+        _cache = SemanticCache.from_config(embedder, get_config_section("inference").get("semantic_cache", {}))
+    return _cache
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """The process-wide cache, or None when disabled or not configured."""
+    return _cache
@@ -3,34 +3,112 @@ SharedLLM - Singleton LLM instance for efficient GPU memory usage
 Based on edumcp's SharedLLM implementation
 """
 
+import asyncio
+import copy
+import gc
 import logging
 import os
+import threading
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
-from typing import Optional
+from transformers import (
+    AutoConfig,
+    AutoTokenizer,
+    AutoModelForCausalLM,
+    DynamicCache,
+    LogitsProcessorList,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    StopStringCriteria,
+    TextIteratorStreamer,
+)
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from utils.config import get_config_section
+from .cpu_inference import CPUInferenceProfile
+from .inference_executor import get_inference_executor, run_inference
+from .fair_share import current_learner, fair_share_config
+from .inference_priority import current_agent, priority_config, resolve_priority
+from .inference_scheduler import InferenceScheduler
+from .json_constraint import JSONEndCriteria, JSONSchemaLogitsProcessor, TokenVocabulary, compile_schema
+from .kv_cache import ConversationKVCache, PrefixKVCache, token_key
+from .model_registry import get_model_registry
+from .response_cache import ResponseCache, get_response_cache
+from .speculative import current_attempt
 
 logger = logging.getLogger(__name__)
 
+_DEFAULT_CONTEXT_WINDOW = 2048
+_USER_SENTINEL = "\u0000__shared_llm_user_turn__\u0000"
+
+
+class _CancelledCriteria(StoppingCriteria):
+    """Stops generation once the consumer has gone away."""
+
+    def __init__(self, event: threading.Event):
+        self._event = event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full((input_ids.shape[0],), self._event.is_set(), dtype=torch.bool, device=input_ids.device)
+
+
+class _AbandonedCriteria(StoppingCriteria):
+    """Stops each batch row whose caller has abandoned it."""
+
+    def __init__(self, events: Sequence[threading.Event]):
+        self._events = list(events)
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.tensor([event.is_set() for event in self._events], dtype=torch.bool, device=input_ids.device)
+
+
+def _truncate_at_stop(text: str, stop: Sequence[str]) -> str:
+    """Cut `text` at the earliest stop sequence (the stop sequence itself is dropped)"""
+    cut = min((index for index in (text.find(s) for s in stop) if index != -1), default=-1)
+    return text if cut == -1 else text[:cut]
+
+
 class SharedLLM:
     """
     Singleton class to manage shared LLM instances across multiple services.
-    Caches models per `model_name` to avoid duplicate loads.
+    One instance per `model_name` is kept in the model registry; its weights
+    are loaded on first generation and may be unloaded by the registry when
+    idle or over the memory budget.
     """
-    _instances: dict[str, "SharedLLM"] = {}
 
     def __new__(cls, model_name: str):
-        if model_name not in cls._instances:
+        def create() -> "SharedLLM":
             instance = super(SharedLLM, cls).__new__(cls)
             instance._initialize(model_name=model_name)
-            cls._instances[model_name] = instance
-        return cls._instances[model_name]
+            return instance
+
+        return get_model_registry().get_or_create(model_name, create)
 
     def _initialize(self, model_name: str):
-        """Initialize the model and tokenizer"""
+        """Initialize the tokenizer; model weights are loaded lazily"""
         self._model_name = model_name
         self._model = None
         self._tokenizer = None
         self._device = None
+        self._inference_config = get_config_section("inference")
+        self._scheduler: Optional[InferenceScheduler] = None
+        self._scheduler_disabled = False
+        self._scheduler_lock = threading.Lock()
+        self._prefix_cache = PrefixKVCache.from_config(self._inference_config.get("prefix_cache", {}))
+        self._system_prefixes: Dict[str, Optional[str]] = {}
+        self._conversation_cache = ConversationKVCache.from_config(
+            self._inference_config.get("conversation_cache", {})
+        )
+        assisted = self._inference_config.get("assisted_decoding", {})
+        self._draft_model_name = _draft_model_for(model_name, assisted)
+        self._num_assistant_tokens = assisted.get("num_assistant_tokens")
+        self._draft_model = None
+        self._draft_tokenizer = None
+        self._draft_shares_vocab = True
+        self._assisted_generations = 0
+        self._constrained_config = self._inference_config.get("constrained_decoding", {})
+        self._token_vocabulary: Optional[TokenVocabulary] = None
+        self._stop_at_json_end = self._inference_config.get("json_stopping", {}).get("enabled", True)
+        self._stop_string_criteria: Dict[Tuple[str, ...], StopStringCriteria] = {}
 
         # Determine device
         if torch.cuda.is_available():
@@ -43,23 +121,112 @@ class SharedLLM:
         else:
             self._device = torch.device("cpu")
             logger.warning("⚠️ GPU not available, using CPU")
+        self._cpu_profile = CPUInferenceProfile.from_config(self._inference_config.get("cpu", {}))
 
         try:
-            logger.info(f"🔄 Loading SharedLLM model: {model_name}")
-
             self._tokenizer = AutoTokenizer.from_pretrained(
                 model_name,
                 trust_remote_code=True
             )
+            # Batched decoding of a causal LM needs left padding and a pad token
+            self._tokenizer.padding_side = "left"
+            if self._tokenizer.pad_token is None:
+                self._tokenizer.pad_token = self._tokenizer.eos_token
+        except Exception as e:
+            logger.error(f"❌ Failed to load tokenizer ({model_name}): {str(e)}")
+            raise
+        self._context_window = self._resolve_context_window()
+        self._chat_template_tokens: Optional[int] = None
+
+    def _resolve_context_window(self) -> int:
+        """Context length from `inference.context_budget.context_window`, else the model config"""
+        configured = int(self._inference_config.get("context_budget", {}).get("context_window", 0) or 0)
+        if configured > 0:
+            return configured
+        try:
+            model_config = AutoConfig.from_pretrained(self._model_name, trust_remote_code=True)
+            window = getattr(model_config, "max_position_embeddings", None)
+            if window:
+                return int(window)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read model config of {self._model_name}: {str(e)}")
+        # Tokenizers without a known limit report a huge sentinel value
+        window = getattr(self._tokenizer, "model_max_length", None)
+        return int(window) if window and window < 10 ** 7 else _DEFAULT_CONTEXT_WINDOW
+
+    @property
+    def context_window(self) -> int:
+        return self._context_window
 
-            self._model = AutoModelForCausalLM.from_pretrained(
+    def max_input_tokens(self, max_new_tokens: int) -> int:
+        """Prompt tokens that fit next to a reply of `max_new_tokens`
+
+        At least a quarter of the window stays available to the prompt even
+        when the configured reply budget is larger than the window.
+        """
+        return max(self._context_window - max_new_tokens, self._context_window // 4)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self._tokenizer(text, add_special_tokens=False)["input_ids"])
+
+    @property
+    def chat_template_tokens(self) -> int:
+        """Tokens the chat template adds around a system + user message pair"""
+        if self._chat_template_tokens is None:
+            rendered = self._render_chat("user", "system")
+            self._chat_template_tokens = max(self.count_tokens(rendered) - self.count_tokens("system\nuser"), 0)
+        return self._chat_template_tokens
+
+    def _fit_to_window(self, texts: List[str], max_new_tokens: int) -> List[str]:
+        """Cut the middle out of prompts that exceed the input budget
+
+        Agents shrink their prompt variables to fit beforehand (see
+        base/context_budget.py); this is the last resort. Keeping both ends
+        preserves the system prompt and the generation prompt that
+        truncating the end would lose.
+        """
+        limit = self.max_input_tokens(max_new_tokens)
+        fitted = []
+        for text in texts:
+            token_ids = self._tokenizer(text, add_special_tokens=False)["input_ids"]
+            if len(token_ids) <= limit:
+                fitted.append(text)
+                continue
+            head = limit // 2
+            tail = limit - head
+            logger.warning(
+                f"⚠️ Prompt of {len(token_ids)} tokens exceeds the {limit}-token input budget; "
+                f"cutting {len(token_ids) - limit} tokens from the middle"
+            )
+            fitted.append(self._tokenizer.decode(token_ids[:head]) + self._tokenizer.decode(token_ids[-tail:]))
+        return fitted
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self) -> None:
+        """Load the model weights onto the device (called by the model registry)"""
+        model_name = self._model_name
+        try:
+            on_cpu = self._device.type == "cpu"
+            if on_cpu:
+                logger.info(f"🔄 Loading SharedLLM model: {model_name} (CPU profile: {self._cpu_profile.mode})")
+                self._cpu_profile.apply_threads()
+            else:
+                logger.info(f"🔄 Loading SharedLLM model: {model_name}")
+
+            model = AutoModelForCausalLM.from_pretrained(
                 model_name,
-                torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
+                torch_dtype=self._cpu_profile.torch_dtype if on_cpu else torch.float16,
                 device_map={"": self._device},
                 trust_remote_code=True
             )
 
-            self._model.eval()  # Set to evaluation mode
+            model.eval()  # Set to evaluation mode
+            self._model = self._cpu_profile.prepare(model) if on_cpu else model
+            if self._draft_model_name:
+                self._load_draft_model(on_cpu)
 
             logger.info("✅ SharedLLM initialized successfully!")
 
@@ -72,13 +239,190 @@ class SharedLLM:
             logger.error(f"❌ Failed to initialize SharedLLM ({model_name}): {str(e)}")
             raise
 
+    def _load_draft_model(self, on_cpu: bool) -> None:
+        """Load the small model proposing tokens for assisted decoding; failures only disable it"""
+        draft_name = self._draft_model_name
+        try:
+            logger.info(f"🔄 Loading draft model {draft_name} for {self._model_name}")
+            self._draft_tokenizer = AutoTokenizer.from_pretrained(draft_name, trust_remote_code=True)
+            draft = AutoModelForCausalLM.from_pretrained(
+                draft_name,
+                torch_dtype=self._cpu_profile.torch_dtype if on_cpu else torch.float16,
+                device_map={"": self._device},
+                trust_remote_code=True
+            )
+            draft.eval()
+            if self._num_assistant_tokens:
+                draft.generation_config.num_assistant_tokens = int(self._num_assistant_tokens)
+            self._draft_model = draft
+            # Different vocabularies need HF's universal assisted decoding (re-tokenized candidates)
+            self._draft_shares_vocab = self._draft_tokenizer.get_vocab() == self._tokenizer.get_vocab()
+            logger.info(
+                f"✅ Draft model ready ({'shared' if self._draft_shares_vocab else 'different'} vocabulary)"
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load draft model {draft_name}; assisted decoding disabled: {str(e)}")
+            self._draft_model = None
+            self._draft_tokenizer = None
+
+    def _assisted_kwargs(self) -> dict:
+        """generate() arguments that let the draft model propose tokens for this model to verify"""
+        kwargs = {"assistant_model": self._draft_model}
+        if not self._draft_shares_vocab:
+            kwargs.update(tokenizer=self._tokenizer, assistant_tokenizer=self._draft_tokenizer)
+        return kwargs
+
+    def unload(self) -> None:
+        """Release the model weights and every KV cache tied to them"""
+        self._model = None
+        self._draft_model = None
+        self._draft_tokenizer = None
+        if self._prefix_cache is not None:
+            self._prefix_cache.clear()
+        if self._conversation_cache is not None:
+            self._conversation_cache.clear()
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        logger.info(f"🧹 Unloaded SharedLLM model: {self._model_name}")
+
+    def memory_bytes(self) -> int:
+        """Memory the loaded model may hold (0 when unloaded): the weights, draft
+        model included, plus the budgets of the KV caches tied to them"""
+        if self._model is None:
+            return 0
+        weights = sum(self._weights_bytes(model) for model in (self._model, self._draft_model) if model is not None)
+        caches = sum(cache.max_bytes for cache in (self._prefix_cache, self._conversation_cache) if cache is not None)
+        return weights + caches
+
+    @staticmethod
+    def _weights_bytes(model) -> int:
+        footprint = model.get_memory_footprint()
+        # Dynamically quantized linears keep packed weights outside parameters()
+        for module in model.modules():
+            weight = getattr(module, "weight", None)
+            if callable(weight) and not isinstance(weight, torch.nn.Module):
+                packed = weight()
+                footprint += packed.numel() * packed.element_size()
+        return int(footprint)
+
+    @property
+    def draft_model_name(self) -> Optional[str]:
+        """Draft model used for assisted decoding, if one is loaded"""
+        return self._draft_model_name if self._draft_model is not None else None
+
+    @property
+    def scheduler(self) -> Optional[InferenceScheduler]:
+        """Batching scheduler that owns this model, created on first use."""
+        if self._scheduler is None and not self._scheduler_disabled:
+            with self._scheduler_lock:
+                if self._scheduler is None and not self._scheduler_disabled:
+                    batching = self._inference_config.get("batching", {})
+                    self._scheduler = InferenceScheduler.from_config(
+                        self, batching, priority_config(), fair_share_config()
+                    )
+                    self._scheduler_disabled = self._scheduler is None
+        return self._scheduler
+
+    def _render_chat(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        """Apply the chat template to a single user turn."""
+        messages = []
+        if system_instruction:
+            messages.append({"role": "system", "content": system_instruction})
+        messages.append({"role": "user", "content": prompt})
+
+        return self._tokenizer.apply_chat_template(
+            messages,
+            tokenize=False,
+            add_generation_prompt=True
+        )
+
+    def _system_prefix(self, system_instruction: Optional[str]) -> Optional[str]:
+        """
+        Rendered template text that precedes the user content for a system prompt
+
+        This is identical for every request of an agent, so its KV state can be
+        cached. Returns None when prefix caching is disabled.
+        """
+        if self._prefix_cache is None or not system_instruction:
+            return None
+        if system_instruction not in self._system_prefixes:
+            rendered = self._render_chat(_USER_SENTINEL, system_instruction)
+            idx = rendered.find(_USER_SENTINEL)
+            self._system_prefixes[system_instruction] = rendered[:idx] if idx > 0 else None
+        return self._system_prefixes[system_instruction]
+
+    def _prefix_past_key_values(self, prefix_ids: torch.Tensor, batch_size: int):
+        """Fresh copy of the cached KV state for `prefix_ids`, computing it on a miss."""
+        key = token_key(self._model_name, prefix_ids[0])
+        cached = self._prefix_cache.get(key)
+        if cached is None:
+            with torch.no_grad():
+                cached = self._model(
+                    input_ids=prefix_ids,
+                    past_key_values=DynamicCache(),
+                    use_cache=True,
+                ).past_key_values
+            self._prefix_cache.put(key, cached)
+        # generate() appends to the cache in place, so never hand out the stored copy
+        past_key_values = copy.deepcopy(cached)
+        if batch_size > 1:
+            past_key_values.batch_repeat_interleave(batch_size)
+        return past_key_values
+
+    def _encode(self, texts: List[str], prefix: Optional[str] = None) -> Tuple[dict, int]:
+        """
+        Tokenize rendered prompts (already fitted to the window) for generate()
+
+        With a cached `prefix` shared by every text, the prefix tokens are
+        followed by the left-padded suffixes and the prefix KV state is
+        attached, so prefill only runs over the suffixes.
+        """
+        if prefix is not None and self._prefix_cache is not None and all(text.startswith(prefix) for text in texts):
+            prefix_ids = self._tokenizer(prefix, return_tensors="pt")["input_ids"].to(self._device)
+            suffix = self._tokenizer(
+                [text[len(prefix):] for text in texts],
+                return_tensors="pt",
+                padding=True,
+                add_special_tokens=False
+            ).to(self._device)
+            prefix_length = prefix_ids.shape[1]
+            total_length = prefix_length + suffix["input_ids"].shape[1]
+            if prefix_length >= self._prefix_cache.min_prefix_tokens:
+                batch_size = len(texts)
+                input_ids = torch.cat([prefix_ids.expand(batch_size, -1), suffix["input_ids"]], dim=1)
+                attention_mask = torch.cat(
+                    [torch.ones_like(prefix_ids).expand(batch_size, -1), suffix["attention_mask"]], dim=1
+                )
+                inputs = {
+                    "input_ids": input_ids,
+                    "attention_mask": attention_mask,
+                    "past_key_values": self._prefix_past_key_values(prefix_ids, batch_size),
+                }
+                return inputs, total_length
+
+        # Tokenize (left padding keeps every prompt flush with its generation)
+        inputs = self._tokenizer(
+            texts,
+            return_tensors="pt",
+            padding=True
+        ).to(self._device)
+        return dict(inputs), inputs["input_ids"].shape[1]
+
     def generate(
         self,
         prompt: str,
         max_new_tokens: int = 512,
         temperature: float = 0.7,
         top_p: float = 0.9,
-        system_instruction: Optional[str] = None
+        system_instruction: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        json_schema: Optional[Any] = None,
+        stop: Optional[Sequence[str]] = None,
+        json_output: bool = False,
+        greedy: bool = False,
+        priority: Optional[str] = None,
+        cancel: Optional[threading.Event] = None
     ) -> str:
         """
         Generate text using the shared LLM
@@ -89,63 +433,450 @@ class SharedLLM:
             temperature: Sampling temperature
             top_p: Nucleus sampling parameter
             system_instruction: Optional system instruction
+            conversation_id: Optional multi-turn session id; the KV state of
+                earlier turns is reused so only new tokens are prefilled
+            json_schema: Optional Pydantic model (or JSON schema dict) the
+                output is constrained to
+            stop: Optional stop sequences; generation ends at the first one
+                and the returned text excludes it
+            json_output: The caller expects a single JSON object/array, so
+                generation ends as soon as the top-level value is balanced
+            greedy: Decode greedily (deterministic; temperature and top_p are
+                ignored). Greedy responses are served from the response cache
+            priority: Scheduling class ("interactive", "standard" or
+                "background"); defaults to the class of the current request
+                (see base/inference_priority.py)
+            cancel: Optional event set by a caller that gives up on the
+                result (e.g. a routing timeout); a queued request is dropped
+                and decoding stops at the next token
             
         Returns:
             Generated text
         """
-        if self._model is None or self._tokenizer is None:
+        if self._tokenizer is None:
             raise RuntimeError("SharedLLM not initialized")
 
-        try:
-            # Prepare messages
-            messages = []
-            if system_instruction:
-                messages.append({"role": "system", "content": system_instruction})
-            messages.append({"role": "user", "content": prompt})
-            
-            # Apply chat template
-            text = self._tokenizer.apply_chat_template(
-                messages,
-                tokenize=False,
-                add_generation_prompt=True
+        text = self._render_chat(prompt, system_instruction)
+        prefix = self._system_prefix(system_instruction)
+        params = dict(
+            max_new_tokens=max_new_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            greedy=greedy,
+            json_schema=json_schema,
+            stop=stop,
+            json_output=json_output,
+        )
+        cache, cache_key = self._response_cache_entry(text, conversation_id, params)
+        if cache_key is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        # Route through the batching scheduler when enabled so concurrent
+        # callers share forward passes instead of contending for the model
+        attempt = current_attempt()
+        scheduler = self.scheduler
+        if scheduler is not None:
+            future = scheduler.submit(
+                text,
+                prefix=prefix,
+                conversation_id=conversation_id,
+                priority=priority or resolve_priority(),
+                learner=current_learner(),
+                agent=current_agent(),
+                cancel=cancel,
+                **params,
             )
-            
-            # Tokenize
-            inputs = self._tokenizer(
+            if attempt is not None:
+                attempt.track(future)
+            output = future.result()
+        else:
+            abandoned = [attempt.stop_decoding] if attempt is not None else None
+            output = self.generate_batch(
+                [text],
+                prefix=prefix,
+                conversation_id=conversation_id,
+                abandoned=abandoned,
+                stopping_criteria=self._cancel_criteria(cancel),
+                **params,
+            )[0]
+
+        # An abandoned speculative attempt or a cancelled call may have been cut short
+        cut_short = (attempt is not None and attempt.abandoned) or (cancel is not None and cancel.is_set())
+        if cache_key is not None and not cut_short:
+            cache.put(cache_key, self._model_name, output)
+        return output
+
+    async def agenerate(
+        self,
+        prompt: str,
+        max_new_tokens: int = 512,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        system_instruction: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        json_schema: Optional[Any] = None,
+        stop: Optional[Sequence[str]] = None,
+        json_output: bool = False,
+        greedy: bool = False,
+        priority: Optional[str] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> str:
+        """
+        Async variant of `generate` that never blocks the event loop
+
+        With batching enabled the request is queued on the scheduler and its
+        Future awaited directly; otherwise the batch runs on the inference
+        executor. Cancelling the awaiting task drops a still-queued request;
+        setting `cancel` also stops one that is decoding.
+        """
+        if self._tokenizer is None:
+            raise RuntimeError("SharedLLM not initialized")
+
+        text = self._render_chat(prompt, system_instruction)
+        prefix = self._system_prefix(system_instruction)
+        params = dict(
+            max_new_tokens=max_new_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            greedy=greedy,
+            json_schema=json_schema,
+            stop=stop,
+            json_output=json_output,
+        )
+        cache, cache_key = self._response_cache_entry(text, conversation_id, params)
+        if cache_key is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        attempt = current_attempt()
+        scheduler = self.scheduler
+        if scheduler is not None:
+            future = scheduler.submit(
                 text,
-                return_tensors="pt",
-                truncation=True,
-                max_length=2048
-            ).to(self._device)
-            
-            # Generate
-            # Ensure temperature is > 0 (Transformers requirement)
-            safe_temperature = max(temperature, 0.01) if temperature == 0 else temperature
-            
-            with torch.no_grad():
-                outputs = self._model.generate(
-                    **inputs,
+                prefix=prefix,
+                conversation_id=conversation_id,
+                priority=priority or resolve_priority(),
+                learner=current_learner(),
+                agent=current_agent(),
+                cancel=cancel,
+                **params,
+            )
+            if attempt is not None:
+                attempt.track(future)
+            output = await asyncio.wrap_future(future)
+        else:
+            abandoned = [attempt.stop_decoding] if attempt is not None else None
+            outputs = await run_inference(
+                self.generate_batch,
+                [text],
+                prefix=prefix,
+                conversation_id=conversation_id,
+                abandoned=abandoned,
+                stopping_criteria=self._cancel_criteria(cancel),
+                **params,
+            )
+            output = outputs[0]
+
+        cut_short = (attempt is not None and attempt.abandoned) or (cancel is not None and cancel.is_set())
+        if cache_key is not None and not cut_short:
+            cache.put(cache_key, self._model_name, output)
+        return output
+
+    @staticmethod
+    def _cancel_criteria(cancel: Optional[threading.Event]) -> Optional[StoppingCriteriaList]:
+        return StoppingCriteriaList([_CancelledCriteria(cancel)]) if cancel is not None else None
+
+    def stream(
+        self,
+        prompt: str,
+        max_new_tokens: int = 512,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        system_instruction: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        json_schema: Optional[Any] = None,
+        stop: Optional[Sequence[str]] = None,
+        json_output: bool = False,
+        greedy: bool = False,
+        priority: Optional[str] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Iterator[str]:
+        """
+        Generate text using the shared LLM, yielding decoded text as it is produced
+
+        Takes the same arguments as `generate`. Chunks are yielded as decoded,
+        so a matched stop sequence may already have been streamed. Generation
+        stops at the next token once `cancel` is set or the generator is
+        closed early. Without batching it runs on the inference executor
+        (see `InferenceExecutor.submit_generation`).
+        """
+        if self._tokenizer is None:
+            raise RuntimeError("SharedLLM not initialized")
+
+        text = self._render_chat(prompt, system_instruction)
+        prefix = self._system_prefix(system_instruction)
+        streamer = TextIteratorStreamer(self._tokenizer, skip_prompt=True, skip_special_tokens=True)
+        cancelled = cancel if cancel is not None else threading.Event()
+        params = {
+            "max_new_tokens": max_new_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "greedy": greedy,
+            "prefix": prefix,
+            "conversation_id": conversation_id,
+            "json_schema": json_schema,
+            "stop": stop,
+            "json_output": json_output,
+            "stopping_criteria": StoppingCriteriaList([_CancelledCriteria(cancelled)]),
+        }
+
+        scheduler = self.scheduler
+        if scheduler is not None:
+            future = scheduler.submit(
+                text,
+                streamer=streamer,
+                priority=priority or resolve_priority(),
+                learner=current_learner(),
+                agent=current_agent(),
+                **params,
+            )
+        else:
+            # On the bounded inference executor: under the slot of a stream
+            # admitted by the endpoint, else taking one (or raising when saturated)
+            future = get_inference_executor().submit_generation(
+                lambda: self.generate_batch([text], streamer=streamer, **params)[0]
+            )
+
+        finished = False
+        try:
+            for chunk in streamer:
+                if chunk:
+                    yield chunk
+            finished = True
+        finally:
+            if not finished:
+                cancelled.set()
+            # Wait for completion so generation errors reach the consumer
+            # instead of looking like a short reply
+            if not future.cancel():
+                future.result()
+
+    def generate_batch(
+        self,
+        texts: List[str],
+        max_new_tokens: int = 512,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        greedy: bool = False,
+        prefix: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        json_schema: Optional[Any] = None,
+        stop: Optional[Sequence[str]] = None,
+        json_output: bool = False,
+        streamer: Optional[TextIteratorStreamer] = None,
+        stopping_criteria: Optional[StoppingCriteriaList] = None,
+        abandoned: Optional[Sequence[threading.Event]] = None,
+    ) -> List[str]:
+        """
+        Generate completions for already-rendered prompts in one padded batch
+
+        Args:
+            texts: Prompts with the chat template already applied
+            max_new_tokens: Maximum number of tokens to generate per prompt
+            temperature: Sampling temperature
+            top_p: Nucleus sampling parameter
+            greedy: Decode greedily instead of sampling
+            prefix: Optional rendered text every prompt starts with; its KV
+                state is served from the prefix cache
+            conversation_id: Optional session whose cached KV state is reused
+                (only valid for a single prompt)
+            json_schema: Optional Pydantic model (or JSON schema dict) every
+                output is constrained to
+            stop: Optional stop sequences, cut from the returned texts
+            json_output: End each sequence once its top-level JSON value is balanced
+            streamer: Optional streamer receiving tokens as they are decoded
+                (only valid for a single prompt)
+            stopping_criteria: Optional extra stopping criteria
+            abandoned: Optional event per prompt; a row stops decoding once
+                its event is set (e.g. a losing speculative attempt)
+
+        Returns:
+            One generated text per prompt, in input order
+        """
+        if self._tokenizer is None:
+            raise RuntimeError("SharedLLM not initialized")
+        if (streamer is not None or conversation_id is not None) and len(texts) != 1:
+            raise ValueError("Streaming and conversation generation support exactly one prompt")
+        if abandoned is not None:
+            stopping_criteria = StoppingCriteriaList([*(stopping_criteria or []), _AbandonedCriteria(abandoned)])
+
+        try:
+            # Lease the model so the registry loads it if needed and never evicts it mid-generation
+            with get_model_registry().lease(self._model_name):
+                if greedy:
+                    sampling = dict(do_sample=False)
+                else:
+                    # Ensure temperature is > 0 (Transformers requirement)
+                    safe_temperature = max(temperature, 0.01) if temperature == 0 else temperature
+                    sampling = dict(temperature=safe_temperature, top_p=top_p, do_sample=True)
+                generation_kwargs = dict(
                     max_new_tokens=max_new_tokens,
-                    temperature=safe_temperature,
-                    top_p=top_p,
-                    do_sample=True,  # Enable sampling for better completion
+                    **sampling,
                     repetition_penalty=1.05,  # Prevent repetition and encourage continuation
                     pad_token_id=self._tokenizer.pad_token_id,
-                    eos_token_id=self._tokenizer.eos_token_id
+                    eos_token_id=self._tokenizer.eos_token_id,
+                    streamer=streamer,
+                    logits_processor=self._json_logits_processor(json_schema)
                 )
-            
-            # Decode
-            generated_text = self._tokenizer.decode(
-                outputs[0][inputs['input_ids'].shape[1]:],
-                skip_special_tokens=True
-            )
-            
-            return generated_text.strip()
-            
+                stop = tuple(stop or ())
+                texts = self._fit_to_window(texts, max_new_tokens)
+
+                def stopping(prompt_length: int) -> Optional[StoppingCriteriaList]:
+                    return self._stopping_criteria(stopping_criteria, prompt_length, stop, json_output)
+
+                if conversation_id is not None and self._conversation_cache is not None:
+                    output = self._generate_in_conversation(texts[0], conversation_id, prefix, generation_kwargs, stopping)
+                    return [_truncate_at_stop(output, stop)]
+
+                if self._draft_model is not None and len(texts) == 1:
+                    # Assisted decoding is single-sequence only; it runs without the
+                    # prefix cache because the draft model keeps its own KV state
+                    generation_kwargs.update(self._assisted_kwargs())
+                    prefix = None
+                    self._assisted_generations += 1
+
+                inputs, prompt_length = self._encode(texts, prefix)
+
+                # Generate
+                with torch.no_grad():
+                    outputs = self._model.generate(
+                        **inputs,
+                        stopping_criteria=stopping(prompt_length),
+                        **generation_kwargs
+                    )
+
+                # Decode
+                generated_texts = self._tokenizer.batch_decode(
+                    outputs[:, prompt_length:],
+                    skip_special_tokens=True
+                )
+
+                return [_truncate_at_stop(text, stop).strip() for text in generated_texts]
+
         except Exception as e:
             logger.error(f"Error during generation: {str(e)}")
+            if streamer is not None:
+                streamer.end()  # Unblock the consumer iterating the streamer
             raise
 
+    def _response_cache_entry(
+        self, text: str, conversation_id: Optional[str], params: Dict[str, Any]
+    ) -> Tuple[Optional[ResponseCache], Optional[str]]:
+        """(cache, key) for a cacheable generation, or (None, None)
+
+        Conversation turns depend on session state and are never cached.
+        """
+        cache = get_response_cache()
+        if cache is None or conversation_id is not None or not cache.accepts(params["greedy"]):
+            return None, None
+        key_params = dict(params, stop=list(params["stop"] or ()))
+        if params["greedy"]:
+            # Sampling parameters do not affect greedy output
+            key_params.pop("temperature")
+            key_params.pop("top_p")
+        return cache, ResponseCache.key(self._model_name, text, **key_params)
+
+    def _vocabulary(self) -> TokenVocabulary:
+        """Per-token decoded text, built on first use"""
+        if self._token_vocabulary is None:
+            self._token_vocabulary = TokenVocabulary(self._tokenizer)
+        return self._token_vocabulary
+
+    def _json_logits_processor(self, json_schema: Optional[Any]) -> Optional[LogitsProcessorList]:
+        """Constrained-decoding processor for `json_schema`, or None when unconstrained"""
+        if json_schema is None or not self._constrained_config.get("enabled", True):
+            return None
+        eos = self._tokenizer.eos_token_id
+        processor = JSONSchemaLogitsProcessor(
+            compile_schema(json_schema),
+            self._vocabulary(),
+            eos if isinstance(eos, list) else [eos],
+            candidate_tokens=self._constrained_config.get("candidate_tokens", 32),
+        )
+        return LogitsProcessorList([processor])
+
+    def _stopping_criteria(
+        self,
+        stopping_criteria: Optional[StoppingCriteriaList],
+        prompt_length: int,
+        stop: Tuple[str, ...],
+        json_output: bool,
+    ) -> Optional[StoppingCriteriaList]:
+        """Caller criteria plus stop-sequence and balanced-JSON criteria, or None if there are none"""
+        criteria = StoppingCriteriaList(stopping_criteria or [])
+        if stop:
+            if stop not in self._stop_string_criteria:
+                self._stop_string_criteria[stop] = StopStringCriteria(self._tokenizer, list(stop))
+            criteria.append(self._stop_string_criteria[stop])
+        if json_output and self._stop_at_json_end:
+            criteria.append(JSONEndCriteria(self._vocabulary(), prompt_length))
+        return criteria or None
+
+    def _generate_in_conversation(
+        self,
+        text: str,
+        conversation_id: str,
+        prefix: Optional[str],
+        generation_kwargs: dict,
+        stopping: Callable[[int], Optional[StoppingCriteriaList]],
+    ) -> str:
+        """Generate one turn of a conversation, reusing and then updating its KV state"""
+        inputs = self._tokenizer(text, return_tensors="pt").to(self._device)
+        token_ids = inputs["input_ids"][0].tolist()
+
+        past_key_values, reused = self._conversation_cache.checkout(conversation_id, token_ids)
+        if past_key_values is None and prefix is not None and self._prefix_cache is not None:
+            # First turn: start from the agent's cached system prefix when it lines up
+            prefix_ids = self._tokenizer(prefix, return_tensors="pt")["input_ids"].to(self._device)
+            prefix_length = prefix_ids.shape[1]
+            if (
+                self._prefix_cache.min_prefix_tokens <= prefix_length < len(token_ids)
+                and token_ids[:prefix_length] == prefix_ids[0].tolist()
+            ):
+                past_key_values = self._prefix_past_key_values(prefix_ids, 1)
+                reused = prefix_length
+        if past_key_values is None:
+            past_key_values = DynamicCache()
+        logger.info(f"♻️ Conversation {conversation_id}: reusing {reused}/{len(token_ids)} prompt tokens")
+
+        with torch.no_grad():
+            outputs = self._model.generate(
+                **inputs,
+                past_key_values=past_key_values,
+                return_dict_in_generate=True,
+                stopping_criteria=stopping(inputs["input_ids"].shape[1]),
+                **generation_kwargs
+            )
+
+        sequence = outputs.sequences[0]
+        cache = outputs.past_key_values
+        # The final sampled token has no KV entry yet; store exactly what the cache covers
+        self._conversation_cache.store(conversation_id, sequence[:cache.get_seq_length()].tolist(), cache)
+
+        return self._tokenizer.decode(
+            sequence[inputs["input_ids"].shape[1]:],
+            skip_special_tokens=True
+        ).strip()
+
+    def end_conversation(self, conversation_id: str) -> bool:
+        """Drop the cached KV state of a finished conversation"""
+        if self._conversation_cache is None:
+            return False
+        return self._conversation_cache.invalidate(conversation_id)
+
     @property
     def device(self):
         return self._device
@@ -155,8 +886,49 @@ class SharedLLM:
 _DEFAULT_MODEL = os.getenv("SHARED_MODEL_NAME", "deepseek/deepseek-chat-7b-instruct")
 
 
+def _draft_model_for(model_name: str, config: dict) -> Optional[str]:
+    """Draft model configured for `model_name` under `inference.assisted_decoding`"""
+    if not config.get("enabled", False):
+        return None
+    for entry in config.get("draft_models") or []:
+        if entry.get("model") == model_name:
+            return entry.get("draft")
+    return None
+
+
 def get_shared_llm(model_name: Optional[str] = None) -> SharedLLM:
     """Get the singleton SharedLLM instance for a given model"""
     target_model = model_name or _DEFAULT_MODEL
     return SharedLLM(target_model)
 
+
+def get_inference_stats() -> dict:
+    """Batching metrics for every loaded SharedLLM, keyed by model name."""
+    stats = {}
+    for model_name, llm in get_model_registry().models().items():
+        scheduler = llm._scheduler
+        stats[model_name] = {
+            "batching": scheduler is not None,
+            "queue_depth": scheduler.queue_depth if scheduler is not None else 0,
+            "queue_depth_by_class": scheduler.queue_depth_by_class() if scheduler is not None else {},
+            "queue_depth_by_learner": scheduler.queue_depth_by_learner() if scheduler is not None else {},
+            **(scheduler.metrics.snapshot() if scheduler is not None else {}),
+            "prefix_cache": llm._prefix_cache.stats() if llm._prefix_cache is not None else None,
+            "conversation_cache": llm._conversation_cache.stats() if llm._conversation_cache is not None else None,
+            "draft_model": llm.draft_model_name,
+            "assisted_generations": llm._assisted_generations,
+        }
+    return stats
+
+
+def end_conversation(conversation_id: str) -> bool:
+    """Release a conversation's cached KV state on every loaded model"""
+    released = False
+    for llm in get_model_registry().models().values():
+        released = llm.end_conversation(conversation_id) or released
+    return released
+
+
+def get_model_residency() -> dict:
+    """Which SharedLLM models are loaded, their footprint and idle time"""
+    return get_model_registry().residency()
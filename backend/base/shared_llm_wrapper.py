@@ -2,12 +2,15 @@
 Langchain-compatible wrapper for SharedLLM
 """
 
+import asyncio
+import contextvars
 import logging
-from typing import Any, List, Optional
+import threading
+from typing import Any, AsyncIterator, ClassVar, Iterator, List, Optional, Tuple
 from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage
-from langchain_core.outputs import ChatGeneration, ChatResult
-from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.messages import BaseMessage, AIMessage, AIMessageChunk, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
 
 from .shared_llm import get_shared_llm
 
@@ -22,27 +25,39 @@ class SharedLLMWrapper(BaseChatModel):
     model_name: str = "gpt-oss-120b"
     temperature: float = 0.3
     max_tokens: int = 8192
+
+    # Extra invoke()/stream() keyword arguments understood by this model
+    call_options: ClassVar[Tuple[str, ...]] = ("conversation_id", "json_schema", "json_output", "greedy", "priority", "cancel")
+    # Losing speculative attempts are dropped from the queue or stopped mid-decode (see base/speculative.py)
+    stops_abandoned_attempts: ClassVar[bool] = True
     
     def __init__(self, temperature: float = 0.3, max_tokens: int = 8192, model_name: Optional[str] = None, **kwargs):
         super().__init__(**kwargs)
         self.temperature = temperature
         self.max_tokens = max_tokens
         self._llm = get_shared_llm(model_name=model_name)
+        self.model_name = self._llm._model_name
         logger.info(
             f"✅ SharedLLMWrapper initialized (model={self._llm._model_name}, temp={temperature}, max_tokens={max_tokens})"
         )
     
-    def _generate(
-        self,
-        messages: List[BaseMessage],
-        stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
-        **kwargs: Any,
-    ) -> ChatResult:
-        """
-        Generate response using SharedLLM
-        """
-        # Convert langchain messages to prompt
+    @property
+    def max_input_tokens(self) -> int:
+        """Token budget of a rendered system + user prompt, leaving room for the reply"""
+        return self._llm.max_input_tokens(self.max_tokens) - self._llm.chat_template_tokens
+
+    def count_tokens(self, text: str) -> int:
+        return self._llm.count_tokens(text)
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests waiting in the model's batching queue (0 without batching)"""
+        scheduler = self._llm._scheduler
+        return scheduler.queue_depth if scheduler is not None else 0
+
+    @staticmethod
+    def _split_messages(messages: List[BaseMessage]) -> Tuple[Optional[str], str]:
+        """Convert langchain messages to a (system_instruction, prompt) pair"""
         system_instruction = None
         user_messages = []
         
@@ -56,7 +71,19 @@ class SharedLLMWrapper(BaseChatModel):
                 pass
         
         # Combine user messages
-        prompt = "\n".join(user_messages)
+        return system_instruction, "\n".join(user_messages)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """
+        Generate response using SharedLLM
+        """
+        system_instruction, prompt = self._split_messages(messages)
         
         # Generate using SharedLLM
         try:
@@ -64,7 +91,14 @@ class SharedLLMWrapper(BaseChatModel):
                 prompt=prompt,
                 max_new_tokens=self.max_tokens,
                 temperature=self.temperature,
-                system_instruction=system_instruction
+                system_instruction=system_instruction,
+                conversation_id=kwargs.get("conversation_id"),
+                json_schema=kwargs.get("json_schema"),
+                stop=stop,
+                json_output=kwargs.get("json_output", False),
+                greedy=kwargs.get("greedy", False),
+                priority=kwargs.get("priority"),
+                cancel=kwargs.get("cancel")
             )
             
             # Create langchain response
@@ -76,6 +110,117 @@ class SharedLLMWrapper(BaseChatModel):
         except Exception as e:
             logger.error(f"Error in SharedLLM generation: {str(e)}")
             raise
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """
+        Async generate; awaits SharedLLM without holding the event loop
+        """
+        system_instruction, prompt = self._split_messages(messages)
+
+        try:
+            response_text = await self._llm.agenerate(
+                prompt=prompt,
+                max_new_tokens=self.max_tokens,
+                temperature=self.temperature,
+                system_instruction=system_instruction,
+                conversation_id=kwargs.get("conversation_id"),
+                json_schema=kwargs.get("json_schema"),
+                stop=stop,
+                json_output=kwargs.get("json_output", False),
+                greedy=kwargs.get("greedy", False),
+                priority=kwargs.get("priority"),
+                cancel=kwargs.get("cancel")
+            )
+            message = AIMessage(content=response_text)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        except Exception as e:
+            logger.error(f"Error in SharedLLM async generation: {str(e)}")
+            raise
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        """
+        Stream response chunks from SharedLLM as tokens are decoded
+        """
+        system_instruction, prompt = self._split_messages(messages)
+
+        try:
+            for text in self._llm.stream(
+                prompt=prompt,
+                max_new_tokens=self.max_tokens,
+                temperature=self.temperature,
+                system_instruction=system_instruction,
+                conversation_id=kwargs.get("conversation_id"),
+                json_schema=kwargs.get("json_schema"),
+                stop=stop,
+                json_output=kwargs.get("json_output", False),
+                greedy=kwargs.get("greedy", False),
+                priority=kwargs.get("priority"),
+                cancel=kwargs.get("cancel")
+            ):
+                chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+                if run_manager:
+                    run_manager.on_llm_new_token(text, chunk=chunk)
+                yield chunk
+
+        except Exception as e:
+            logger.error(f"Error in SharedLLM streaming: {str(e)}")
+            raise
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """
+        Async variant of `_stream`; each token is awaited off the event loop
+        """
+        # Set when the consumer goes away, so generation stops at its next token
+        # even while a worker thread is still inside the generator
+        cancel = kwargs.pop("cancel", None) or threading.Event()
+        iterator = self._stream(messages, stop=stop, cancel=cancel, **kwargs)
+        loop = asyncio.get_running_loop()
+        done = object()
+        # Serializes stepping and closing the generator across worker threads
+        lock = threading.Lock()
+
+        def step() -> Any:
+            with lock:
+                return next(iterator, done)
+
+        def close() -> None:
+            with lock:
+                iterator.close()
+
+        # Worker threads run the generator in the caller's context (e.g. its inference priority)
+        context = contextvars.copy_context()
+        try:
+            while True:
+                chunk = await loop.run_in_executor(None, context.run, step)
+                if chunk is done:
+                    break
+                if run_manager:
+                    await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+        finally:
+            cancel.set()
+            # Off the loop: closing waits for generation to stop, and if we were
+            # cancelled mid-token it first waits for the pending step to return
+            loop.run_in_executor(None, close)
     
     @property
     def _llm_type(self) -> str:
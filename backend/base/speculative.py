@@ -0,0 +1,200 @@
+"""
+Speculative attempts - run several sampled attempts of an agent call at once
+and keep the first one that passes validation.
+
+Sequential retries pay a full generation latency for every failed attempt.
+With batched decoding (see base/inference_scheduler.py) extra samples of the
+same prompt mostly share forward passes, so validated agents can instead
+launch `attempts` calls concurrently and return the first output their
+validation accepts. Every attempt samples (greedy agents would otherwise
+get identical candidates), so they share one batch on the scheduler.
+
+The attempts cost `attempts` times the decode work, so they are opt-in per
+agent class under `inference.speculative_attempts`. The caller runs the
+first attempt itself and the others are submitted to the bounded inference
+executor (see base/inference_executor.py); when it is saturated, fewer
+attempts run. Losing attempts are stopped: queued ones are dropped and
+decoding ones end at their next token. Only models that can stop an attempt
+(`stops_abandoned_attempts`, i.e. SharedLLM) run more than one.
+"""
+
+import contextvars
+import logging
+import threading
+from concurrent.futures import Future, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, TypeVar
+
+from utils.config import get_config_section
+
+from .inference_executor import InferenceExecutorBusy, get_inference_executor
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AttemptsExhausted(ValueError):
+    """No attempt passed validation: the rejected outputs and the errors raised."""
+
+    def __init__(self, rejected: List[Any], errors: List[Exception]):
+        self.rejected = rejected
+        self.errors = errors
+        super().__init__(
+            f"{len(rejected)} attempt(s) rejected, {len(errors)} failed"
+            + (f"; last error: {errors[-1]}" if errors else "")
+        )
+
+
+class _Attempt:
+    """The inference requests made by one speculative attempt."""
+
+    def __init__(self):
+        # Stops generation that runs outside the scheduler (batching disabled)
+        self.stop_decoding = threading.Event()
+        self._abandoned = False
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+
+    @property
+    def abandoned(self) -> bool:
+        return self._abandoned
+
+    def track(self, future: Future) -> None:
+        """Register a queued request; one made after abandonment is stopped right away."""
+        with self._lock:
+            self._futures.append(future)
+            abandoned = self._abandoned
+        if abandoned:
+            self._stop(future)
+
+    def abandon(self) -> None:
+        with self._lock:
+            self._abandoned = True
+            futures = list(self._futures)
+        self.stop_decoding.set()
+        for future in futures:
+            self._stop(future)
+
+    @staticmethod
+    def _stop(future: Future) -> None:
+        abandon = getattr(future, "abandon", None)
+        if abandon is not None:
+            abandon()  # also stops a request that is already decoding
+        else:
+            future.cancel()
+
+
+_current_attempt: contextvars.ContextVar[Optional[_Attempt]] = contextvars.ContextVar(
+    "speculative_attempt", default=None
+)
+
+
+def current_attempt() -> Optional[_Attempt]:
+    """The speculative attempt the current model call belongs to, if any."""
+    return _current_attempt.get()
+
+
+@contextmanager
+def _attempt_scope(attempt: _Attempt) -> Iterator[None]:
+    token = _current_attempt.set(attempt)
+    try:
+        yield
+    finally:
+        _current_attempt.reset(token)
+
+
+@dataclass(frozen=True)
+class SpeculativeAttempts:
+    """Runs `attempts` concurrent attempts; see the module docstring."""
+
+    attempts: int = 1
+
+    def __post_init__(self):
+        if self.attempts < 1:
+            raise ValueError("attempts must be at least 1")
+
+    @staticmethod
+    def from_config(config: Mapping[str, Any]) -> "SpeculativeAttempts":
+        return SpeculativeAttempts(attempts=config.get("attempts", 1))
+
+    def model_kwargs(self, index: int) -> Dict[str, Any]:
+        """Extra agent call options of attempt `index`: with several attempts all
+        of them sample, so they decode with the same parameters (one batch)."""
+        return {"greedy": False} if self.attempts > 1 else {}
+
+    def run(self, attempt: Callable[[int], T], accept: Callable[[T], bool] = bool) -> T:
+        """Return the first `attempt(index)` result that `accept` passes.
+
+        Raises AttemptsExhausted (with the rejected results and the errors)
+        when none does. A single attempt runs inline on the caller's thread.
+        """
+        if self.attempts == 1:
+            result = attempt(0)
+            if accept(result):
+                return result
+            raise AttemptsExhausted([result], [])
+
+        handles = [_Attempt() for _ in range(self.attempts)]
+
+        def run_one(index: int) -> T:
+            with _attempt_scope(handles[index]):
+                return attempt(index)
+
+        # The executor runs each attempt in a copy of this context, so it keeps the caller's priority, learner and agent
+        executor = get_inference_executor()
+        futures: Dict[Future, int] = {}
+        for index in range(1, self.attempts):
+            try:
+                futures[executor.submit(run_one, index)] = index
+            except InferenceExecutorBusy:
+                logger.info(f"Inference executor saturated; running {index} of {self.attempts} speculative attempts")
+                break
+
+        accepted: List[T] = []
+        rejected: List[T] = []
+        errors: List[Exception] = []
+
+        def settle(index: int, call: Callable[[], T]) -> bool:
+            try:
+                result = call()
+            except Exception as exc:
+                logger.warning(f"⚠️ Speculative attempt {index + 1}/{self.attempts} failed: {exc}")
+                errors.append(exc)
+                return False
+            if accept(result):
+                logger.info(f"⚡ Speculative attempt {index + 1}/{self.attempts} accepted")
+                accepted.append(result)
+                return True
+            rejected.append(result)
+            return False
+
+        try:
+            if settle(0, lambda: run_one(0)):
+                return accepted[0]
+            # Attempts no worker has picked up yet run here: waiting for a
+            # worker could deadlock when every worker is a caller like this one
+            for future, index in list(futures.items()):
+                if future.cancel():
+                    del futures[future]
+                    if settle(index, lambda: run_one(index)):
+                        return accepted[0]
+            for future in as_completed(futures):
+                if settle(futures[future], future.result):
+                    return accepted[0]
+            raise AttemptsExhausted(rejected, errors)
+        finally:
+            for handle in handles:
+                handle.abandon()
+            for future in futures:
+                future.cancel()
+
+
+def speculative_attempts(agent_name: str) -> SpeculativeAttempts:
+    """Settings of an agent class from `inference.speculative_attempts`: the
+    defaults, overridden field by field by the agent's entry."""
+    config = get_config_section("inference").get("speculative_attempts", {})
+    settings = SpeculativeAttempts.from_config(config.get("default") or {})
+    overrides = (config.get("agents") or {}).get(agent_name) or {}
+    return replace(settings, **overrides) if overrides else settings
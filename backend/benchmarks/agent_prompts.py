@@ -0,0 +1,151 @@
+"""
+Representative prompts of the JSON-emitting agents, rendered exactly as the
+agents render them (system prompt + formatted task prompt) from sample inputs.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from base.prompt_encoding import PromptEncoder, prompt_encoder
+
+from modules.personalized_resource_delivery.prompts.learning_document_integrator import (
+    integrated_document_generator_system_prompt,
+    integrated_document_generator_task_prompt,
+)
+from modules.personalized_resource_delivery.prompts.learning_path_scheduling import (
+    learning_path_scheduler_system_prompt,
+    learning_path_scheduler_task_prompt_session,
+)
+from modules.personalized_resource_delivery.prompts.search_enhanced_knowledge_drafter import (
+    search_enhanced_knowledge_drafter_system_prompt,
+    search_enhanced_knowledge_drafter_task_prompt,
+)
+from modules.skill_gap_identification.prompts.skill_gap_identifier import (
+    skill_gap_identifier_system_prompt,
+    skill_gap_identifier_task_prompt,
+)
+
+LEARNER_PROFILE = {
+    "learner_information": "Junior backend developer, comfortable with Python, new to data analysis.",
+    "learning_goal": "Analyse product metrics with Pandas and build simple predictive models.",
+    "cognitive_status": {
+        "overall_progress": 10,
+        "mastered_skills": [{"name": "Python programming", "proficiency_level": "intermediate"}],
+        "in_progress_skills": [
+            {"name": "Pandas", "required_proficiency_level": "advanced", "current_proficiency_level": "beginner"},
+            {"name": "Statistics", "required_proficiency_level": "intermediate", "current_proficiency_level": "unlearned"},
+        ],
+    },
+    "learning_preferences": {
+        "content_style": "Concise, example-driven explanations",
+        "activity_type": "Hands-on coding exercises",
+        "additional_notes": "Prefers short sessions on weekdays",
+    },
+    "behavioral_patterns": {
+        "system_usage_frequency": "4 logins per week",
+        "session_duration_engagement": "30-minute sessions",
+        "motivational_triggers": "Visible progress",
+        "additional_notes": "",
+    },
+}
+
+LEARNING_PATH = [
+    {"id": "Session 1", "title": "Pandas DataFrames", "abstract": "Load, inspect and index tabular data."},
+    {"id": "Session 2", "title": "Data Cleaning", "abstract": "Handle missing values, types and duplicates."},
+]
+
+LEARNING_SESSION = LEARNING_PATH[0]
+
+KNOWLEDGE_POINT = {"name": "Selecting rows and columns with loc and iloc", "type": "practical"}
+
+KNOWLEDGE_DRAFTS = [
+    {
+        "title": "Selecting rows and columns with loc and iloc",
+        "content": "`df.loc` selects by label and `df.iloc` by position, e.g. `df.loc[df.age > 30, ['name']]`.",
+        "references": [],
+    },
+    {
+        "title": "Boolean masks",
+        "content": "Comparisons on a column yield a boolean Series that filters rows when used as an index.",
+        "references": [],
+    },
+]
+
+SKILL_REQUIREMENTS = {
+    "skill_requirements": [
+        {"name": "Pandas", "required_proficiency_level": "advanced", "description": None},
+        {"name": "Statistics", "required_proficiency_level": "intermediate", "description": None},
+        {"name": "Data visualization", "required_proficiency_level": "intermediate", "description": None},
+        {"name": "Scikit-learn", "required_proficiency_level": "beginner", "description": None},
+    ]
+}
+
+
+Payload = Tuple[str, str, Dict[str, Any]]
+
+
+def agent_payloads() -> Dict[str, List[Payload]]:
+    """(system_prompt, task_prompt, variables) samples keyed by agent name."""
+    return {
+        "LearningPathScheduler": [
+            (
+                learning_path_scheduler_system_prompt,
+                learning_path_scheduler_task_prompt_session,
+                {"learner_profile": LEARNER_PROFILE, "session_count": session_count},
+            )
+            for session_count in (3, 5)
+        ],
+        "SearchEnhancedKnowledgeDrafter": [
+            (
+                search_enhanced_knowledge_drafter_system_prompt,
+                search_enhanced_knowledge_drafter_task_prompt,
+                {
+                    "learner_profile": LEARNER_PROFILE,
+                    "learning_path": LEARNING_PATH,
+                    "learning_session": LEARNING_SESSION,
+                    "knowledge_points": [KNOWLEDGE_POINT],
+                    "knowledge_point": KNOWLEDGE_POINT,
+                    "external_resources": "",
+                },
+            )
+        ],
+        "SkillGapIdentifier": [
+            (
+                skill_gap_identifier_system_prompt,
+                skill_gap_identifier_task_prompt,
+                {
+                    "learning_goal": LEARNER_PROFILE["learning_goal"],
+                    "learner_information": LEARNER_PROFILE["learner_information"],
+                    "skill_requirements": SKILL_REQUIREMENTS,
+                    "reinforcement": "",
+                },
+            )
+        ],
+        "LearningDocumentIntegrator": [
+            (
+                integrated_document_generator_system_prompt,
+                integrated_document_generator_task_prompt,
+                {
+                    "learner_profile": LEARNER_PROFILE,
+                    "learning_path": LEARNING_PATH,
+                    "learning_session": LEARNING_SESSION,
+                    "knowledge_drafts": KNOWLEDGE_DRAFTS,
+                },
+            )
+        ],
+    }
+
+
+def render(task_prompt: str, variables: Dict[str, Any], encoder: PromptEncoder) -> str:
+    return task_prompt.format(**encoder.encode_variables(variables))
+
+
+def agent_prompts() -> Dict[str, List[Tuple[str, str]]]:
+    """(system_prompt, user_prompt) pairs keyed by agent name, rendered with
+    each agent's configured prompt encoder."""
+    return {
+        agent_name: [
+            (system_prompt, render(task_prompt, variables, prompt_encoder(agent_name)))
+            for system_prompt, task_prompt, variables in payloads
+        ]
+        for agent_name, payloads in agent_payloads().items()
+    }
@@ -0,0 +1,79 @@
+"""
+Per-invoke overhead of BaseAgent's tool-less fast path vs. the react agent graph.
+
+The chat model is a canned fake that answers instantly, so the timings are
+pure framework overhead (graph construction, state bookkeeping, message
+conversion) on top of the same prompt rendering and output parsing:
+
+    cd backend
+    python -m benchmarks.bench_agent_overhead --iterations 500
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from base.base_agent import BaseAgent, create_agent
+from benchmarks.agent_prompts import agent_prompts
+from utils.llm_output import preprocess_response
+
+RESPONSE = json.dumps({"learning_path": [{"id": "Session 1", "title": "Pandas DataFrames"}]})
+
+
+class _BenchAgent(BaseAgent):
+    pass
+
+
+def _time(iterations: int, call: Callable[[], object]) -> Dict[str, float]:
+    samples: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "mean_us": statistics.mean(samples) * 1e6,
+        "p50_us": statistics.median(samples) * 1e6,
+        "p95_us": samples[int(0.95 * (len(samples) - 1))] * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    system_prompt, user_prompt = agent_prompts()["LearningPathScheduler"][0]
+    variables = {"prompt": user_prompt}
+    model = FakeListChatModel(responses=[RESPONSE])
+
+    def graph_invoke() -> object:
+        # The previous code path: build the graph per agent, invoke it with a message state
+        agent = _BenchAgent(model, system_prompt=system_prompt, decoding="sample")
+        graph = create_agent(model=model, tools=[], prompt=system_prompt)
+        output = graph.invoke(agent._build_prompt(variables, task_prompt="{prompt}"))
+        return preprocess_response(output, only_text=True, exclude_think=True, json_output=True)
+
+    def fast_invoke() -> object:
+        agent = _BenchAgent(model, system_prompt=system_prompt, decoding="sample")
+        return agent.invoke(variables, task_prompt="{prompt}")
+
+    assert graph_invoke() == fast_invoke(), "fast path must parse to the same output"
+    results = {
+        "react graph": _time(args.iterations, graph_invoke),
+        "fast path": _time(args.iterations, fast_invoke),
+    }
+
+    print(f"{'path':<12} {'mean us':>10} {'p50 us':>10} {'p95 us':>10}")
+    for name, stats in results.items():
+        print(f"{name:<12} {stats['mean_us']:>10.0f} {stats['p50_us']:>10.0f} {stats['p95_us']:>10.0f}")
+    saved = results["react graph"]["mean_us"] - results["fast path"]["mean_us"]
+    print(f"\nSaved per invoke: {saved:.0f} us ({results['react graph']['mean_us'] / results['fast path']['mean_us']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
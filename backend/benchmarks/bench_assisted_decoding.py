@@ -0,0 +1,92 @@
+"""
+Wall time and draft acceptance of assisted (speculative) decoding on the
+LearningPathScheduler and SearchEnhancedKnowledgeDrafter prompts.
+
+    cd backend
+    python -m benchmarks.bench_assisted_decoding \
+        --model Qwen/Qwen2.5-1.5B-Instruct --draft Qwen/Qwen2.5-0.5B-Instruct
+
+Acceptance is derived from forward-pass counts: each target-model step in
+assisted generation keeps the accepted draft tokens plus one of its own, so
+accepted = new_tokens - target_steps, and every draft forward proposes one
+token.
+"""
+
+import argparse
+import time
+from typing import Dict
+
+from base.shared_llm import SharedLLM
+from benchmarks.agent_prompts import agent_prompts
+
+
+class _ForwardCounter:
+    def __init__(self, module):
+        self.calls = 0
+        self._handle = module.register_forward_hook(self._hook)
+
+    def _hook(self, module, args, output):
+        self.calls += 1
+
+    def remove(self):
+        self._handle.remove()
+
+
+def _run(llm: SharedLLM, text: str, max_new_tokens: int, use_draft: bool) -> Dict[str, float]:
+    draft = llm._draft_model
+    if not use_draft:
+        llm._draft_model = None
+    target = _ForwardCounter(llm._model)
+    drafter = _ForwardCounter(draft) if use_draft else None
+    try:
+        start = time.perf_counter()
+        output = llm.generate_batch([text], max_new_tokens=max_new_tokens, temperature=0.3, top_p=0.9)[0]
+        elapsed = time.perf_counter() - start
+    finally:
+        llm._draft_model = draft
+        target.remove()
+        if drafter is not None:
+            drafter.remove()
+    new_tokens = len(llm._tokenizer(output, add_special_tokens=False)["input_ids"])
+    drafted = drafter.calls if drafter is not None else 0
+    return {
+        "wall_s": elapsed,
+        "new_tokens": new_tokens,
+        "target_steps": target.calls,
+        "acceptance": max(new_tokens - target.calls, 0) / drafted if drafted else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="Qwen/Qwen2.5-1.5B-Instruct")
+    parser.add_argument("--draft", default="Qwen/Qwen2.5-0.5B-Instruct")
+    parser.add_argument("--max-new-tokens", type=int, default=512)
+    parser.add_argument("--num-assistant-tokens", type=int, default=8)
+    args = parser.parse_args()
+
+    llm = SharedLLM(args.model)
+    llm._draft_model_name = args.draft
+    llm._num_assistant_tokens = args.num_assistant_tokens
+    llm.generate_batch([llm._render_chat("Hi")], max_new_tokens=1)  # load both models + warm up
+    if llm._draft_model is None:
+        raise SystemExit(f"Draft model {args.draft} failed to load")
+
+    print(f"model={args.model} draft={args.draft} device={llm.device} max_new_tokens={args.max_new_tokens}")
+    print(f"{'agent':<32}{'mode':<10}{'tokens':>8}{'steps':>8}{'accept':>8}{'wall s':>9}{'speedup':>9}")
+    for agent_name, prompts in agent_prompts().items():
+        for system_prompt, user_prompt in prompts:
+            text = llm._render_chat(user_prompt, system_prompt)
+            baseline = _run(llm, text, args.max_new_tokens, use_draft=False)
+            assisted = _run(llm, text, args.max_new_tokens, use_draft=True)
+            for mode, result in (("target", baseline), ("assisted", assisted)):
+                speedup = baseline["wall_s"] / result["wall_s"]
+                accept = f"{result['acceptance']:.2f}" if mode == "assisted" else "-"
+                print(
+                    f"{agent_name:<32}{mode:<10}{result['new_tokens']:>8}{result['target_steps']:>8}"
+                    f"{accept:>8}{result['wall_s']:>9.2f}{speedup:>9.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
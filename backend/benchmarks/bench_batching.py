@@ -0,0 +1,99 @@
+"""
+Throughput of one-prompt-at-a-time generation vs. the batching InferenceScheduler.
+
+Runs on CPU with a tiny instruct model:
+
+    cd backend
+    python -m benchmarks.bench_batching --model HuggingFaceTB/SmolLM2-135M-Instruct --concurrency 8 16 32
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from base.inference_scheduler import InferenceScheduler
+from base.shared_llm import SharedLLM
+
+PROMPT_TEMPLATE = (
+    "Write a short explanation of the knowledge point '{topic}' for an intermediate learner. "
+    "Return JSON with keys 'title' and 'content'."
+)
+TOPICS = [
+    "Pandas DataFrames",
+    "Data cleaning",
+    "Gradient descent",
+    "Overfitting",
+    "SQL joins",
+    "Feature scaling",
+    "Cross-validation",
+    "Confusion matrix",
+]
+
+
+def _run(concurrency: int, texts: List[str], call: Callable[[str], str]) -> Dict[str, float]:
+    latencies: List[float] = []
+
+    def one(text: str) -> str:
+        start = time.perf_counter()
+        output = call(text)
+        latencies.append(time.perf_counter() - start)
+        return output
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, texts))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "wall_s": elapsed,
+        "req_per_s": len(texts) / elapsed,
+        "p50_s": statistics.median(latencies),
+        "p95_s": latencies[int(0.95 * (len(latencies) - 1))],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="HuggingFaceTB/SmolLM2-135M-Instruct")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=15.0)
+    args = parser.parse_args()
+
+    llm = SharedLLM(args.model)
+    params = {"max_new_tokens": args.max_new_tokens, "temperature": 0.7, "top_p": 0.9}
+
+    def sequential(text: str) -> str:
+        return llm.generate_batch([text], **params)[0]
+
+    print(f"model={args.model} device={llm.device} max_new_tokens={args.max_new_tokens}")
+    print(f"{'mode':<10}{'drafters':>9}{'req/s':>9}{'p50 s':>9}{'p95 s':>9}{'occupancy':>11}")
+    for concurrency in args.concurrency:
+        texts = [
+            llm._render_chat(PROMPT_TEMPLATE.format(topic=TOPICS[i % len(TOPICS)]))
+            for i in range(concurrency)
+        ]
+
+        baseline = _run(concurrency, texts, sequential)
+        print(
+            f"{'single':<10}{concurrency:>9}{baseline['req_per_s']:>9.2f}"
+            f"{baseline['p50_s']:>9.2f}{baseline['p95_s']:>9.2f}{'-':>11}"
+        )
+
+        scheduler = InferenceScheduler(llm, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+        try:
+            batched = _run(concurrency, texts, lambda text: scheduler.submit(text, **params).result())
+        finally:
+            scheduler.shutdown()
+        occupancy = scheduler.metrics.snapshot()["mean_occupancy"]
+        print(
+            f"{'batched':<10}{concurrency:>9}{batched['req_per_s']:>9.2f}"
+            f"{batched['p50_s']:>9.2f}{batched['p95_s']:>9.2f}{occupancy:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Tokens/sec and resident memory of SharedLLM's CPU inference profiles.
+
+Each mode runs in its own subprocess so peak RSS is not polluted by a
+previously loaded model:
+
+    cd backend
+    python -m benchmarks.bench_cpu_inference --model HuggingFaceTB/SmolLM2-135M-Instruct --modes fp32 bf16 int8
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from base.cpu_inference import CPU_MODES
+
+PROMPTS = [
+    "Explain what a Pandas DataFrame is to a beginner. Return JSON with keys 'title' and 'content'.",
+    "List three common data cleaning steps and why each matters.",
+    "Describe gradient descent in two short paragraphs.",
+    "What is overfitting and how does cross-validation help detect it?",
+]
+
+
+def _worker(args: argparse.Namespace) -> None:
+    import torch
+
+    from base.cpu_inference import CPUInferenceProfile
+    from base.shared_llm import SharedLLM
+
+    llm = SharedLLM(args.model)
+    if llm.device.type != "cpu":
+        raise SystemExit("This benchmark measures CPU inference; hide GPUs with CUDA_VISIBLE_DEVICES=''")
+    llm._cpu_profile = CPUInferenceProfile(
+        mode=args.worker,
+        intra_op_threads=args.intra_op_threads,
+        inter_op_threads=args.inter_op_threads,
+    )
+    params = {"max_new_tokens": args.max_new_tokens, "temperature": 0.7, "top_p": 0.9}
+    texts = [llm._render_chat(prompt) for prompt in PROMPTS]
+
+    load_start = time.perf_counter()
+    llm.generate_batch(texts[:1], max_new_tokens=1, temperature=0.7, top_p=0.9)  # load + warm up
+    load_s = time.perf_counter() - load_start
+
+    tokens = 0
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for text in texts:
+            output = llm.generate_batch([text], **params)[0]
+            tokens += len(llm._tokenizer(output, add_special_tokens=False)["input_ids"])
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "mode": args.worker,
+        "threads": torch.get_num_threads(),
+        "load_s": load_s,
+        "tokens": tokens,
+        "tokens_per_s": tokens / elapsed,
+        "weights_mb": llm.memory_bytes() / 1024 ** 2,
+        # ru_maxrss is reported in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="HuggingFaceTB/SmolLM2-135M-Instruct")
+    parser.add_argument("--modes", nargs="+", choices=CPU_MODES, default=list(CPU_MODES))
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--intra-op-threads", type=int, default=0)
+    parser.add_argument("--inter-op-threads", type=int, default=0)
+    parser.add_argument("--worker", choices=CPU_MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args)
+        return
+
+    print(f"model={args.model} max_new_tokens={args.max_new_tokens} prompts={len(PROMPTS) * args.rounds}")
+    print(f"{'mode':<6}{'threads':>8}{'load s':>9}{'tok/s':>9}{'weights MB':>12}{'peak RSS MB':>13}")
+    for mode in args.modes:
+        cmd = [
+            sys.executable, "-m", "benchmarks.bench_cpu_inference",
+            "--worker", mode,
+            "--model", args.model,
+            "--max-new-tokens", str(args.max_new_tokens),
+            "--rounds", str(args.rounds),
+            "--intra-op-threads", str(args.intra_op_threads),
+            "--inter-op-threads", str(args.inter_op_threads),
+        ]
+        completed = subprocess.run(cmd, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"{mode:<6} failed:\n{completed.stderr.strip()}")
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(
+            f"{mode:<6}{result['threads']:>8}{result['load_s']:>9.1f}{result['tokens_per_s']:>9.1f}"
+            f"{result['weights_mb']:>12.0f}{result['peak_rss_mb']:>13.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
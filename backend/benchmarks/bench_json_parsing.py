@@ -0,0 +1,102 @@
+"""
+Recovery rate and CPU cost of the single-pass JSON parser vs. the legacy
+multi-pass repair.
+
+Parses every reply of benchmarks/json_outputs.py (plus captured replies
+given with --corpus) with the legacy `convert_json_output`, the current one
+and the streaming parser fed in small chunks, and reports per defect how
+many replies each recovers and the CPU time per reply. A reply counts as
+recovered when the parse equals the clean value, or for truncated replies
+when it yields an object or array. The legacy parser's debug prints go to
+/dev/null so only their formatting is timed:
+
+    cd backend
+    python -m benchmarks.bench_json_parsing --repeats 200
+"""
+
+import argparse
+import contextlib
+import os
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+from benchmarks.json_outputs import corpus, load_corpus
+from benchmarks.legacy_llm_output import convert_json_output as legacy_convert_json_output
+from utils.json_stream import StreamingJSONParser, json_start
+from utils.llm_output import convert_json_output
+
+
+def _streamed(chunk_size: int) -> Callable[[str], Any]:
+    def parse(output: str) -> Any:
+        parser = StreamingJSONParser()
+        for index in range(0, len(output), chunk_size):
+            parser.feed(output[index:index + chunk_size])
+        return parser.close()
+
+    return parse
+
+
+def _recovered(result: Any, expected: Any) -> bool:
+    if expected is None:
+        return isinstance(result, (dict, list)) and bool(result)
+    return result == expected
+
+
+def _parse(parse: Callable[[str], Any], output: str) -> Any:
+    try:
+        return parse(output)
+    except Exception:
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=200, help="timed parses of every reply")
+    parser.add_argument("--chunk-size", type=int, default=4, help="characters per chunk for the streaming parser")
+    parser.add_argument("--corpus", action="append", default=[], help="extra JSONL file of captured replies")
+    args = parser.parse_args()
+
+    cases = corpus()
+    for path in args.corpus:
+        cases.extend(load_corpus(path))
+
+    streamed = _streamed(args.chunk_size)
+    parsers: Dict[str, Callable[[str], Any]] = {
+        "legacy": legacy_convert_json_output,
+        "single_pass": convert_json_output,
+        # Replies stream in from the model: chunks start at the JSON value like the agents' streams do
+        "streaming": lambda output: streamed(output[json_start(output) or 0:]),
+    }
+
+    recovered: Dict[str, Dict[str, int]] = {name: defaultdict(int) for name in parsers}
+    totals: Dict[str, int] = defaultdict(int)
+    cpu_seconds: Dict[str, float] = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for case in cases:
+            totals[case["defect"]] += 1
+            for name, parse in parsers.items():
+                recovered[name][case["defect"]] += _recovered(_parse(parse, case["output"]), case["expected"])
+        for name, parse in parsers.items():
+            start = time.process_time()
+            for _ in range(args.repeats):
+                for case in cases:
+                    _parse(parse, case["output"])
+            cpu_seconds[name] = time.process_time() - start
+
+    print(f"{len(cases)} replies, {args.repeats} timed repeats")
+    print(f"{'defect':<20}" + "".join(f"{name:>14}" for name in parsers))
+    for defect, total in totals.items():
+        print(f"{defect:<20}" + "".join(f"{recovered[name][defect]:>11}/{total:<2}" for name in parsers))
+    overall: List[str] = []
+    for name in parsers:
+        count = sum(recovered[name].values())
+        overall.append(f"{count / len(cases) * 100:>13.1f}%")
+    print(f"{'recovered':<20}" + "".join(overall))
+    per_reply = {name: cpu_seconds[name] / (args.repeats * len(cases)) * 1e6 for name in parsers}
+    print(f"{'cpu us/reply':<20}" + "".join(f"{per_reply[name]:>14.1f}" for name in parsers))
+    print(f"{'vs legacy':<20}" + "".join(f"{per_reply[name] / per_reply['legacy']:>13.2f}x" for name in parsers))
+
+
+if __name__ == "__main__":
+    main()
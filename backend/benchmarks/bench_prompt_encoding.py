@@ -0,0 +1,60 @@
+"""
+Prompt tokens of each agent's sample payloads under the prompt-variable encoders.
+
+Renders every sample task prompt of benchmarks/agent_prompts.py with the
+legacy `repr` formatting and each encoder variant, counts tokens (system +
+task prompt) with the model's tokenizer and reports the savings:
+
+    cd backend
+    python -m benchmarks.bench_prompt_encoding --model Qwen/Qwen2.5-1.5B-Instruct
+"""
+
+import argparse
+from typing import Dict
+
+from transformers import AutoTokenizer
+
+from base.prompt_encoding import PromptEncoder, prompt_encoder
+from benchmarks.agent_prompts import agent_payloads, render
+
+VARIANTS: Dict[str, PromptEncoder] = {
+    "repr": PromptEncoder(format="repr"),
+    "json": PromptEncoder(format="json", drop_empty=False),
+    "json+drop": PromptEncoder(format="json", drop_empty=True),
+    "json+drop+abbr": PromptEncoder(format="json", drop_empty=True, abbreviate_keys=True),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="Qwen/Qwen2.5-1.5B-Instruct")
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+
+    def count(text: str) -> int:
+        return len(tokenizer.encode(text, add_special_tokens=False))
+
+    print(f"model={args.model} (token counts are system + task prompt)")
+    print(f"{'agent':<32}" + "".join(f"{name:>16}" for name in VARIANTS) + f"{'configured':>16}")
+    totals = dict.fromkeys([*VARIANTS, "configured"], 0)
+    for agent_name, payloads in agent_payloads().items():
+        tokens = dict.fromkeys(totals, 0)
+        for system_prompt, task_prompt, variables in payloads:
+            system_tokens = count(system_prompt)
+            encoders = {**VARIANTS, "configured": prompt_encoder(agent_name)}
+            for name, encoder in encoders.items():
+                tokens[name] += system_tokens + count(render(task_prompt, variables, encoder))
+        baseline = tokens["repr"]
+        cells = [f"{tokens[name]:>7} ({(1 - tokens[name] / baseline) * 100:>4.1f}%)" for name in tokens]
+        print(f"{agent_name:<32}" + "".join(f"{cell:>16}" for cell in cells))
+        for name in totals:
+            totals[name] += tokens[name]
+
+    baseline = totals["repr"]
+    cells = [f"{totals[name]:>7} ({(1 - totals[name] / baseline) * 100:>4.1f}%)" for name in totals]
+    print(f"{'total':<32}" + "".join(f"{cell:>16}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
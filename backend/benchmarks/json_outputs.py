@@ -0,0 +1,227 @@
+"""
+Corpus of LLM replies for the JSON parsing benchmark.
+
+Every clean sample (shaped like the replies of the learning path scheduler,
+quiz generator, skill gap identifier and knowledge drafter) is rendered with
+each defect the JSON repair has to cope with. Captured replies can be added
+with `load_corpus` (JSONL lines of {"output": ..., "expected": ...}).
+"""
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LEARNING_PATH = {
+    "learning_path": [
+        {
+            "id": "Session 1",
+            "title": "Pandas DataFrames",
+            "abstract": "Load, inspect and index tabular data with loc and iloc.",
+            "if_learned": False,
+            "associated_skills": ["Pandas"],
+            "desired_outcome_when_completed": [{"name": "Pandas", "level": "intermediate"}],
+        },
+        {
+            "id": "Session 2",
+            "title": "Data Cleaning",
+            "abstract": "Handle missing values, dtypes and duplicates in real exports.",
+            "if_learned": False,
+            "associated_skills": ["Pandas", "Data cleaning"],
+            "desired_outcome_when_completed": [{"name": "Data cleaning", "level": "intermediate"}],
+        },
+        {
+            "id": "Session 3",
+            "title": "Descriptive Statistics",
+            "abstract": "Summarise product metrics with groupby, quantiles and rolling windows.",
+            "if_learned": False,
+            "associated_skills": ["Statistics"],
+            "desired_outcome_when_completed": [{"name": "Statistics", "level": "beginner"}],
+        },
+    ]
+}
+
+DOCUMENT_QUIZ = {
+    "single_choice_questions": [
+        {
+            "question": "Which accessor selects rows by label?",
+            "options": ["iloc", "loc", "at", "query"],
+            "correct_option": 1,
+            "explanation": "loc is label based; iloc is position based.",
+        }
+    ],
+    "multiple_choice_questions": [
+        {
+            "question": "Which calls return a new DataFrame by default?",
+            "options": ["dropna()", "fillna(0)", "info()", "head()"],
+            "correct_options": [0, 1, 3],
+            "explanation": "info() prints a summary and returns None.",
+        }
+    ],
+    "true_false_questions": [
+        {
+            "question": "df.shape is a method.",
+            "correct_answer": False,
+            "explanation": "shape is an attribute holding (rows, columns).",
+        }
+    ],
+    "short_answer_questions": [
+        {
+            "question": "What does \"tidy data\" mean?",
+            "expected_answer": "One variable per column and one observation per row.",
+            "explanation": "Tidy data makes grouping and plotting straightforward.",
+        }
+    ],
+}
+
+SKILL_GAPS = {
+    "skill_gaps": [
+        {
+            "name": "Pandas",
+            "is_gap": True,
+            "required_level": "advanced",
+            "current_level": "beginner",
+            "reason": "Has only followed the official 10-minute tutorial.",
+            "level_confidence": "medium",
+        },
+        {
+            "name": "Python programming",
+            "is_gap": False,
+            "required_level": "intermediate",
+            "current_level": "intermediate",
+            "reason": "Ships Python backend services daily.",
+            "level_confidence": "high",
+        },
+    ]
+}
+
+KNOWLEDGE_DRAFT = {
+    "title": "Selecting rows and columns",
+    "content": (
+        "## Label-based selection\n"
+        "Use `df.loc[rows, cols]` when you know the labels:\n\n"
+        "```python\ndf.loc[df[\"country\"] == \"DE\", [\"revenue\", \"orders\"]]\n```\n\n"
+        "## Position-based selection\n"
+        "`df.iloc[0:5, 1]` returns the first five values of the second column. "
+        "It's the learner's go-to for quick checks."
+    ),
+}
+
+SAMPLES: Dict[str, Any] = {
+    "learning_path": LEARNING_PATH,
+    "document_quiz": DOCUMENT_QUIZ,
+    "skill_gaps": SKILL_GAPS,
+    "knowledge_draft": KNOWLEDGE_DRAFT,
+}
+
+
+def _fenced(value: Any) -> str:
+    return f"```json\n{json.dumps(value, indent=2)}\n```"
+
+
+def _with_prose(value: Any) -> str:
+    return (
+        f"Here is the requested JSON:\n\n{json.dumps(value, indent=2)}\n\n"
+        "Fix the above content if any field is missing."
+    )
+
+
+def _trailing_commas(value: Any) -> str:
+    text = json.dumps(value, indent=2)
+    return text.replace("\n  }", ",\n  }").replace("\n    }", ",\n    }").replace("\n  ]", ",\n  ]")
+
+
+def _missing_commas(value: Any) -> str:
+    return json.dumps(value, indent=2).replace('",\n', '"\n')
+
+
+def _raw_newlines(value: Any) -> str:
+    return json.dumps(value, indent=2).replace("\\n", "\n")
+
+
+def _unescaped_quotes(value: Any) -> str:
+    return json.dumps(value, indent=2).replace('\\"', '"')
+
+
+def _extra_data(value: Any) -> str:
+    return f"{json.dumps(value)}\n\nI hope this helps! Let me know if you need {{more}} sessions."
+
+
+def _unquoted_keys(value: Any) -> str:
+    return re.sub(r'"(\w+)":', r"\1:", json.dumps(value, indent=2))
+
+
+def _unquoted_values(value: Any) -> str:
+    # Single-word string values lose their quotes (`"level": intermediate`)
+    return re.sub(r': "([A-Za-z_]\w*)"', r": \1", json.dumps(value, indent=2))
+
+
+def _truncated(fraction: float) -> Callable[[Any], str]:
+    def render(value: Any) -> str:
+        text = json.dumps(value, indent=2)
+        return text[: int(len(text) * fraction)]
+
+    return render
+
+
+# (defect, render, whether the clean value is recoverable)
+DEFECTS: List[Tuple[str, Callable[[Any], str], bool]] = [
+    ("clean", lambda value: json.dumps(value, indent=2), True),
+    ("fenced", _fenced, True),
+    ("prose", _with_prose, True),
+    ("python_repr", repr, True),
+    ("trailing_commas", _trailing_commas, True),
+    ("missing_commas", _missing_commas, True),
+    ("raw_newlines", _raw_newlines, True),
+    ("unescaped_quotes", _unescaped_quotes, True),
+    ("extra_data", _extra_data, True),
+    ("unquoted_keys", _unquoted_keys, True),
+    ("unquoted_values", _unquoted_values, True),
+    ("truncated_90", _truncated(0.9), False),
+    ("truncated_50", _truncated(0.5), False),
+]
+
+# Small replies for defects the samples above don't contain: (name, output, expected)
+HANDWRITTEN: List[Tuple[str, str, Any]] = [
+    ("leading_point", '{"score": .5, "weights": [.25, -.75]}', {"score": 0.5, "weights": [0.25, -0.75]}),
+    ("trailing_point", '{"score": 5., "total": 1e2}', {"score": 5.0, "total": 100.0}),
+    ("bare_value", '{"key": value, "b": 2}', {"key": "value", "b": 2}),
+    ("bare_key", "{a: 1}", {"a": 1}),
+]
+
+
+def corpus() -> List[Dict[str, Any]]:
+    """Cases of {"name", "defect", "output", "expected"}; expected is None
+    when the reply cannot be fully recovered (truncation)."""
+    cases = []
+    for sample_name, value in SAMPLES.items():
+        for defect, render, recoverable in DEFECTS:
+            cases.append(
+                {
+                    "name": f"{sample_name}/{defect}",
+                    "defect": defect,
+                    "output": render(value),
+                    "expected": value if recoverable else None,
+                }
+            )
+    for name, output, expected in HANDWRITTEN:
+        cases.append({"name": f"handwritten/{name}", "defect": name, "output": output, "expected": expected})
+    return cases
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    """Captured replies from a JSONL file of {"output": ..., "expected": ...} lines."""
+    cases = []
+    with open(path, encoding="utf-8") as handle:
+        for index, line in enumerate(handle):
+            if not line.strip():
+                continue
+            case: Dict[str, Optional[Any]] = json.loads(line)
+            cases.append(
+                {
+                    "name": case.get("name") or f"captured/{index}",
+                    "defect": case.get("defect") or "captured",
+                    "output": case["output"],
+                    "expected": case.get("expected"),
+                }
+            )
+    return cases
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 
 @dataclass
@@ -37,6 +37,197 @@ class RAGConfig:
     max_workers: int = 3
 
 
+@dataclass
+class ExecutorConfig:
+    max_workers: int = 16
+    max_pending: int = 64
+    retry_after_seconds: int = 5
+
+
+@dataclass
+class ModelRegistryConfig:
+    max_memory_mb: float = 0
+    idle_ttl_seconds: float = 3600
+    reap_interval_seconds: float = 60
+
+
+@dataclass
+class CPUConfig:
+    mode: str = "fp32"  # fp32 | bf16 | int8
+    intra_op_threads: int = 0
+    inter_op_threads: int = 0
+
+
+@dataclass
+class AssistedDecodingConfig:
+    enabled: bool = False
+    num_assistant_tokens: int = 8
+    draft_models: List[Dict[str, str]] = field(default_factory=list)  # [{model: ..., draft: ...}]
+
+
+@dataclass
+class ConstrainedDecodingConfig:
+    enabled: bool = True
+    candidate_tokens: int = 32
+
+
+@dataclass
+class JSONStoppingConfig:
+    enabled: bool = True
+
+
+@dataclass
+class DecodingProfilesConfig:
+    default: str = "sample"  # sample | greedy
+    agents: Dict[str, str] = field(default_factory=dict)  # agent class name -> profile
+
+
+@dataclass
+class ResponseCacheConfig:
+    enabled: bool = True
+    path: str = "data/response_cache.sqlite3"
+    ttl_seconds: float = 604800
+    max_size_mb: float = 256
+    greedy_only: bool = True
+
+
+@dataclass
+class SemanticCacheConfig:
+    enabled: bool = True
+    similarity_threshold: float = 0.9
+    max_entries: int = 2048
+    ttl_seconds: float = 86400
+
+
+@dataclass
+class RoutingConfig:
+    enabled: bool = False
+    timeout_seconds: float = 120
+    latency_window: int = 20
+    max_error_rate: float = 0.5
+    min_samples: int = 3
+    cooldown_seconds: float = 30
+    backends: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # name -> {provider, model, base_url, max_in_flight, ...}
+    policies: Dict[str, List[str]] = field(default_factory=dict)  # agent class name (or default) -> backend names
+
+
+@dataclass
+class PrioritiesConfig:
+    default: str = "standard"  # interactive | standard | background
+    aging_seconds: float = 5
+    agents: Dict[str, str] = field(default_factory=dict)  # agent class name -> class
+    endpoints: Dict[str, str] = field(default_factory=dict)  # HTTP path -> class
+
+
+@dataclass
+class FairShareConfig:
+    enabled: bool = True
+    header: str = "X-Learner-Id"
+    default_weight: float = 1.0
+    max_concurrent_per_learner: int = 0  # 0: no cap
+    weights: Dict[str, float] = field(default_factory=dict)  # learner id -> weight
+
+
+@dataclass
+class AdmissionConfig:
+    enabled: bool = True
+    default_service_seconds: float = 2.0
+    min_retry_after: int = 1
+    slo_seconds: Dict[str, float] = field(
+        default_factory=lambda: {"interactive": 5, "standard": 30, "background": 120}
+    )  # priority class -> max estimated queue wait
+
+
+@dataclass
+class AgentPoolConfig:
+    enabled: bool = True
+    max_agents: int = 256
+
+
+@dataclass
+class PromptEncoderConfig:
+    format: str = "json"  # repr | json
+    drop_empty: bool = False
+    abbreviate_keys: bool = False
+    min_key_length: int = 8
+
+
+@dataclass
+class PromptEncodingConfig:
+    default: PromptEncoderConfig = field(default_factory=PromptEncoderConfig)
+    agents: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # agent class name -> encoder overrides
+
+
+@dataclass
+class SpeculativeAttemptSettings:
+    attempts: int = 1
+
+
+@dataclass
+class SpeculativeAttemptsConfig:
+    default: SpeculativeAttemptSettings = field(default_factory=SpeculativeAttemptSettings)
+    agents: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # agent class name -> setting overrides
+
+
+@dataclass
+class ContextVariableConfig:
+    priority: int = 0  # lower is shrunk first
+    strategy: str = "trim"  # trim | trim_oldest | drop | summarize
+
+
+@dataclass
+class ContextBudgetConfig:
+    enabled: bool = True
+    context_window: int = 0
+    min_variable_tokens: int = 32
+    variables: Dict[str, ContextVariableConfig] = field(default_factory=dict)
+
+
+@dataclass
+class BatchingConfig:
+    enabled: bool = True
+    max_batch_size: int = 8
+    max_wait_ms: float = 15.0
+
+
+@dataclass
+class PrefixCacheConfig:
+    enabled: bool = True
+    max_memory_mb: float = 2048
+    min_prefix_tokens: int = 32
+
+
+@dataclass
+class ConversationCacheConfig:
+    enabled: bool = True
+    max_memory_mb: float = 4096
+    ttl_seconds: float = 1800
+
+
+@dataclass
+class InferenceConfig:
+    executor: ExecutorConfig = field(default_factory=ExecutorConfig)
+    model_registry: ModelRegistryConfig = field(default_factory=ModelRegistryConfig)
+    cpu: CPUConfig = field(default_factory=CPUConfig)
+    assisted_decoding: AssistedDecodingConfig = field(default_factory=AssistedDecodingConfig)
+    constrained_decoding: ConstrainedDecodingConfig = field(default_factory=ConstrainedDecodingConfig)
+    json_stopping: JSONStoppingConfig = field(default_factory=JSONStoppingConfig)
+    decoding_profiles: DecodingProfilesConfig = field(default_factory=DecodingProfilesConfig)
+    response_cache: ResponseCacheConfig = field(default_factory=ResponseCacheConfig)
+    semantic_cache: SemanticCacheConfig = field(default_factory=SemanticCacheConfig)
+    routing: RoutingConfig = field(default_factory=RoutingConfig)
+    priorities: PrioritiesConfig = field(default_factory=PrioritiesConfig)
+    fair_share: FairShareConfig = field(default_factory=FairShareConfig)
+    admission: AdmissionConfig = field(default_factory=AdmissionConfig)
+    agent_pool: AgentPoolConfig = field(default_factory=AgentPoolConfig)
+    prompt_encoding: PromptEncodingConfig = field(default_factory=PromptEncodingConfig)
+    speculative_attempts: SpeculativeAttemptsConfig = field(default_factory=SpeculativeAttemptsConfig)
+    context_budget: ContextBudgetConfig = field(default_factory=ContextBudgetConfig)
+    batching: BatchingConfig = field(default_factory=BatchingConfig)
+    prefix_cache: PrefixCacheConfig = field(default_factory=PrefixCacheConfig)
+    conversation_cache: ConversationCacheConfig = field(default_factory=ConversationCacheConfig)
+
+
 @dataclass
 class AppConfig:
     environment: str = "dev"  # dev | staging | prod
@@ -47,3 +238,4 @@ class AppConfig:
     search: SearchConfig = field(default_factory=SearchConfig)
     vectorstore: VectorstoreConfig = field(default_factory=VectorstoreConfig)
     rag: RAGConfig = field(default_factory=RAGConfig)
+    inference: InferenceConfig = field(default_factory=InferenceConfig)
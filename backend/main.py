@@ -7,15 +7,30 @@ import hydra
 from omegaconf import DictConfig, OmegaConf
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Request
-from base.llm_factory import LLMFactory
+from base.llm_registry import get_llm_registry
+from base.llm_router import routing_config
+from base.inference_executor import InferenceExecutorBusy, get_inference_executor, run_inference
+from base.admission import get_admission_controller
+from base.agent_pool import get_agent_pool
+from base.fair_share import fair_share_config, inference_learner
+from base.inference_priority import endpoint_priority, inference_priority, priority_config
+from base.response_cache import get_response_cache
+from base.semantic_cache import configure_semantic_cache, get_semantic_cache
+from base.shared_llm import end_conversation, get_inference_stats, get_model_residency
 from base.searcher_factory import SearchRunner
 from base.search_rag import SearchRagManager
 from utils.preprocess import extract_text_from_pdf
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
 from modules.skill_gap_identification import *
 from modules.adaptive_learner_modeling import *
 from modules.personalized_resource_delivery import *
-from modules.ai_chatbot_tutor import chat_with_tutor_with_llm, assess_with_socratic_tutor, assess_with_socratic_tutor
+from modules.ai_chatbot_tutor import (
+    achat_with_tutor_with_llm,
+    stream_chat_with_tutor_with_llm,
+    aassess_with_socratic_tutor,
+    stream_assess_with_socratic_tutor,
+)
 from api_schemas import *
 from config import load_config
 
@@ -31,6 +46,46 @@ def parse_string_to_object(value):
         except (ValueError, SyntaxError):
             return value
 
+def sse_event(data, event: str | None = None) -> str:
+    """Format one Server-Sent Events message carrying a JSON payload"""
+    lines = [f"event: {event}"] if event else []
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+def sse_text_stream(chunks, log_tag: str):
+    """Emit a `token` event per text chunk, then `done` with the full reply (or `error`)"""
+    parts = []
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            yield sse_event({"delta": chunk}, event="token")
+        yield sse_event({"response": "".join(parts).strip()}, event="done")
+    except Exception as e:
+        logger.exception("[%s] Streaming failure", log_tag)
+        yield sse_event({"detail": str(e)}, event="error")
+
+def sse_item_stream(items, log_tag: str, result_event: str, done=lambda result: result):
+    """Emit an event per (event, data) item as it is validated; the `result_event`
+    item (the full result) becomes `done`, shaped by `done(result)` (or `error`)"""
+    try:
+        for event, data in items:
+            if event == result_event:
+                yield sse_event(done(data), event="done")
+            else:
+                yield sse_event(data, event=event)
+    except Exception as e:
+        logger.exception("[%s] Streaming failure", log_tag)
+        yield sse_event({"detail": str(e)}, event="error")
+
+def sse_response(events) -> StreamingResponse:
+    """Stream `events` once the inference executor admits them; a saturated
+    executor raises InferenceExecutorBusy here, before the response starts (503)"""
+    return StreamingResponse(
+        get_inference_executor().stream(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
@@ -39,6 +94,7 @@ logger = logging.getLogger("genreact.backend")
 
 app_config = load_config(config_name="main")
 search_rag_manager = SearchRagManager.from_config(app_config)
+configure_semantic_cache(search_rag_manager.embedder)
 
 app = FastAPI()
 
@@ -58,6 +114,78 @@ async def log_requests(request: Request, call_next):
     logger.info("Response %s %s -> %s", request.method, request.url.path, response.status_code)
     return response
 
+
+@app.middleware("http")
+async def set_inference_priority(request: Request, call_next):
+    # Model calls made while serving this endpoint are scheduled in its configured class
+    with inference_priority(endpoint_priority(request.url.path)):
+        return await call_next(request)
+
+
+_learner_id_paths: set[str] | None = None
+
+def learner_id_paths() -> set[str]:
+    """Paths whose request model has a `learner_id` field (built once all routes exist)."""
+    global _learner_id_paths
+    if _learner_id_paths is None:
+        _learner_id_paths = {
+            route.path
+            for route in app.routes
+            if isinstance(route, APIRoute) and route.body_field is not None
+            and "learner_id" in getattr(route.body_field.type_, "model_fields", {})
+        }
+    return _learner_id_paths
+
+async def request_learner_id(request: Request) -> str | None:
+    """Learner/session id from the fair-share header, else the JSON body's `learner_id`.
+
+    The body is only parsed for endpoints whose request model carries
+    `learner_id`, so large payloads elsewhere are not decoded twice.
+    """
+    learner_id = request.headers.get(fair_share_config().get("header", "X-Learner-Id"))
+    if (
+        learner_id
+        or request.url.path not in learner_id_paths()
+        or not request.headers.get("content-type", "").startswith("application/json")
+    ):
+        return learner_id
+    try:
+        body = json.loads(await request.body() or b"{}")
+    except ValueError:
+        return None
+    learner_id = body.get("learner_id") if isinstance(body, dict) else None
+    return str(learner_id) if learner_id else None
+
+@app.middleware("http")
+async def set_inference_learner(request: Request, call_next):
+    # Model calls made for this request share the queue fairly with other learners'
+    with inference_learner(await request_learner_id(request)):
+        return await call_next(request)
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    # Fail fast with 429 when the model queue can't serve this endpoint's class within its SLO
+    controller = get_admission_controller()
+    if controller is not None and request.method == "POST":
+        priority = endpoint_priority(request.url.path) or priority_config().get("default", "standard")
+        retry_after = controller.check(priority)
+        if retry_after is not None:
+            return JSONResponse(
+                status_code=429,
+                content={"detail": f"Inference queue is full for {priority} requests; retry in {retry_after}s"},
+                headers={"Retry-After": str(retry_after)},
+            )
+    return await call_next(request)
+
+@app.exception_handler(InferenceExecutorBusy)
+async def inference_executor_busy(request: Request, exc: InferenceExecutorBusy):
+    # Endpoints re-raise this past their generic 500 handling: it means "retry later", not a failure
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -71,7 +199,10 @@ def get_llm(model_provider: str | None = None, model_name: str | None = None, **
     model_provider = model_provider or "shared"
     model_name = model_name or "qwen-instruct"
     use_shared = kwargs.pop("use_shared_llm", model_provider in {"shared", "gpt-oss", "chatbot"})
-    return LLMFactory.create(
+    if model_provider in {"shared", "router"} and routing_config().get("enabled", False):
+        # Route across the configured backends instead of pinning the local model
+        return get_llm_registry().router()
+    return get_llm_registry().create(
         model=model_name,
         model_provider=model_provider,
         use_shared_llm=use_shared,
@@ -92,6 +223,46 @@ async def list_llm_models():
     except Exception as e:
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
+@app.get("/inference-stats")
+async def inference_stats():
+    cache = get_response_cache()
+    semantic_cache = get_semantic_cache()
+    return {
+        "models": get_inference_stats(),
+        "executor": get_inference_executor().stats(),
+        "response_cache": cache.stats() if cache is not None else None,
+        "semantic_cache": semantic_cache.stats() if semantic_cache is not None else None,
+        "llm_clients": get_llm_registry().stats(),
+        "routing": get_llm_registry().router().stats() if routing_config().get("enabled", False) else None,
+        "admission": get_admission_controller().stats() if get_admission_controller() is not None else None,
+        "agents": get_agent_pool().stats(),
+    }
+
+@app.delete("/response-cache")
+async def clear_response_cache():
+    cache = get_response_cache()
+    if cache is not None:
+        cache.clear()
+    return {"cleared": cache is not None}
+
+@app.delete("/semantic-cache")
+async def invalidate_semantic_cache(namespace: str | None = None, query: str | None = None):
+    """Drop cached results of a namespace (refine_learning_goal, map_goal_to_skills), or all;
+    with `query`, only the entries that would be served for it."""
+    cache = get_semantic_cache()
+    if cache is None:
+        return {"removed": 0}
+    removed = await run_inference(cache.invalidate, namespace=namespace, query=query)
+    return {"removed": removed}
+
+@app.get("/model-residency")
+async def model_residency():
+    return get_model_residency()
+
+@app.delete("/conversations/{conversation_id}")
+async def delete_conversation(conversation_id: str):
+    return {"released": end_conversation(conversation_id)}
+
 @app.post("/chat-with-tutor")
 async def chat_with_autor(request: ChatWithAutorRequest):
     llm = get_llm(request.model_provider, request.model_name)
@@ -101,23 +272,50 @@ async def chat_with_autor(request: ChatWithAutorRequest):
             converted_messages = ast.literal_eval(request.messages)
         else:
             return JSONResponse(status_code=400, content={"detail": "messages must be a JSON array string"})
-        response = chat_with_tutor_with_llm(
+        response = await achat_with_tutor_with_llm(
             llm,
             converted_messages,
             learner_profile,
             search_rag_manager=search_rag_manager,
             use_search=True,
+            conversation_id=request.conversation_id,
         )
         return {"response": response}
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
+@app.post("/chat-with-tutor/stream")
+async def chat_with_autor_stream(request: ChatWithAutorRequest):
+    llm = get_llm(request.model_provider, request.model_name)
+    if isinstance(request.messages, str) and request.messages.strip().startswith("["):
+        try:
+            converted_messages = ast.literal_eval(request.messages)
+        except Exception as e:
+            return JSONResponse(status_code=400, content={"detail": str(e)})
+    else:
+        return JSONResponse(status_code=400, content={"detail": "messages must be a JSON array string"})
+    chunks = stream_chat_with_tutor_with_llm(
+        llm,
+        converted_messages,
+        request.learner_profile,
+        search_rag_manager=search_rag_manager,
+        use_search=True,
+        conversation_id=request.conversation_id,
+    )
+    return sse_response(sse_text_stream(chunks, "ChatWithTutorStream"))
+
 @app.post("/refine-learning-goal")
 async def refine_learning_goal(request: LearningGoalRefinementRequest):
     llm = get_llm(request.model_provider, request.model_name)
     try:
-        refined_learning_goal = refine_learning_goal_with_llm(llm, request.learning_goal, request.learner_information)
+        refined_learning_goal = await run_inference(
+            refine_learning_goal_with_llm, llm, request.learning_goal, request.learner_information
+        )
         return refined_learning_goal
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
@@ -156,8 +354,8 @@ async def identify_skill_gap_with_info(request: SkillGapIdentificationRequest):
             skill_requirements,
         )
         start_time = time.time()
-        skill_gaps, skill_requirements = identify_skill_gap_with_llm(
-            llm, learning_goal, learner_information, skill_requirements
+        skill_gaps, skill_requirements = await run_inference(
+            identify_skill_gap_with_llm, llm, learning_goal, learner_information, skill_requirements
         )
         elapsed = time.time() - start_time
         if not skill_requirements or not skill_requirements.get("skill_requirements"):
@@ -172,6 +370,8 @@ async def identify_skill_gap_with_info(request: SkillGapIdentificationRequest):
         )
         results = {**skill_gaps, **skill_requirements}
         return results
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         logger.exception("[SkillGapWithInfo] Error: %s", e)
         return JSONResponse(status_code=500, content={"detail": str(e)})
@@ -180,8 +380,7 @@ async def identify_skill_gap_with_info(request: SkillGapIdentificationRequest):
 @app.post("/identify-skill-gap")
 async def identify_skill_gap(goal: str = Form(...), cv: UploadFile = File(...), model_provider: str = Form("deepseek"), model_name: str = Form("deepseek-chat")):
     llm = get_llm(model_provider, model_name)
-    mapper = SkillRequirementMapper(llm)
-    skill_gap_identifier = SkillGapIdentifier(llm)
+    skill_gap_identifier = get_agent_pool().get(SkillGapIdentifier, llm)
     try:
         file_location = f"{UPLOAD_LOCATION}{cv.filename}"
 #         with open(file_location, "wb") as file_object:
@@ -189,17 +388,20 @@ async def identify_skill_gap(goal: str = Form(...), cv: UploadFile = File(...),
         with open(file_location, "wb") as file_object:
             file_object.write(await cv.read())
         # print(file_location)
-        cv_text = extract_text_from_pdf(file_location)  
-        skill_requirements = mapper.map_goal_to_skill({
-            "learning_goal": goal
-        })
-        skill_gaps = skill_gap_identifier.identify_skill_gap({
-            "learning_goal": goal,
-            "skill_requirements": skill_requirements,
-            "learner_information": cv_text
-        })
+        def identify() -> tuple:
+            cv_text = extract_text_from_pdf(file_location)
+            skill_requirements = map_goal_to_skills_with_llm(llm, goal)
+            skill_gaps = skill_gap_identifier.identify_skill_gap({
+                "learning_goal": goal,
+                "skill_requirements": skill_requirements,
+                "learner_information": cv_text
+            })
+            return skill_gaps, skill_requirements
+        skill_gaps, skill_requirements = await run_inference(identify)
         results = {**skill_gaps, **skill_requirements}
         return results
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
@@ -220,10 +422,12 @@ async def create_learner_profile_with_info(request: LearnerProfileInitialization
                 skill_gaps = ast.literal_eval(skill_gaps)
             except Exception:
                 skill_gaps = {"raw": skill_gaps}
-        learner_profile = initialize_learner_profile_with_llm(
-            llm, learning_goal, learner_information, skill_gaps
+        learner_profile = await run_inference(
+            initialize_learner_profile_with_llm, llm, learning_goal, learner_information, skill_gaps
         )
         return {"learner_profile": learner_profile}
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -231,7 +435,7 @@ async def create_learner_profile_with_info(request: LearnerProfileInitialization
 async def create_learner_profile(request: LearnerProfileInitializationRequest):
     llm = get_llm(request.model_provider, request.model_name)
     file_location = f"{UPLOAD_LOCATION}{request.cv_path}"
-    learner_information = extract_text_from_pdf(file_location)
+    learner_information = await run_inference(extract_text_from_pdf, file_location)
     learning_goal = request.learning_goal
     skill_gaps = request.skill_gaps
     try:
@@ -240,10 +444,12 @@ async def create_learner_profile(request: LearnerProfileInitializationRequest):
                 skill_gaps = ast.literal_eval(skill_gaps)
             except Exception:
                 skill_gaps = {"raw": skill_gaps}
-        learner_profile = initialize_learner_profile_with_llm(
-            llm, learning_goal, {"raw": learner_information}, skill_gaps
+        learner_profile = await run_inference(
+            initialize_learner_profile_with_llm, llm, learning_goal, {"raw": learner_information}, skill_gaps
         )
         return {"learner_profile": learner_profile}
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -263,7 +469,8 @@ async def update_learner_profile(request: LearnerProfileUpdateRequest):
                 except Exception:
                     if name != "session_information":
                         locals()[name] = {"raw": val}
-        learner_profile = update_learner_profile_with_llm(
+        learner_profile = await run_inference(
+            update_learner_profile_with_llm,
             llm,
             locals()["learner_profile"],
             locals()["learner_interactions"],
@@ -271,6 +478,8 @@ async def update_learner_profile(request: LearnerProfileUpdateRequest):
             locals()["session_information"],
         )
         return {"learner_profile": learner_profile}
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -284,11 +493,27 @@ async def schedule_learning_path(request: LearningPathSchedulingRequest):
             learner_profile = ast.literal_eval(learner_profile)
         if not isinstance(learner_profile, dict):
             learner_profile = {}
-        learning_path = schedule_learning_path_with_llm(llm, learner_profile, session_count)
+        learning_path = await run_inference(schedule_learning_path_with_llm, llm, learner_profile, session_count)
         return learning_path
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/schedule-learning-path/stream")
+async def schedule_learning_path_stream(request: LearningPathSchedulingRequest):
+    llm = get_llm(request.model_provider, request.model_name)
+    learner_profile = request.learner_profile
+    try:
+        if isinstance(learner_profile, str) and learner_profile.strip():
+            learner_profile = ast.literal_eval(learner_profile)
+    except Exception as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    if not isinstance(learner_profile, dict):
+        learner_profile = {}
+    items = stream_learning_path_with_llm(llm, learner_profile, request.session_count)
+    return sse_response(sse_item_stream(items, "ScheduleLearningPathStream", "learning_path"))
+
 @app.post("/reschedule-learning-path")
 async def reschedule_learning_path(request: LearningPathReschedulingRequest):
     llm = get_llm(request.model_provider, request.model_name)
@@ -308,10 +533,12 @@ async def reschedule_learning_path(request: LearningPathReschedulingRequest):
                 other_feedback = ast.literal_eval(other_feedback)
             except Exception:
                 pass
-        learning_path = reschedule_learning_path_with_llm(
-            llm, learning_path, learner_profile, session_count, other_feedback
+        learning_path = await run_inference(
+            reschedule_learning_path_with_llm, llm, learning_path, learner_profile, session_count, other_feedback
         )
         return learning_path
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -322,8 +549,12 @@ async def explore_knowledge_points(request: KnowledgePointExplorationRequest):
     learning_path = parse_string_to_object(request.learning_path)
     learning_session = parse_string_to_object(request.learning_session)
     try:
-        knowledge_points = explore_knowledge_points_with_llm(llm, learner_profile, learning_path, learning_session)
+        knowledge_points = await run_inference(
+            explore_knowledge_points_with_llm, llm, learner_profile, learning_path, learning_session
+        )
         return knowledge_points
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -337,8 +568,13 @@ async def draft_knowledge_point(request: KnowledgePointDraftingRequest):
     knowledge_point = parse_string_to_object(request.knowledge_point)
     use_search = request.use_search
     try:
-        knowledge_draft = draft_knowledge_point_with_llm(llm, learner_profile, learning_path, learning_session, knowledge_points, knowledge_point, use_search)
+        knowledge_draft = await run_inference(
+            draft_knowledge_point_with_llm,
+            llm, learner_profile, learning_path, learning_session, knowledge_points, knowledge_point, use_search
+        )
         return {"knowledge_draft": knowledge_draft}
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -352,9 +588,14 @@ async def draft_knowledge_points(request: KnowledgePointsDraftingRequest):
     use_search = request.use_search
     allow_parallel = request.allow_parallel
     try:
-        knowledge_drafts = draft_knowledge_points_with_llm(llm, learner_profile, learning_path, learning_session, knowledge_points, allow_parallel, use_search)
+        knowledge_drafts = await run_inference(
+            draft_knowledge_points_with_llm,
+            llm, learner_profile, learning_path, learning_session, knowledge_points, allow_parallel, use_search
+        )
         print(f"[DEBUG] draft_knowledge_points produced {len(knowledge_drafts) if isinstance(knowledge_drafts, list) else 'non-list'} items")
         return {"knowledge_drafts": knowledge_drafts}
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -368,8 +609,13 @@ async def integrate_learning_document(request: LearningDocumentIntegrationReques
     knowledge_drafts = parse_string_to_object(request.knowledge_drafts)
     output_markdown = request.output_markdown
     try:
-        learning_document = integrate_learning_document_with_llm(llm, learner_profile, learning_path, learning_session, knowledge_points, knowledge_drafts, output_markdown)
+        learning_document = await run_inference(
+            integrate_learning_document_with_llm,
+            llm, learner_profile, learning_path, learning_session, knowledge_points, knowledge_drafts, output_markdown
+        )
         return {"learning_document": learning_document}
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -383,11 +629,34 @@ async def generate_document_quizzes(request: KnowledgeQuizGenerationRequest):
     true_false_count = request.true_false_count
     short_answer_count = request.short_answer_count
     try:
-        document_quiz = generate_document_quizzes_with_llm(llm, learner_profile, learning_document, single_choice_count, multiple_choice_count, true_false_count, short_answer_count)
+        document_quiz = await run_inference(
+            generate_document_quizzes_with_llm,
+            llm, learner_profile, learning_document, single_choice_count, multiple_choice_count, true_false_count, short_answer_count
+        )
         return {"document_quiz": document_quiz}
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/generate-document-quizzes/stream")
+async def generate_document_quizzes_stream(request: KnowledgeQuizGenerationRequest):
+    llm = get_llm()
+    items = stream_document_quizzes_with_llm(
+        llm,
+        parse_string_to_object(request.learner_profile),
+        parse_string_to_object(request.learning_document),
+        request.single_choice_count,
+        request.multiple_choice_count,
+        request.true_false_count,
+        request.short_answer_count,
+    )
+    return sse_response(
+        sse_item_stream(
+            items, "DocumentQuizStream", "document_quiz", done=lambda document_quiz: {"document_quiz": document_quiz}
+        )
+    )
+
 @app.post("/tailor-knowledge-content")
 async def tailor_knowledge_content(request: TailoredContentGenerationRequest):
     llm = get_llm()
@@ -398,10 +667,13 @@ async def tailor_knowledge_content(request: TailoredContentGenerationRequest):
     allow_parallel = request.allow_parallel
     with_quiz = request.with_quiz
     try:
-        tailored_content = create_learning_content_with_llm(
+        tailored_content = await run_inference(
+            create_learning_content_with_llm,
             llm, learner_profile, learning_path, learning_session, allow_parallel=allow_parallel, with_quiz=with_quiz, use_search=use_search
         )
         return {"tailored_content": tailored_content}
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -427,16 +699,39 @@ async def assess_with_socratic_tutor_endpoint(request: SocraticTutorRequest):
             len(converted_messages),
         )
 
-        response = assess_with_socratic_tutor(
+        response = await aassess_with_socratic_tutor(
             learning_topic=request.learning_topic,
             messages=converted_messages,
+            conversation_id=request.conversation_id,
         )
         logger.info("[API] Socratic tutor response ready | topic=%s", request.learning_topic)
         return {"response": response}
+    except InferenceExecutorBusy:
+        raise
     except Exception as e:
         logger.exception("[API] Socratic tutor failure | topic=%s", request.learning_topic)
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
+@app.post("/assess-with-socratic-tutor/stream")
+async def assess_with_socratic_tutor_stream_endpoint(request: SocraticTutorRequest):
+    logger.info(
+        "[API] /assess-with-socratic-tutor/stream called | topic=%s",
+        request.learning_topic,
+    )
+    try:
+        if isinstance(request.messages, str) and request.messages.strip().startswith("["):
+            converted_messages = ast.literal_eval(request.messages)
+        else:
+            converted_messages = []
+    except Exception as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    chunks = stream_assess_with_socratic_tutor(
+        learning_topic=request.learning_topic,
+        messages=converted_messages,
+        conversation_id=request.conversation_id,
+    )
+    return sse_response(sse_text_stream(chunks, "SocraticTutorStream"))
+
 if __name__ == "__main__":
     server_cfg = app_config.get("server", {})
     host = app_config.get("server", {}).get("host", "127.0.0.1")
@@ -7,6 +7,7 @@ import logging
 from typing import Any, Dict, List, Mapping, Optional, Union, Protocol, runtime_checkable
 
 from base import BaseAgent
+from base.agent_pool import get_agent_pool
 from ..schemas import LearnerProfile
 from ..prompts import (
     adaptive_learner_profiler_system_prompt,
@@ -51,7 +52,7 @@ class AdaptiveLearnerProfiler(BaseAgent):
         """Generate an initial learner profile using the provided onboarding information."""
         task_prompt = adaptive_learner_profiler_task_prompt_initialization
         payload_dict = LearnerProfileInitializationPayload(**input_dict).model_dump()
-        raw_output = self.invoke(payload_dict, task_prompt=task_prompt)
+        raw_output = self.invoke(payload_dict, task_prompt=task_prompt, json_schema=LearnerProfile)
         validated_output = LearnerProfile.model_validate(raw_output)
         return validated_output.model_dump()
 
@@ -59,7 +60,7 @@ class AdaptiveLearnerProfiler(BaseAgent):
         """Update an existing learner profile with fresh interaction data."""
         task_prompt = adaptive_learner_profiler_task_prompt_update
         payload_dict = LearnerProfileUpdatePayload(**input_dict).model_dump()
-        raw_output = self.invoke(payload_dict, task_prompt=task_prompt)
+        raw_output = self.invoke(payload_dict, task_prompt=task_prompt, json_schema=LearnerProfile)
         validated_output = LearnerProfile.model_validate(raw_output)
         return validated_output.model_dump()
 
@@ -71,7 +72,7 @@ def initialize_learner_profile_with_llm(
     skill_gaps: Union[str, Mapping[str, Any], List[Any]],
 ) -> Dict[str, Any]:
     """Public helper for generating a learner profile with minimal boilerplate."""
-    learner_profiler = AdaptiveLearnerProfiler(llm)
+    learner_profiler = get_agent_pool().get(AdaptiveLearnerProfiler, llm)
     payload_dict = {
         "learning_goal": learning_goal,
         "learner_information": learner_information,
@@ -90,7 +91,7 @@ def update_learner_profile_with_llm(
 ) -> Dict[str, Any]:
     """Public helper for updating an existing learner profile via the LLM backend."""
 
-    learner_profiler = AdaptiveLearnerProfiler(llm)
+    learner_profiler = get_agent_pool().get(AdaptiveLearnerProfiler, llm)
     payload_dict = {
         "learner_profile": learner_profile,
         "learner_interactions": learner_interactions,
@@ -2,12 +2,20 @@ from .agents.ai_chatbot_tutor import (
     AITutorChatbot,
     TutorChatPayload,
     chat_with_tutor_with_llm,
+    achat_with_tutor_with_llm,
+    stream_chat_with_tutor_with_llm,
     assess_with_socratic_tutor,
+    aassess_with_socratic_tutor,
+    stream_assess_with_socratic_tutor,
 )
 
 __all__ = [
     "AITutorChatbot",
     "TutorChatPayload",
     "chat_with_tutor_with_llm",
+    "achat_with_tutor_with_llm",
+    "stream_chat_with_tutor_with_llm",
     "assess_with_socratic_tutor",
+    "aassess_with_socratic_tutor",
+    "stream_assess_with_socratic_tutor",
 ]
@@ -3,12 +3,14 @@ from __future__ import annotations
 import ast
 import logging
 import os
-from typing import Any, List, Mapping, Optional, Sequence
+from typing import Any, Iterator, List, Mapping, Optional, Sequence
 
 from pydantic import BaseModel, field_validator
 
 from base.base_agent import BaseAgent
-from base.shared_llm_wrapper import create_shared_llm_wrapper
+from base.agent_pool import get_agent_pool
+from base.inference_executor import run_inference
+from base.llm_registry import get_llm_registry
 from base.search_rag import SearchRagManager, format_docs
 from modules.ai_chatbot_tutor.prompts.ai_chatbot_tutor import (
 	ai_tutor_chatbot_system_prompt,
@@ -98,7 +100,7 @@ class AITutorChatbot(BaseAgent):
 		super().__init__(model=model, system_prompt=ai_tutor_chatbot_system_prompt, jsonalize_output=False)
 		self.search_rag_manager = search_rag_manager
 
-	def chat(self, payload: TutorChatPayload | Mapping[str, Any] | str):
+	def _prepare_inputs(self, payload: TutorChatPayload | Mapping[str, Any] | str) -> dict:
 		if not isinstance(payload, TutorChatPayload):
 			payload = TutorChatPayload.model_validate(payload)
 
@@ -121,14 +123,32 @@ class AITutorChatbot(BaseAgent):
 			except Exception:
 				pass
 
-		input_vars = {
+		return {
 			"learner_profile": data.get("learner_profile", ""),
 			"messages": history_text,
 			"external_resources": external_context,
 		}
-		raw_reply = self.invoke(input_vars, task_prompt=ai_tutor_chatbot_task_prompt)
+
+	def chat(self, payload: TutorChatPayload | Mapping[str, Any] | str, *, conversation_id: Optional[str] = None):
+		input_vars = self._prepare_inputs(payload)
+		raw_reply = self.invoke(input_vars, task_prompt=ai_tutor_chatbot_task_prompt, conversation_id=conversation_id)
 		return raw_reply
 
+	async def achat(self, payload: TutorChatPayload | Mapping[str, Any] | str, *, conversation_id: Optional[str] = None):
+		"""Async variant of :meth:`chat`; retrieval runs on the inference executor."""
+		input_vars = await run_inference(self._prepare_inputs, payload)
+		return await self.ainvoke(input_vars, task_prompt=ai_tutor_chatbot_task_prompt, conversation_id=conversation_id)
+
+	def stream_chat(
+		self,
+		payload: TutorChatPayload | Mapping[str, Any] | str,
+		*,
+		conversation_id: Optional[str] = None,
+	) -> Iterator[str]:
+		"""Same as :meth:`chat`, but yields the reply text as it is generated."""
+		input_vars = self._prepare_inputs(payload)
+		yield from self.stream(input_vars, task_prompt=ai_tutor_chatbot_task_prompt, conversation_id=conversation_id)
+
 
 def chat_with_tutor_with_llm(
 	llm: Any,
@@ -138,21 +158,65 @@ def chat_with_tutor_with_llm(
 	search_rag_manager: Optional[SearchRagManager] = None,
 	use_search: bool = True,
 	top_k: int = 5,
+	conversation_id: Optional[str] = None,
 ):
 	"""Convenience helper to run an AI tutor chat turn with optional RAG.
 
 	- If a SearchRagManager is provided and use_search=True, performs web search + retrieval.
 	- If provided and use_search=False, performs vectorstore-only retrieval.
 	- If not provided, replies without external context.
+	- If a conversation_id is given, the model reuses that session's cached KV state.
 	"""
-	agent = AITutorChatbot(llm, search_rag_manager=search_rag_manager)
+	agent = get_agent_pool().get(AITutorChatbot, llm, search_rag_manager=search_rag_manager)
 	payload = {
 		"learner_profile": learner_profile,
 		"messages": messages,
 		"use_search": use_search,
 		"top_k": top_k,
 	}
-	return agent.chat(payload)
+	return agent.chat(payload, conversation_id=conversation_id)
+
+
+async def achat_with_tutor_with_llm(
+	llm: Any,
+	messages: Optional[Sequence[Mapping[str, Any]]] | str = None,
+	learner_profile: Any = "",
+	*,
+	search_rag_manager: Optional[SearchRagManager] = None,
+	use_search: bool = True,
+	top_k: int = 5,
+	conversation_id: Optional[str] = None,
+):
+	"""Async variant of :func:`chat_with_tutor_with_llm`."""
+	agent = get_agent_pool().get(AITutorChatbot, llm, search_rag_manager=search_rag_manager)
+	payload = {
+		"learner_profile": learner_profile,
+		"messages": messages,
+		"use_search": use_search,
+		"top_k": top_k,
+	}
+	return await agent.achat(payload, conversation_id=conversation_id)
+
+
+def stream_chat_with_tutor_with_llm(
+	llm: Any,
+	messages: Optional[Sequence[Mapping[str, Any]]] | str = None,
+	learner_profile: Any = "",
+	*,
+	search_rag_manager: Optional[SearchRagManager] = None,
+	use_search: bool = True,
+	top_k: int = 5,
+	conversation_id: Optional[str] = None,
+) -> Iterator[str]:
+	"""Streaming variant of :func:`chat_with_tutor_with_llm` yielding reply text chunks."""
+	agent = get_agent_pool().get(AITutorChatbot, llm, search_rag_manager=search_rag_manager)
+	payload = {
+		"learner_profile": learner_profile,
+		"messages": messages,
+		"use_search": use_search,
+		"top_k": top_k,
+	}
+	yield from agent.stream_chat(payload, conversation_id=conversation_id)
 
 
 class SocraticTutorPayload(BaseModel):
@@ -176,7 +240,7 @@ class SocraticTutorAgent(BaseAgent):
 	def __init__(self, model: Any):
 		super().__init__(model=model, system_prompt=socratic_tutor_system_prompt, jsonalize_output=False)
 
-	def assess(self, payload: SocraticTutorPayload | Mapping[str, Any]):
+	def _prepare_inputs(self, payload: SocraticTutorPayload | Mapping[str, Any]) -> dict:
 		if not isinstance(payload, SocraticTutorPayload):
 			payload = SocraticTutorPayload.model_validate(payload)
 
@@ -184,19 +248,42 @@ class SocraticTutorAgent(BaseAgent):
 		messages = data.get("messages")
 		history_text = _stringify_history(messages)
 
-		input_vars = {
+		return {
 			"learning_topic": data.get("learning_topic", ""),
 			"messages": history_text,
 		}
-		raw_reply = self.invoke(input_vars, task_prompt=socratic_tutor_task_prompt)
+
+	def assess(self, payload: SocraticTutorPayload | Mapping[str, Any], *, conversation_id: Optional[str] = None):
+		input_vars = self._prepare_inputs(payload)
+		raw_reply = self.invoke(input_vars, task_prompt=socratic_tutor_task_prompt, conversation_id=conversation_id)
 		return raw_reply
 
+	async def aassess(self, payload: SocraticTutorPayload | Mapping[str, Any], *, conversation_id: Optional[str] = None):
+		"""Async variant of :meth:`assess`."""
+		input_vars = self._prepare_inputs(payload)
+		return await self.ainvoke(input_vars, task_prompt=socratic_tutor_task_prompt, conversation_id=conversation_id)
+
+	def stream_assess(
+		self,
+		payload: SocraticTutorPayload | Mapping[str, Any],
+		*,
+		conversation_id: Optional[str] = None,
+	) -> Iterator[str]:
+		"""Same as :meth:`assess`, but yields the question text as it is generated."""
+		input_vars = self._prepare_inputs(payload)
+		yield from self.stream(input_vars, task_prompt=socratic_tutor_task_prompt, conversation_id=conversation_id)
+
 
 def assess_with_socratic_tutor(
     learning_topic: str,
     messages: Optional[Sequence[Mapping[str, Any]]] | str = None,
+    conversation_id: Optional[str] = None,
 ):
-    """Convenience helper to run a Socratic assessment turn."""
+    """Convenience helper to run a Socratic assessment turn.
+
+    Passing the session's conversation_id lets the model reuse the KV state of
+    earlier turns instead of re-prefilling the whole dialogue.
+    """
     message_count = _count_messages(messages)
     shared_model = os.getenv("SHARED_MODEL_NAME")
     logger.info(
@@ -207,13 +294,13 @@ def assess_with_socratic_tutor(
     )
 
     try:
-        llm = create_shared_llm_wrapper(temperature=0.7, max_tokens=1024)
-        agent = SocraticTutorAgent(llm)
+        llm = get_llm_registry().shared_wrapper(temperature=0.7, max_tokens=1024)
+        agent = get_agent_pool().get(SocraticTutorAgent, llm)
         payload = {
             "learning_topic": learning_topic,
             "messages": messages,
         }
-        response = agent.assess(payload)
+        response = agent.assess(payload, conversation_id=conversation_id)
         preview = (response or "").strip().replace("\n", " ")
         if len(preview) > 160:
             preview = f"{preview[:157]}..."
@@ -229,4 +316,53 @@ def assess_with_socratic_tutor(
             learning_topic,
             message_count,
         )
-        raise
\ No newline at end of file
+        raise
+
+
+async def aassess_with_socratic_tutor(
+    learning_topic: str,
+    messages: Optional[Sequence[Mapping[str, Any]]] | str = None,
+    conversation_id: Optional[str] = None,
+):
+    """Async variant of :func:`assess_with_socratic_tutor`."""
+    message_count = _count_messages(messages)
+    logger.info(
+        "[SocraticTutor] Starting async turn | topic=%s | messages=%s",
+        learning_topic,
+        message_count,
+    )
+    try:
+        llm = get_llm_registry().shared_wrapper(temperature=0.7, max_tokens=1024)
+        agent = get_agent_pool().get(SocraticTutorAgent, llm)
+        payload = {
+            "learning_topic": learning_topic,
+            "messages": messages,
+        }
+        return await agent.aassess(payload, conversation_id=conversation_id)
+    except Exception:
+        logger.exception(
+            "[SocraticTutor] Failed async turn | topic=%s | messages=%s",
+            learning_topic,
+            message_count,
+        )
+        raise
+
+
+def stream_assess_with_socratic_tutor(
+    learning_topic: str,
+    messages: Optional[Sequence[Mapping[str, Any]]] | str = None,
+    conversation_id: Optional[str] = None,
+) -> Iterator[str]:
+    """Streaming variant of :func:`assess_with_socratic_tutor` yielding question text chunks."""
+    logger.info(
+        "[SocraticTutor] Starting streamed turn | topic=%s | messages=%s",
+        learning_topic,
+        _count_messages(messages),
+    )
+    llm = get_llm_registry().shared_wrapper(temperature=0.7, max_tokens=1024)
+    agent = get_agent_pool().get(SocraticTutorAgent, llm)
+    payload = {
+        "learning_topic": learning_topic,
+        "messages": messages,
+    }
+    yield from agent.stream_assess(payload, conversation_id=conversation_id)
@@ -17,12 +17,12 @@ You are the AI Tutor. Use the following information to provide a concise, helpfu
 Learner Profile:
 {learner_profile}
 
-Relevant Context (documents, search, notes):
-{external_resources}
-
 Conversation History:
 {messages}
 
+Relevant Context for the latest message (documents, search, notes):
+{external_resources}
+
 Reply to the learner now based on the latest user message. Do not include system text in your reply.
 """
 ).strip()
@@ -4,7 +4,8 @@ import ast
 from typing import Any, Dict, Mapping, Optional, Union
 
 from base import BaseAgent
-from .schemas import parse_ground_truth_profile_result
+from base.agent_pool import get_agent_pool
+from .schemas import GroundTruthProfileResult, parse_ground_truth_profile_result
 from .prompts import (
     ground_truth_profile_creator_system_prompt,
     ground_truth_profile_creator_task_prompt,
@@ -74,7 +75,7 @@ class GroundTruthProfileCreator(BaseAgent):
     def create_profile(self, input_dict: Mapping[str, Any]) -> Dict[str, Any]:
         payload = GroundTruthProfileCreatePayload(**input_dict).model_dump()
         task_prompt = ground_truth_profile_creator_task_prompt
-        raw_output = self.invoke(payload, task_prompt=task_prompt)
+        raw_output = self.invoke(payload, task_prompt=task_prompt, json_schema=GroundTruthProfileResult)
         validated = parse_ground_truth_profile_result(raw_output)
         return validated.model_dump()
 
@@ -89,7 +90,7 @@ class GroundTruthProfileCreator(BaseAgent):
         """
         payload = GroundTruthProfileProgressPayload(**input_dict).model_dump()
         task_prompt = ground_truth_profile_creator_task_prompt_progress
-        raw_output = self.invoke(payload, task_prompt=task_prompt)
+        raw_output = self.invoke(payload, task_prompt=task_prompt, json_schema=GroundTruthProfileResult)
         validated = parse_ground_truth_profile_result(raw_output)
         return validated.model_dump()
 
@@ -99,7 +100,7 @@ def create_ground_truth_profile_with_llm(
     learner_information: Union[str, Mapping[str, Any]] = "",
     skill_requirements: Optional[Union[str, Mapping[str, Any]]] = None,
 ) -> Dict[str, Any]:
-    creator = GroundTruthProfileCreator(llm)
+    creator = get_agent_pool().get(GroundTruthProfileCreator, llm)
     return creator.create_profile(
         {
             "learning_goal": learning_goal,
@@ -6,7 +6,8 @@ import os
 from typing import Any, Dict, Mapping, Union
 
 from base import BaseAgent
-from .schemas import parse_learner_behavior_log
+from base.agent_pool import get_agent_pool
+from .schemas import LearnerBehaviorLog, parse_learner_behavior_log
 from .prompts import (
     learner_interaction_simulator_system_prompt,
     learner_interaction_simulator_task_prompt,
@@ -59,7 +60,7 @@ class LearnerInteractionSimulator(BaseAgent):
         """
         payload = LearnerInteractionPayload(**input_dict).model_dump()
         task_prompt = learner_interaction_simulator_task_prompt
-        raw_output = self.invoke(payload, task_prompt=task_prompt)
+        raw_output = self.invoke(payload, task_prompt=task_prompt, json_schema=LearnerBehaviorLog)
         validated = parse_learner_behavior_log(raw_output)
         return validated.model_dump()
 
@@ -72,7 +73,7 @@ def simulate_learner_interactions_with_llm(
     """Simulate interactions for multiple sessions and persist logs."""
 
     print("==== Step 2: Simulate Learner Interactions ====")
-    learner_behavior_simulator = LearnerInteractionSimulator(llm)
+    learner_behavior_simulator = get_agent_pool().get(LearnerInteractionSimulator, llm)
     behavior_logs: list[Dict[str, Any]] = []
 
     for session in range(1, session_count + 1):
@@ -4,6 +4,7 @@ from .learning_path_scheduler import (
 	LearningPathReschedulePayload,
 	SessionSchedulePayload,
 	schedule_learning_path_with_llm,
+	stream_learning_path_with_llm,
 	refine_learning_path_with_llm,
 	reschedule_learning_path_with_llm,
 )
@@ -11,6 +12,7 @@ from .document_quiz_generator import (
 	DocumentQuizGenerator,
 	DocumentQuizPayload,
 	generate_document_quizzes_with_llm,
+	stream_document_quizzes_with_llm,
 )
 from .goal_oriented_knowledge_explorer import (
 	GoalOrientedKnowledgeExplorer,
@@ -44,6 +46,7 @@ __all__ = [
 	"LearningPathReschedulePayload",
 	"SessionSchedulePayload",
 	"schedule_learning_path_with_llm",
+	"stream_learning_path_with_llm",
 	"refine_learning_path_with_llm",
 	"reschedule_learning_path_with_llm",
 	# Content creation pipeline
@@ -61,6 +64,7 @@ __all__ = [
 	"DocumentQuizGenerator",
 	"DocumentQuizPayload",
 	"generate_document_quizzes_with_llm",
+	"stream_document_quizzes_with_llm",
 	"LearningContentCreator",
 	"ContentBasePayload",
 	"ContentDraftPayload",
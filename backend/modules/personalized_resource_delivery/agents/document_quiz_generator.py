@@ -1,15 +1,32 @@
 from __future__ import annotations
 
-from typing import Any, Mapping
+import logging
+from typing import Any, Dict, Iterator, List, Mapping, Tuple, Type
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, ValidationError, field_validator
 
 from base import BaseAgent
+from base.agent_pool import get_agent_pool
 from modules.personalized_resource_delivery.prompts.document_quiz_generator import (
     document_quiz_generator_system_prompt,
     document_quiz_generator_task_prompt,
 )
-from modules.personalized_resource_delivery.schemas import DocumentQuiz
+from modules.personalized_resource_delivery.schemas import (
+    DocumentQuiz,
+    MultipleChoiceQuestion,
+    ShortAnswerQuestion,
+    SingleChoiceQuestion,
+    TrueFalseQuestion,
+)
+
+logger = logging.getLogger(__name__)
+
+QUESTION_TYPES: Dict[str, Type[BaseModel]] = {
+    "single_choice_questions": SingleChoiceQuestion,
+    "multiple_choice_questions": MultipleChoiceQuestion,
+    "true_false_questions": TrueFalseQuestion,
+    "short_answer_questions": ShortAnswerQuestion,
+}
 
 
 class DocumentQuizPayload(BaseModel):
@@ -41,7 +58,7 @@ class DocumentQuizGenerator(BaseAgent):
     def generate(self, payload: DocumentQuizPayload | Mapping[str, Any] | str):
         if not isinstance(payload, DocumentQuizPayload):
             payload = DocumentQuizPayload.model_validate(payload)
-        raw_output = self.invoke(payload.model_dump(), task_prompt=document_quiz_generator_task_prompt)
+        raw_output = self.invoke(payload.model_dump(), task_prompt=document_quiz_generator_task_prompt, json_schema=DocumentQuiz)
 
         if isinstance(raw_output, str):
             from utils.llm_output import convert_json_output
@@ -63,6 +80,36 @@ class DocumentQuizGenerator(BaseAgent):
         validated_output = DocumentQuiz.model_validate(raw_output)
         return validated_output.model_dump()
 
+    def stream_generate(self, payload: DocumentQuizPayload | Mapping[str, Any] | str) -> Iterator[Tuple[str, dict]]:
+        """Same as :meth:`generate`, but yields questions as they are generated.
+
+        Yields `("question", {"question_type", "index", "question"})` for each
+        question validated against its schema as soon as its object closes,
+        then `("document_quiz", ...)` with the quiz made of those questions.
+        Questions that fail validation are logged and left out.
+        """
+        if not isinstance(payload, DocumentQuizPayload):
+            payload = DocumentQuizPayload.model_validate(payload)
+        questions: Dict[str, List[BaseModel]] = {question_type: [] for question_type in QUESTION_TYPES}
+        for path, value in self.stream_json(
+            payload.model_dump(), task_prompt=document_quiz_generator_task_prompt, json_schema=DocumentQuiz
+        ):
+            if len(path) != 2 or path[0] not in QUESTION_TYPES or not isinstance(value, dict):
+                continue
+            question_type = path[0]
+            try:
+                question = QUESTION_TYPES[question_type].model_validate(value)
+            except ValidationError as e:
+                logger.warning(f"⚠️ Dropping invalid {question_type} item {path[1]} from the stream: {e}")
+                continue
+            questions[question_type].append(question)
+            yield "question", {
+                "question_type": question_type,
+                "index": len(questions[question_type]) - 1,
+                "question": question.model_dump(mode="json"),
+            }
+        yield "document_quiz", DocumentQuiz(**questions).model_dump(mode="json")
+
     @staticmethod
     def _empty_quiz() -> dict:
         return {
@@ -82,7 +129,7 @@ def generate_document_quizzes_with_llm(
     true_false_count: int = 0,
     short_answer_count: int = 0,
 ):
-    gen = DocumentQuizGenerator(llm)
+    gen = get_agent_pool().get(DocumentQuizGenerator, llm)
 
     # First attempt: single shot
     try:
@@ -140,3 +187,25 @@ def generate_document_quizzes_with_llm(
             merged["short_answer_questions"] = part.get("short_answer_questions", [])
 
         return merged
+
+
+def stream_document_quizzes_with_llm(
+    llm,
+    learner_profile,
+    learning_document,
+    single_choice_count: int = 3,
+    multiple_choice_count: int = 0,
+    true_false_count: int = 0,
+    short_answer_count: int = 0,
+) -> Iterator[Tuple[str, dict]]:
+    """Streaming variant of :func:`generate_document_quizzes_with_llm` (single shot, no per-type fallback)."""
+    gen = get_agent_pool().get(DocumentQuizGenerator, llm)
+    payload = {
+        "learner_profile": learner_profile,
+        "learning_document": learning_document,
+        "single_choice_count": single_choice_count,
+        "multiple_choice_count": multiple_choice_count,
+        "true_false_count": true_false_count,
+        "short_answer_count": short_answer_count,
+    }
+    yield from gen.stream_generate(payload)
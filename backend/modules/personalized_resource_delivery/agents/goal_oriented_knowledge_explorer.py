@@ -5,6 +5,7 @@ from typing import Any, Mapping
 from pydantic import BaseModel, Field, field_validator
 
 from base import BaseAgent
+from base.agent_pool import get_agent_pool
 from modules.personalized_resource_delivery.prompts.goal_oriented_knowledge_explorer import (
     goal_oriented_knowledge_explorer_system_prompt,
     goal_oriented_knowledge_explorer_task_prompt,
@@ -26,7 +27,7 @@ class GoalOrientedKnowledgeExplorer(BaseAgent):
     def explore(self, payload: KnowledgeExplorePayload | Mapping[str, Any] | str | dict):
         if not isinstance(payload, KnowledgeExplorePayload):
             payload = KnowledgeExplorePayload.model_validate(payload)
-        raw_output = self.invoke(payload.model_dump(), task_prompt=goal_oriented_knowledge_explorer_task_prompt)
+        raw_output = self.invoke(payload.model_dump(), task_prompt=goal_oriented_knowledge_explorer_task_prompt, json_schema=KnowledgePoints)
         validated_output = KnowledgePoints.model_validate(raw_output)
         return validated_output.model_dump()
 
@@ -41,5 +42,5 @@ def explore_knowledge_points_with_llm(llm, learner_profile, learning_path, learn
         "learning_path": learning_path,
         "learning_session": learning_session,
     }
-    explorer = GoalOrientedKnowledgeExplorer(llm)
+    explorer = get_agent_pool().get(GoalOrientedKnowledgeExplorer, llm)
     return explorer.explore(input_dict)
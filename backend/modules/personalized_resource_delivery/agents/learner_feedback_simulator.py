@@ -46,7 +46,7 @@ class LearnerFeedbackSimulator(BaseAgent):
         task_prompt = learner_feedback_simulator_task_prompt_path
         if not isinstance(payload, LearningPathFeedbackPayload):
             payload = LearningPathFeedbackPayload.model_validate(payload)
-        raw_output = self.invoke(payload.model_dump(), task_prompt=task_prompt)
+        raw_output = self.invoke(payload.model_dump(), task_prompt=task_prompt, json_schema=LearnerFeedback)
         validated_output = LearnerFeedback.model_validate(raw_output)
         return validated_output.model_dump()
 
@@ -54,6 +54,6 @@ class LearnerFeedbackSimulator(BaseAgent):
         task_prompt = learner_feedback_simulator_task_prompt_content
         if not isinstance(payload, LearningContentFeedbackPayload):
             payload = LearningContentFeedbackPayload.model_validate(payload)
-        raw_output = self.invoke(payload.model_dump(), task_prompt=task_prompt)
+        raw_output = self.invoke(payload.model_dump(), task_prompt=task_prompt, json_schema=LearnerFeedback)
         validated_output = LearnerFeedback.model_validate(raw_output)
         return validated_output.model_dump()
\ No newline at end of file
@@ -5,6 +5,7 @@ from typing import Any, Mapping, Optional
 from pydantic import BaseModel, Field, field_validator
 
 from base import BaseAgent
+from base.agent_pool import get_agent_pool
 from base.search_rag import SearchRagManager, format_docs
 from modules.personalized_resource_delivery.prompts.learning_content_creator import (
     learning_content_creator_system_prompt,
@@ -36,27 +37,27 @@ class LearningContentCreator(BaseAgent):
     def prepare_outline(self, payload: ContentBasePayload | Mapping[str, Any] | str):
         if not isinstance(payload, ContentBasePayload):
             payload = ContentBasePayload.model_validate(payload)
-        raw_output = self.invoke(payload.model_dump(), task_prompt=learning_content_creator_task_prompt_outline)
+        raw_output = self.invoke(payload.model_dump(), task_prompt=learning_content_creator_task_prompt_outline, json_schema=ContentOutline)
         validated_output = ContentOutline.model_validate(raw_output)
         return validated_output.model_dump()
 
     def draft_section(self, payload: ContentDraftPayload | Mapping[str, Any] | str):
         if not isinstance(payload, ContentDraftPayload):
             payload = ContentDraftPayload.model_validate(payload)
-        raw_output = self.invoke(payload.model_dump(), task_prompt=learning_content_creator_task_prompt_draft)
+        raw_output = self.invoke(payload.model_dump(), task_prompt=learning_content_creator_task_prompt_draft, json_schema=KnowledgeDraft)
         validated_output = KnowledgeDraft.model_validate(raw_output)
         return validated_output.model_dump()
 
     def create_content(self, payload: ContentBasePayload | Mapping[str, Any] | str):
         if not isinstance(payload, ContentBasePayload):
             payload = ContentBasePayload.model_validate(payload)
-        raw_output = self.invoke(payload.model_dump(), task_prompt=learning_content_creator_task_prompt_content)
+        raw_output = self.invoke(payload.model_dump(), task_prompt=learning_content_creator_task_prompt_content, json_schema=LearningContent)
         validated_output = LearningContent.model_validate(raw_output)
         return validated_output.model_dump()
 
 
 def prepare_content_outline_with_llm(llm, learner_profile, learning_path, learning_session, *, search_rag_manager: Optional[SearchRagManager] = None):
-    creator = LearningContentCreator(llm, search_rag_manager=search_rag_manager)
+    creator = get_agent_pool().get(LearningContentCreator, llm, search_rag_manager=search_rag_manager)
     payload = {
         "learner_profile": learner_profile,
         "learning_path": learning_path,
@@ -124,7 +125,7 @@ def create_learning_content_with_llm(
         learning_content["quizzes"] = document_quiz
         return learning_content
     else:
-        creator = LearningContentCreator(llm, search_rag_manager=search_rag_manager)
+        creator = get_agent_pool().get(LearningContentCreator, llm, search_rag_manager=search_rag_manager)
         if document_outline is None:
             document_outline = prepare_content_outline_with_llm(
                 llm,
@@ -6,6 +6,7 @@ from typing import Any, Mapping
 from pydantic import BaseModel, field_validator
 
 from base import BaseAgent
+from base.agent_pool import get_agent_pool
 from ..prompts.learning_document_integrator import integrated_document_generator_system_prompt, integrated_document_generator_task_prompt
 from ..schemas import DocumentStructure
 
@@ -42,7 +43,7 @@ class LearningDocumentIntegrator(BaseAgent):
             payload = IntegratedDocPayload.model_validate(payload)
         
         try:
-            raw_output = self.invoke(payload.model_dump(), task_prompt=integrated_document_generator_task_prompt)
+            raw_output = self.invoke(payload.model_dump(), task_prompt=integrated_document_generator_task_prompt, json_schema=DocumentStructure)
         except Exception as e:
             logger.error(f"LLM invoke failed: {e}. Creating fallback structure.")
             raw_output = self._create_minimal_fallback(payload)
@@ -119,7 +120,7 @@ def integrate_learning_document_with_llm(llm, learner_profile, learning_path, le
         'knowledge_points': knowledge_points,
         'knowledge_drafts': knowledge_drafts
     }
-    learning_document_integrator = LearningDocumentIntegrator(llm)
+    learning_document_integrator = get_agent_pool().get(LearningDocumentIntegrator, llm)
     document_structure = learning_document_integrator.integrate(input_dict)
     if not output_markdown:
         return document_structure
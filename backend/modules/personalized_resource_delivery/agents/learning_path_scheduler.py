@@ -1,8 +1,10 @@
-from typing import Any, Dict, Mapping, Optional, Protocol, Sequence, Union, runtime_checkable
-from pydantic import BaseModel, Field, field_validator
+import logging
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Protocol, Sequence, Tuple, Union, runtime_checkable
+from pydantic import BaseModel, Field, ValidationError, field_validator
 
 from base import BaseAgent
-from ..schemas import LearningPath
+from base.agent_pool import get_agent_pool
+from ..schemas import MAX_LEARNING_PATH_SESSIONS, LearningPath, SessionItem
 from modules.personalized_resource_delivery.prompts.learning_path_scheduling import (
     learning_path_scheduler_system_prompt,
     learning_path_scheduler_task_prompt_reflexion,
@@ -10,6 +12,7 @@ from modules.personalized_resource_delivery.prompts.learning_path_scheduling imp
     learning_path_scheduler_task_prompt_session,
 )
 
+logger = logging.getLogger(__name__)
 
 JSONDict = Dict[str, Any]
 
@@ -53,15 +56,44 @@ class LearningPathScheduler(BaseAgent):
         """Schedule sessions based on learner profile and desired count."""
         payload_dict = SessionSchedulePayload(**input_dict).model_dump()
         task_prompt = learning_path_scheduler_task_prompt_session
-        raw_output = self.invoke(payload_dict, task_prompt=task_prompt)
+        raw_output = self.invoke(payload_dict, task_prompt=task_prompt, json_schema=LearningPath)
         validated_output = LearningPath.model_validate(raw_output)
         return validated_output.model_dump()
 
+    def stream_session(self, input_dict: Dict[str, Any]) -> Iterator[Tuple[str, JSONDict]]:
+        """Same as :meth:`schedule_session`, but yields sessions as they are generated.
+
+        Yields `("session", {"index", "session"})` for each session validated
+        as a `SessionItem` as soon as its object closes, then
+        `("learning_path", ...)` with the path made of those sessions.
+        Sessions that fail validation are logged and left out; generation
+        stops once the path holds `MAX_LEARNING_PATH_SESSIONS`, so every
+        streamed session is part of the final path. Raises `ValidationError`
+        before the final path if no session was valid.
+        """
+        payload_dict = SessionSchedulePayload(**input_dict).model_dump()
+        task_prompt = learning_path_scheduler_task_prompt_session
+        sessions: List[SessionItem] = []
+        for path, value in self.stream_json(payload_dict, task_prompt=task_prompt, json_schema=LearningPath):
+            if len(path) != 2 or path[0] != "learning_path" or not isinstance(value, dict):
+                continue
+            try:
+                session = SessionItem.model_validate(value)
+            except ValidationError as e:
+                logger.warning(f"⚠️ Dropping invalid session {path[1]} from the stream: {e}")
+                continue
+            sessions.append(session)
+            yield "session", {"index": len(sessions) - 1, "session": session.model_dump(mode="json")}
+            if len(sessions) == MAX_LEARNING_PATH_SESSIONS:
+                logger.warning(f"⚠️ Learning path reached {MAX_LEARNING_PATH_SESSIONS} sessions; stopping generation")
+                break
+        yield "learning_path", LearningPath(learning_path=sessions).model_dump(mode="json")
+
     def reflexion(self, input_dict: Dict[str, Any]) -> JSONDict:
         """Refine the learning path based on evaluator feedback."""
         payload_dict = LearningPathRefinementPayload(**input_dict).model_dump()
         task_prompt = learning_path_scheduler_task_prompt_reflexion
-        raw_output = self.invoke(payload_dict, task_prompt=task_prompt)
+        raw_output = self.invoke(payload_dict, task_prompt=task_prompt, json_schema=LearningPath)
         validated = LearningPath.model_validate(raw_output)
         return validated.model_dump()
 
@@ -70,7 +102,7 @@ class LearningPathScheduler(BaseAgent):
 
         payload_dict = LearningPathReschedulePayload(**input_dict).model_dump()
         task_prompt = learning_path_scheduler_task_prompt_reschedule
-        raw_output = self.invoke(payload_dict, task_prompt=task_prompt)
+        raw_output = self.invoke(payload_dict, task_prompt=task_prompt, json_schema=LearningPath)
         validated = LearningPath.model_validate(raw_output)
         return validated.model_dump()
 
@@ -82,7 +114,7 @@ def schedule_learning_path_with_llm(
 ) -> JSONDict:
     """Convenience helper to create a scheduler and produce a new learning path."""
 
-    learning_path_scheduler = LearningPathScheduler(llm)
+    learning_path_scheduler = get_agent_pool().get(LearningPathScheduler, llm)
     payload_dict = {
         "learner_profile": learner_profile,
         "session_count": session_count,
@@ -90,6 +122,21 @@ def schedule_learning_path_with_llm(
     return learning_path_scheduler.schedule_session(payload_dict)
 
 
+def stream_learning_path_with_llm(
+    llm: Any,
+    learner_profile: Mapping[str, Any],
+    session_count: int = 0,
+) -> Iterator[Tuple[str, JSONDict]]:
+    """Streaming variant of :func:`schedule_learning_path_with_llm`; see :meth:`LearningPathScheduler.stream_session`."""
+
+    learning_path_scheduler = get_agent_pool().get(LearningPathScheduler, llm)
+    payload_dict = {
+        "learner_profile": learner_profile,
+        "session_count": session_count,
+    }
+    yield from learning_path_scheduler.stream_session(payload_dict)
+
+
 def reschedule_learning_path_with_llm(
     llm: Any,
     learning_path: Sequence[Any],
@@ -102,7 +149,7 @@ def reschedule_learning_path_with_llm(
 ) -> JSONDict:
     """Convenience helper to reschedule an existing learning path via the scheduler."""
 
-    learning_path_scheduler = LearningPathScheduler(llm)
+    learning_path_scheduler = get_agent_pool().get(LearningPathScheduler, llm)
     payload_dict = {
         "learner_profile": learner_profile,
         "learning_path": learning_path,
@@ -122,7 +169,7 @@ def refine_learning_path_with_llm(
 ) -> JSONDict:
     """Convenience helper around :meth:`LearningPathScheduler.reflexion`."""
 
-    learning_path_scheduler = LearningPathScheduler(llm)
+    learning_path_scheduler = get_agent_pool().get(LearningPathScheduler, llm)
     payload_dict = {
         "learning_path": learning_path,
         "feedback": feedback,
@@ -136,6 +183,7 @@ __all__ = [
     "LearningPathReschedulePayload",
     "SessionSchedulePayload",
     "schedule_learning_path_with_llm",
+    "stream_learning_path_with_llm",
     "refine_learning_path_with_llm",
     "reschedule_learning_path_with_llm",
 ]
\ No newline at end of file
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import ast
+import contextvars
 from typing import Any, Mapping, Optional, List
 from concurrent.futures import ThreadPoolExecutor
 
 from pydantic import BaseModel, field_validator
 
 from base import BaseAgent
+from base.agent_pool import get_agent_pool
 from base.search_rag import SearchRagManager, format_docs
 from modules.personalized_resource_delivery.prompts.search_enhanced_knowledge_drafter import (
     search_enhanced_knowledge_drafter_system_prompt,
@@ -62,7 +64,7 @@ class SearchEnhancedKnowledgeDrafter(BaseAgent):
             if context:
                 ext = data.get("external_resources") or ""
                 data["external_resources"] = f"{ext}{context}"
-        raw_output = self.invoke(data, task_prompt=search_enhanced_knowledge_drafter_task_prompt)
+        raw_output = self.invoke(data, task_prompt=search_enhanced_knowledge_drafter_task_prompt, json_schema=KnowledgeDraft)
 
         if isinstance(raw_output, str):
             try:
@@ -93,7 +95,7 @@ def draft_knowledge_point_with_llm(
     search_rag_manager: Optional[SearchRagManager] = None,
 ):
     """Draft a single knowledge point using the agent, optionally enriching with a SearchRagManager."""
-    drafter = SearchEnhancedKnowledgeDrafter(llm, search_rag_manager=search_rag_manager, use_search=use_search)
+    drafter = get_agent_pool().get(SearchEnhancedKnowledgeDrafter, llm, search_rag_manager=search_rag_manager, use_search=use_search)
     payload = {
         "learner_profile": learner_profile,
         "learning_path": learning_path,
@@ -149,7 +151,9 @@ def draft_knowledge_points_with_llm(
 
     if allow_parallel:
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            return list(executor.map(draft_one, knowledge_points))
+            # Each draft runs in a copy of this context so it keeps the caller's inference priority
+            futures = [executor.submit(contextvars.copy_context().run, draft_one, kp) for kp in knowledge_points]
+            return [future.result() for future in futures]
     else:
         results: List[Any] = []
         for kp in knowledge_points:
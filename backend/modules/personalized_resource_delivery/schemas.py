@@ -55,14 +55,17 @@ class SessionItem(BaseModel):
         return [s for s in (str(x).strip() for x in v) if s]
 
 
+MAX_LEARNING_PATH_SESSIONS = 10
+
+
 class LearningPath(BaseModel):
     learning_path: List[SessionItem]
 
     @field_validator("learning_path")
     @classmethod
     def limit_sessions(cls, v: List[SessionItem]) -> List[SessionItem]:
-        if not (1 <= len(v) <= 10):
-            raise ValueError("Learning path must contain between 1 and 10 sessions.")
+        if not (1 <= len(v) <= MAX_LEARNING_PATH_SESSIONS):
+            raise ValueError(f"Learning path must contain between 1 and {MAX_LEARNING_PATH_SESSIONS} sessions.")
         return v
 
 
@@ -4,6 +4,8 @@ from collections.abc import Mapping
 from typing import Any, Dict, TypeAlias
 
 from base import BaseAgent
+from base.agent_pool import get_agent_pool
+from base.semantic_cache import SemanticCache, get_semantic_cache, llm_identity
 from ..prompts.learning_goal_refiner import learning_goal_refiner_system_prompt, learning_goal_refiner_task_prompt
 from ..schemas import RefinedLearningGoal
 from pydantic import BaseModel, Field
@@ -34,7 +36,7 @@ class LearningGoalRefiner(BaseAgent):
 
 		payload_dict = RefineGoalPayload(**input_dict).model_dump()
 		task_prompt = learning_goal_refiner_task_prompt
-		raw_output = self.invoke(payload_dict, task_prompt=task_prompt)
+		raw_output = self.invoke(payload_dict, task_prompt=task_prompt, json_schema=RefinedLearningGoal)
 		validated = RefinedLearningGoal.model_validate(raw_output)
 		return validated.model_dump()
 
@@ -43,12 +45,23 @@ def refine_learning_goal_with_llm(
 	learning_goal: str,
 	learner_information: str = "",
 ) -> JSONDict:
-	"""Refine a learner's goal using the provided LLM."""
-
-	refiner = LearningGoalRefiner(llm)
-	return refiner.refine_goal(
-		{
-			"learning_goal": learning_goal,
-			"learner_information": learner_information,
-		}
-	)
+	"""Refine a learner's goal using the provided LLM.
+
+	Served from the semantic cache when a similar goal was refined before for
+	the same learner information and model.
+	"""
+
+	def refine() -> JSONDict:
+		refiner = get_agent_pool().get(LearningGoalRefiner, llm)
+		return refiner.refine_goal(
+			{
+				"learning_goal": learning_goal,
+				"learner_information": learner_information,
+			}
+		)
+
+	cache = get_semantic_cache()
+	if cache is None:
+		return refine()
+	context = SemanticCache.context_key(llm_identity(llm), learner_information)
+	return cache.get_or_compute("refine_learning_goal", learning_goal, refine, context=context)
@@ -0,0 +1,100 @@
+"""Partial repair of list-shaped agent outputs.
+
+When only some entries of a generated list break a rule, re-generating the
+whole answer wastes a model call on entries that were already fine. The
+agents here review each entry, keep the valid ones and ask the model only
+for replacements of the offending or missing ones.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# validate(entry) -> (normalized entry, None) or (None, violated rule)
+EntryValidator = Callable[[Any], Tuple[Optional[Dict[str, Any]], Optional[str]]]
+
+
+@dataclass
+class ListReview:
+    """Outcome of reviewing a generated list against the agent's rules."""
+
+    kept: List[Dict[str, Any]] = field(default_factory=list)
+    offending: List[Tuple[Any, str]] = field(default_factory=list)  # (entry, violated rule)
+    missing: List[str] = field(default_factory=list)  # required names not covered by a kept entry
+    min_items: int = 1
+    max_items: int = 10
+
+    @property
+    def ok(self) -> bool:
+        # Offending entries are simply dropped once the kept ones satisfy the bounds
+        return not self.missing and self.min_items <= len(self.kept) <= self.max_items
+
+    @property
+    def needed(self) -> int:
+        """How many new entries the repair should return."""
+        wanted = max(len(self.offending), len(self.missing), self.min_items - len(self.kept))
+        return max(min(wanted, self.max_items - len(self.kept)), 0)
+
+    def problems(self) -> str:
+        """One-line summary of what is wrong, for logs and the final error."""
+        parts = [f"{_entry_name(entry)!r}: {rule}" for entry, rule in self.offending]
+        if self.missing:
+            parts.append(f"missing required skills {self.missing}")
+        if not self.min_items <= len(self.kept) <= self.max_items:
+            parts.append(f"{len(self.kept)} valid entries, expected {self.min_items}-{self.max_items}")
+        return "; ".join(parts)
+
+    def repair_variables(self) -> Dict[str, Any]:
+        """Prompt variables describing the kept and offending entries."""
+        missing_note = (
+            f"**Also cover these required skills, reusing their exact names**: {self.missing}" if self.missing else ""
+        )
+        return {
+            "kept_items": self.kept or "(none)",
+            "offending_items": [{"entry": entry, "violated_rule": rule} for entry, rule in self.offending] or "(none)",
+            "missing_note": missing_note,
+            "needed": self.needed,
+        }
+
+
+def _entry_name(entry: Any) -> str:
+    return str(entry.get("name", "")).strip() if isinstance(entry, dict) else str(entry)[:40]
+
+
+def extract_items(raw_output: Any, key: str) -> Optional[List[Any]]:
+    """The list under `key` of a parsed output, or None if it has no such list."""
+    items = raw_output.get(key) if isinstance(raw_output, dict) else None
+    return items if isinstance(items, list) else None
+
+
+def review_items(
+    items: Sequence[Any],
+    validate: EntryValidator,
+    *,
+    min_items: int,
+    max_items: int,
+    required_names: Sequence[str] = (),
+) -> ListReview:
+    """Split `items` into valid entries (deduplicated by name, at most
+    `max_items`, required names first) and offending ones."""
+    review = ListReview(min_items=min_items, max_items=max_items)
+    seen = set()
+    for item in items:
+        entry, rule = validate(item)
+        if rule is not None:
+            review.offending.append((item, rule))
+            continue
+        key = entry["name"].strip().lower()
+        if key in seen:  # a duplicate name adds nothing; drop it
+            continue
+        seen.add(key)
+        review.kept.append(entry)
+
+    required = {name.strip().lower() for name in required_names}
+    if len(review.kept) > max_items:
+        review.kept.sort(key=lambda entry: entry["name"].strip().lower() not in required)
+        review.kept = review.kept[:max_items]
+    kept_names = {entry["name"].strip().lower() for entry in review.kept}
+    review.missing = [name for name in required_names if name.strip().lower() not in kept_names]
+    return review
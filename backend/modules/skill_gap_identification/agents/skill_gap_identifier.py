@@ -1,19 +1,28 @@
 from __future__ import annotations
 
 from collections.abc import Mapping
-from typing import Any, Dict, Optional, Tuple, TypeAlias
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeAlias
 import logging
 
 from pydantic import BaseModel, Field, ValidationError
 from base import BaseAgent
-from ..prompts.skill_gap_identifier import skill_gap_identifier_system_prompt, skill_gap_identifier_task_prompt
-from ..schemas import SkillRequirements, SkillGaps
-from .skill_requirement_mapper import SkillRequirementMapper
-from .learning_goal_refiner import LearningGoalRefiner
+from base.agent_pool import get_agent_pool
+from base.speculative import AttemptsExhausted
+from ..prompts.skill_gap_identifier import (
+    skill_gap_identifier_repair_prompt,
+    skill_gap_identifier_system_prompt,
+    skill_gap_identifier_task_prompt,
+)
+from ..schemas import SkillGap, SkillRequirements, SkillGaps
+from .partial_repair import ListReview, extract_items, review_items
+from .skill_requirement_mapper import map_goal_to_skills_with_llm
+from .learning_goal_refiner import refine_learning_goal_with_llm
 
 JSONDict: TypeAlias = Dict[str, Any]
 logger = logging.getLogger(__name__)
 
+_LEVEL_ORDER = {"unlearned": 0, "beginner": 1, "intermediate": 2, "advanced": 3}
+
 
 class SkillGapPayload(BaseModel):
     """Payload for identifying skill gaps (validated)."""
@@ -56,55 +65,49 @@ class SkillGapIdentifier(BaseAgent):
         )
         max_attempts = 3
         last_error: Optional[Exception] = None
+        review: Optional[ListReview] = None
+        validate = self._gap_validator(requirement_lookup)
+        required_names = [item["name"].strip() for item in requirement_list if isinstance(item, dict)]
 
-        for attempt in range(max_attempts):
-            if attempt == 0:
-                extra_clarifier = default_reinforcement
-            elif attempt == 1:
-                extra_clarifier = (
-                    f"{default_reinforcement} PRIOR ATTEMPT FAILED. Precisely match requirement names/levels, "
-                    "eliminate duplicates, and tighten evidence references."
-                )
-            else:
-                extra_clarifier = (
-                    f"{default_reinforcement} FINAL ATTEMPT. Fix the prior violation immediately and ensure each reason cites "
-                    "specific projects, achievements, or missing evidence."
-                )
-
-            payload_dict["reinforcement"] = extra_clarifier
+        def review_gaps(items: List[Any]) -> ListReview:
+            return review_items(items, validate, min_items=4, max_items=6, required_names=required_names)
 
+        for attempt in range(max_attempts):
             try:
-                raw_output = self.invoke(payload_dict, task_prompt=task_prompt)
-                validated = SkillGaps.model_validate(raw_output)
-                result = validated.model_dump()
-
-                gaps = result.get("skill_gaps", [])
-                if not gaps:
-                    raise ValueError("No skill gaps returned.")
-
-                if not 4 <= len(gaps) <= 6:
-                    raise ValueError(f"Expected 4-6 skill gaps, got {len(gaps)}.")
-
-                normalized_gap_names = set()
-                for gap in gaps:
-                    name = gap["name"].strip()
-                    lower_name = name.lower()
-                    if lower_name in normalized_gap_names:
-                        raise ValueError(f"Duplicate skill gap detected: {name}")
-                    normalized_gap_names.add(lower_name)
-
-                    if lower_name in requirement_lookup:
-                        expected_level = requirement_lookup[lower_name]["required_level"]
-                        if gap["required_level"] != expected_level:
-                            raise ValueError(
-                                f"Required level mismatch for '{name}': expected '{expected_level}', got '{gap['required_level']}'."
-                            )
-
-                missing = [item_name for item_name in requirement_lookup.keys() if item_name not in normalized_gap_names]
-                if missing:
-                    raise ValueError(f"Missing required skills in gaps output: {missing}")
-
-                return result
+                if review is None:
+                    # Nothing usable yet: generate the whole list
+                    if attempt == 0:
+                        extra_clarifier = default_reinforcement
+                    elif attempt == 1:
+                        extra_clarifier = (
+                            f"{default_reinforcement} PRIOR ATTEMPT FAILED. Precisely match requirement names/levels, "
+                            "eliminate duplicates, and tighten evidence references."
+                        )
+                    else:
+                        extra_clarifier = (
+                            f"{default_reinforcement} FINAL ATTEMPT. Fix the prior violation immediately and ensure each reason cites "
+                            "specific projects, achievements, or missing evidence."
+                        )
+                    payload_dict["reinforcement"] = extra_clarifier
+                    review = self._generate_review(payload_dict, task_prompt, review_gaps)
+                else:
+                    # Keep the valid gaps and only ask for the offending or missing ones
+                    logger.info(
+                        "[SkillGapIdentifier] Attempt %d repairs %d entries, keeping %d",
+                        attempt + 1,
+                        review.needed,
+                        len(review.kept),
+                    )
+                    raw_output = self.invoke(
+                        {**payload_dict, **review.repair_variables()},
+                        task_prompt=skill_gap_identifier_repair_prompt,
+                        json_schema=SkillGaps,
+                    )
+                    review = review_gaps(review.kept + (extract_items(raw_output, "skill_gaps") or []))
+
+                if review.ok:
+                    return SkillGaps.model_validate({"skill_gaps": review.kept}).model_dump()
+                raise ValueError(review.problems())
             except (ValidationError, ValueError) as exc:
                 last_error = exc
                 logger.warning(
@@ -117,6 +120,56 @@ class SkillGapIdentifier(BaseAgent):
         assert last_error is not None
         raise last_error
 
+    def _generate_review(
+        self,
+        payload_dict: JSONDict,
+        task_prompt: str,
+        review_gaps: Callable[[List[Any]], ListReview],
+    ) -> ListReview:
+        """Generate the whole list, as concurrent speculative attempts when
+        configured: the first valid one wins, else the one needing the
+        fewest repairs is kept for partial repair."""
+
+        def attempt(index: int) -> ListReview:
+            raw_output = self.invoke(
+                payload_dict, task_prompt=task_prompt, json_schema=SkillGaps, **self.speculative.model_kwargs(index)
+            )
+            items = extract_items(raw_output, "skill_gaps")
+            if items is None:
+                raise ValueError("No skill gaps returned.")
+            return review_gaps(items)
+
+        try:
+            return self.speculative.run(attempt, accept=lambda review: review.ok)
+        except AttemptsExhausted as exc:
+            if not exc.rejected:
+                raise exc.errors[-1]
+            return min(exc.rejected, key=lambda review: review.needed)
+
+    @staticmethod
+    def _gap_validator(requirement_lookup: Mapping[str, Mapping[str, Any]]):
+        """Per-entry check: the SkillGap schema, with required_level and is_gap derived where possible."""
+
+        def validate(item: Any) -> Tuple[Optional[JSONDict], Optional[str]]:
+            if not isinstance(item, dict):
+                return None, "not a skill gap object"
+            item = dict(item)
+            requirement = requirement_lookup.get(str(item.get("name", "")).strip().lower())
+            if requirement is not None:
+                # The level is dictated by the requirement, so fix it here rather than asking the model
+                item["required_level"] = requirement["required_level"]
+            # Likewise is_gap follows from the two levels
+            current = str(getattr(item.get("current_level"), "value", item.get("current_level")))
+            required = str(getattr(item.get("required_level"), "value", item.get("required_level")))
+            if current in _LEVEL_ORDER and required in _LEVEL_ORDER:
+                item["is_gap"] = _LEVEL_ORDER[current] < _LEVEL_ORDER[required]
+            try:
+                return SkillGap.model_validate(item).model_dump(), None
+            except ValidationError as exc:
+                return None, "; ".join(error["msg"] for error in exc.errors())
+
+        return validate
+
 def identify_skill_gap_with_llm(
     llm: Any,
     learning_goal: str,
@@ -127,13 +180,7 @@ def identify_skill_gap_with_llm(
 
     refined_goal = learning_goal
     try:
-        refiner = LearningGoalRefiner(llm)
-        refined_output = refiner.refine_goal(
-            {
-                "learning_goal": learning_goal,
-                "learner_information": learner_information,
-            }
-        )
+        refined_output = refine_learning_goal_with_llm(llm, learning_goal, learner_information)
         candidate = refined_output.get("refined_goal")
         if isinstance(candidate, str) and len(candidate.strip()) >= 5:
             refined_goal = candidate.strip()
@@ -142,12 +189,11 @@ def identify_skill_gap_with_llm(
 
     # Compute requirements if not provided
     if not skill_requirements:
-        mapper = SkillRequirementMapper(llm)
-        effective_requirements = mapper.map_goal_to_skill({"learning_goal": refined_goal})
+        effective_requirements = map_goal_to_skills_with_llm(llm, refined_goal)
     else:
         effective_requirements = skill_requirements
 
-    skill_gap_identifier = SkillGapIdentifier(llm)
+    skill_gap_identifier = get_agent_pool().get(SkillGapIdentifier, llm)
     skill_gaps = skill_gap_identifier.identify_skill_gap(
         {
             "learning_goal": refined_goal,
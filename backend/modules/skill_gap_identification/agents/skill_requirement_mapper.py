@@ -1,13 +1,21 @@
 from __future__ import annotations
 
 from collections.abc import Mapping
-from typing import Any, Dict, Optional, TypeAlias
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeAlias
 import logging
 
 from pydantic import BaseModel, Field, ValidationError
 from base import BaseAgent
-from ..prompts.skill_requirement_mapper import skill_requirement_mapper_system_prompt, skill_requirement_mapper_task_prompt
-from ..schemas import SkillRequirements
+from base.agent_pool import get_agent_pool
+from base.semantic_cache import SemanticCache, get_semantic_cache, llm_identity
+from base.speculative import AttemptsExhausted
+from ..prompts.skill_requirement_mapper import (
+	skill_requirement_mapper_repair_prompt,
+	skill_requirement_mapper_system_prompt,
+	skill_requirement_mapper_task_prompt,
+)
+from ..schemas import SkillRequirement, SkillRequirements
+from .partial_repair import ListReview, extract_items, review_items
 
 
 JSONDict: TypeAlias = Dict[str, Any]
@@ -53,55 +61,53 @@ class SkillRequirementMapper(BaseAgent):
 		)
 		max_attempts = 3
 		last_error: Optional[Exception] = None
+		review: Optional[ListReview] = None
 
-		for attempt in range(max_attempts):
-			if attempt == 0:
-				extra_clarifier = default_reinforcement
-			elif attempt == 1:
-				extra_clarifier = (
-					f"{default_reinforcement} PRIOR ATTEMPT FAILED. Obey every rule precisely, produce dense technical phrasing, "
-					"and eliminate overlaps between skills."
-				)
-			else:
-				extra_clarifier = (
-					f"{default_reinforcement} FINAL ATTEMPT. Correct the last error immediately and do NOT return beginner-level "
-					"skills unless the goal literally includes beginner keywords."
-				)
+		goal_text = payload_dict["learning_goal"].lower()
+		allow_beginner = any(
+			marker in goal_text for marker in ("beginner", "basic", "intro", "fundamental", "novice")
+		)
+		validate = self._skill_validator(allow_beginner)
 
-			payload_dict["reinforcement"] = extra_clarifier
+		def review_skills(items: List[Any]) -> ListReview:
+			return review_items(items, validate, min_items=4, max_items=6)
 
+		for attempt in range(max_attempts):
 			try:
-				raw_output = self.invoke(payload_dict, task_prompt=task_prompt)
-				validated = SkillRequirements.model_validate(raw_output)
-				result = validated.model_dump()
-
-				skills = result.get("skill_requirements", [])
-				if not skills:
-					raise ValueError("No skills returned.")
-
-				if not 4 <= len(skills) <= 6:
-					raise ValueError(f"Expected 4-6 skills, got {len(skills)}.")
-
-				goal_text = payload_dict["learning_goal"].lower()
-				allow_beginner = any(
-					marker in goal_text for marker in ("beginner", "basic", "intro", "fundamental", "novice")
-				)
-
-				trivial_hits = [
-					skill for skill in skills if any(marker in skill["name"].lower() for marker in _TRIVIAL_MARKERS)
-				]
-				if trivial_hits and not allow_beginner:
-					raise ValueError(f"Trivial skill phrases detected: {[skill['name'] for skill in trivial_hits]}")
-
-				if not allow_beginner:
-					beginner_levels = [skill for skill in skills if skill["required_level"] == "beginner"]
-					if beginner_levels:
-						raise ValueError(
-							f"Beginner required levels detected without explicit beginner intent: "
-							f"{[skill['name'] for skill in beginner_levels]}"
+				if review is None:
+					# Nothing usable yet: generate the whole list
+					if attempt == 0:
+						extra_clarifier = default_reinforcement
+					elif attempt == 1:
+						extra_clarifier = (
+							f"{default_reinforcement} PRIOR ATTEMPT FAILED. Obey every rule precisely, produce dense technical phrasing, "
+							"and eliminate overlaps between skills."
 						)
-
-				return result
+					else:
+						extra_clarifier = (
+							f"{default_reinforcement} FINAL ATTEMPT. Correct the last error immediately and do NOT return beginner-level "
+							"skills unless the goal literally includes beginner keywords."
+						)
+					payload_dict["reinforcement"] = extra_clarifier
+					review = self._generate_review(payload_dict, task_prompt, review_skills)
+				else:
+					# Keep the valid skills and only ask for the offending or missing ones
+					logger.info(
+						"[SkillRequirementMapper] Attempt %d repairs %d skills, keeping %d",
+						attempt + 1,
+						review.needed,
+						len(review.kept),
+					)
+					raw_output = self.invoke(
+						{**payload_dict, **review.repair_variables()},
+						task_prompt=skill_requirement_mapper_repair_prompt,
+						json_schema=SkillRequirements,
+					)
+					review = review_skills(review.kept + (extract_items(raw_output, "skill_requirements") or []))
+
+				if review.ok:
+					return SkillRequirements.model_validate({"skill_requirements": review.kept}).model_dump()
+				raise ValueError(review.problems())
 			except (ValidationError, ValueError) as exc:
 				last_error = exc
 				logger.warning(
@@ -114,8 +120,61 @@ class SkillRequirementMapper(BaseAgent):
 		assert last_error is not None
 		raise last_error
 
+	def _generate_review(
+		self,
+		payload_dict: JSONDict,
+		task_prompt: str,
+		review_skills: Callable[[List[Any]], ListReview],
+	) -> ListReview:
+		"""Generate the whole list, as concurrent speculative attempts when
+		configured: the first valid one wins, else the one needing the
+		fewest repairs is kept for partial repair."""
+
+		def attempt(index: int) -> ListReview:
+			raw_output = self.invoke(
+				payload_dict, task_prompt=task_prompt, json_schema=SkillRequirements, **self.speculative.model_kwargs(index)
+			)
+			items = extract_items(raw_output, "skill_requirements")
+			if items is None:
+				raise ValueError("No skills returned.")
+			return review_skills(items)
+
+		try:
+			return self.speculative.run(attempt, accept=lambda review: review.ok)
+		except AttemptsExhausted as exc:
+			if not exc.rejected:
+				raise exc.errors[-1]
+			return min(exc.rejected, key=lambda review: review.needed)
+
+	@staticmethod
+	def _skill_validator(allow_beginner: bool):
+		"""Per-entry check: the SkillRequirement schema, plus no introductory skills unless the goal asks for them."""
+
+		def validate(item: Any) -> Tuple[Optional[JSONDict], Optional[str]]:
+			try:
+				skill = SkillRequirement.model_validate(item).model_dump()
+			except ValidationError as exc:
+				return None, "; ".join(error["msg"] for error in exc.errors())
+			if not allow_beginner:
+				if any(marker in skill["name"].lower() for marker in _TRIVIAL_MARKERS):
+					return None, "trivial/introductory skill phrasing"
+				if skill["required_level"] == "beginner":
+					return None, "beginner required level without explicit beginner intent in the goal"
+			return skill, None
+
+		return validate
+
 
 def map_goal_to_skills_with_llm(llm: Any, learning_goal: str) -> JSONDict:
-	mapper = SkillRequirementMapper(llm)
-	return mapper.map_goal_to_skill({"learning_goal": learning_goal})
+	"""Map a goal to required skills, reusing the result of a semantically similar goal."""
+
+	def map_goal() -> JSONDict:
+		mapper = get_agent_pool().get(SkillRequirementMapper, llm)
+		return mapper.map_goal_to_skill({"learning_goal": learning_goal})
+
+	cache = get_semantic_cache()
+	if cache is None:
+		return map_goal()
+	context = SemanticCache.context_key(llm_identity(llm))
+	return cache.get_or_compute("map_goal_to_skills", learning_goal, map_goal, context=context)
 
@@ -1,3 +1,3 @@
 from .learning_goal_refiner import learning_goal_refiner_system_prompt, learning_goal_refiner_task_prompt
-from .skill_gap_identifier import skill_gap_identifier_system_prompt, skill_gap_identifier_task_prompt
-from .skill_requirement_mapper import skill_requirement_mapper_system_prompt, skill_requirement_mapper_task_prompt
\ No newline at end of file
+from .skill_gap_identifier import skill_gap_identifier_system_prompt, skill_gap_identifier_task_prompt, skill_gap_identifier_repair_prompt
+from .skill_requirement_mapper import skill_requirement_mapper_system_prompt, skill_requirement_mapper_task_prompt, skill_requirement_mapper_repair_prompt
\ No newline at end of file
@@ -66,3 +66,26 @@ Please analyze the learner's goal, their information, and the required skills to
 
 {reinforcement}
 """.strip()
+
+skill_gap_identifier_repair_prompt = """
+Your previous skill gap analysis broke some rules. The valid entries are kept; fix or replace only the entries listed below.
+
+**Learning Goal**:
+{learning_goal}
+
+**Learner Information**:
+{learner_information}
+
+**Required Skills (from Skill Mapper)**:
+{skill_requirements}
+
+**Valid Entries (kept; do not repeat them)**:
+{kept_items}
+
+**Entries to Fix or Replace (with the rule each violated)**:
+{offending_items}
+
+{missing_note}
+
+Return {{"skill_gaps": [...]}} with exactly {needed} new or corrected entries, keeping required_level identical to the required skills.
+""".strip()
@@ -50,4 +50,19 @@ Please analyze the learner's goal and identify the essential skills required to
 {learning_goal}
 
 {reinforcement}
-""".strip()
\ No newline at end of file
+""".strip()
+
+skill_requirement_mapper_repair_prompt = """
+Your previous skill list broke some rules. The valid skills are kept; fix or replace only the entries listed below.
+
+**Learner's Goal**:
+{learning_goal}
+
+**Valid Skills (kept; do not repeat or overlap them)**:
+{kept_items}
+
+**Entries to Fix or Replace (with the rule each violated)**:
+{offending_items}
+
+Return {{"skill_requirements": [...]}} with exactly {needed} new or corrected skills.
+""".strip()
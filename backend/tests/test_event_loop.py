@@ -0,0 +1,114 @@
+"""
+Endpoints must not block the event loop while a generation is in flight
+(see base/inference_executor.py), and a saturated executor must surface as
+503 with Retry-After rather than a generic 500.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("torch")
+
+import main
+from base import shared_llm_wrapper
+from base.inference_executor import InferenceExecutorBusy
+from base.shared_llm import SharedLLM
+from base.shared_llm_wrapper import SharedLLMWrapper
+
+
+class _SlowLLM(SharedLLM):
+    """A SharedLLM whose generation blocks its worker thread until released."""
+
+    def __new__(cls, *args, **kwargs):
+        return object.__new__(cls)
+
+    def __init__(self, started: threading.Event, release: threading.Event):
+        self._model_name = "slow-test-model"
+        self._tokenizer = object()
+        self._started = started
+        self._release = release
+
+    @property
+    def scheduler(self):
+        return None  # generate_batch runs on the inference executor
+
+    @property
+    def chat_template_tokens(self) -> int:
+        return 0
+
+    def max_input_tokens(self, max_new_tokens: int) -> int:
+        return 100_000
+
+    def count_tokens(self, text: str) -> int:
+        return len(text.split())
+
+    def _render_chat(self, prompt, system_instruction=None):
+        return prompt
+
+    def _system_prefix(self, system_instruction):
+        return None
+
+    def _response_cache_entry(self, text, conversation_id, params):
+        return None, None
+
+    def generate_batch(self, texts, **kwargs):
+        self._started.set()
+        self._release.wait(timeout=30)
+        return ["Hello from a slow model"]
+
+
+@pytest.fixture
+def slow_llm(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    llm = _SlowLLM(started, release)
+    monkeypatch.setattr(shared_llm_wrapper, "get_shared_llm", lambda model_name=None: llm)
+    wrapper = SharedLLMWrapper()
+    monkeypatch.setattr(main, "get_llm", lambda *args, **kwargs: wrapper)
+    monkeypatch.setattr(main, "search_rag_manager", None)
+    yield started, release
+    release.set()
+
+
+def test_list_llm_models_completes_during_generation(slow_llm):
+    started, release = slow_llm
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            chat = asyncio.create_task(
+                client.post("/chat-with-tutor", json={"messages": '[{"role": "user", "content": "Hi"}]'})
+            )
+            assert await asyncio.to_thread(started.wait, 10), "generation never started"
+
+            models = await asyncio.wait_for(client.get("/list-llm-models"), timeout=5)
+            assert models.status_code == 200
+            assert "models" in models.json()
+            assert not chat.done(), "the chat request should still be generating"
+
+            release.set()
+            reply = await asyncio.wait_for(chat, timeout=30)
+            assert reply.status_code == 200
+            assert reply.json()["response"] == "Hello from a slow model"
+
+    asyncio.run(scenario())
+
+
+def test_saturated_executor_returns_503_with_retry_after(monkeypatch):
+    async def busy(*args, **kwargs):
+        raise InferenceExecutorBusy("Inference executor is saturated", retry_after=7)
+
+    monkeypatch.setattr(main, "get_llm", lambda *args, **kwargs: object())
+    monkeypatch.setattr(main, "run_inference", busy)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/refine-learning-goal", json={"learning_goal": "Learn pandas"})
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
@@ -0,0 +1,97 @@
+"""
+Streamed responses are admitted through the bounded inference executor
+(base/inference_executor.py): they are rejected up front when it is
+saturated and hold their slot until the stream ends.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("base.inference_executor")
+
+from base.inference_executor import InferenceExecutor, InferenceExecutorBusy
+
+
+def _drain(stream):
+    async def consume():
+        return [item async for item in stream]
+
+    return asyncio.run(consume())
+
+
+def _wait_for(condition, timeout=5.0):
+    # Slots are released off the event loop once a stream ends
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_stream_holds_a_slot_until_exhausted():
+    executor = InferenceExecutor(max_workers=1, max_pending=0)
+    try:
+        stream = executor.stream(iter(["a", "b"]))
+        assert executor.stats()["in_flight"] == 1
+        with pytest.raises(InferenceExecutorBusy):
+            executor.stream(iter([]))
+        with pytest.raises(InferenceExecutorBusy):
+            executor.submit(lambda: None)
+        assert _drain(stream) == ["a", "b"]
+        assert _wait_for(lambda: executor.stats()["in_flight"] == 0)
+        assert executor.submit(lambda: "ok").result(timeout=5) == "ok"
+    finally:
+        executor.shutdown()
+
+
+def test_stream_closed_early_closes_the_generator_and_releases():
+    executor = InferenceExecutor(max_workers=2, max_pending=0)
+    closed = threading.Event()
+
+    def tokens():
+        try:
+            yield "first"
+            yield "second"
+        finally:
+            closed.set()
+
+    async def first_item(stream):
+        async for item in stream:
+            await stream.aclose()
+            return item
+
+    try:
+        assert asyncio.run(first_item(executor.stream(tokens()))) == "first"
+        assert closed.wait(timeout=5)
+        assert _wait_for(lambda: executor.stats()["in_flight"] == 0)
+    finally:
+        executor.shutdown()
+
+
+def test_unstarted_stream_releases_its_slot():
+    executor = InferenceExecutor(max_workers=1, max_pending=0)
+    try:
+        stream = executor.stream(iter(["never read"]))
+        del stream
+        assert _wait_for(lambda: executor.stats()["in_flight"] == 0)
+    finally:
+        executor.shutdown()
+
+
+def test_generation_of_an_admitted_stream_uses_its_slot():
+    executor = InferenceExecutor(max_workers=1, max_pending=0)
+
+    def tokens():
+        # What SharedLLM.stream does without batching
+        yield executor.submit_generation(lambda: "generated").result(timeout=5)
+        # A second generation is not covered by the stream's slot
+        with pytest.raises(InferenceExecutorBusy):
+            executor.submit_generation(lambda: None)
+        yield "done"
+
+    try:
+        assert _drain(executor.stream(tokens())) == ["generated", "done"]
+    finally:
+        executor.shutdown()
@@ -0,0 +1,287 @@
+"""
+Batching scheduler (base/inference_scheduler.py) driven by a stub model:
+batches only group requests that decode alike, cancelled requests never
+reach the model, an abandoned request stops without disturbing its batch,
+queue waits are estimated from what is queued ahead, and learners share
+the queue fairly (base/fair_share.py).
+"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("base.inference_scheduler")
+
+from base.fair_share import FairShare
+from base.inference_scheduler import InferenceRequest, InferenceScheduler
+
+
+class StubLLM:
+    """Records each batch; a batch holding a gated prompt waits for its gate.
+
+    A row whose `abandoned` event is set returns "abandoned", as a real
+    model would return the text decoded up to that point.
+    """
+
+    _model_name = "stub"
+
+    def __init__(self):
+        self.batches = []
+        self.gates = {}
+        self.batch_started = threading.Condition()
+
+    def gate(self, text):
+        self.gates[text] = threading.Event()
+        return self.gates[text]
+
+    def generate_batch(self, texts, abandoned=None, **kwargs):
+        with self.batch_started:
+            self.batches.append((list(texts), kwargs))
+            self.batch_started.notify_all()
+        for text in texts:
+            if text in self.gates:
+                assert self.gates[text].wait(timeout=5)
+        return [
+            "abandoned" if abandoned is not None and abandoned[index].is_set() else f"out:{text}"
+            for index, text in enumerate(texts)
+        ]
+
+    def wait_for_batch(self, text):
+        with self.batch_started:
+            assert self.batch_started.wait_for(lambda: any(text in texts for texts, _ in self.batches), timeout=5)
+
+    def batch_texts(self):
+        return [texts for texts, _ in self.batches]
+
+
+GREEDY = dict(max_new_tokens=16, temperature=0.7, top_p=0.9, greedy=True)
+SAMPLED = dict(max_new_tokens=16, temperature=0.7, top_p=0.9)
+
+
+@pytest.fixture
+def llm():
+    return StubLLM()
+
+
+@pytest.fixture
+def scheduler(llm):
+    scheduler = InferenceScheduler(llm, max_batch_size=4, max_wait_ms=20, aging_seconds=0)
+    yield scheduler
+    for gate in llm.gates.values():
+        gate.set()
+    scheduler.shutdown(wait=True)
+
+
+def _block_worker(llm, scheduler):
+    """Occupy the worker with a gated greedy request; returns its gate and future."""
+    gate = llm.gate("blocker")
+    future = scheduler.submit("blocker", **GREEDY)
+    llm.wait_for_batch("blocker")
+    return gate, future
+
+
+def test_batches_group_requests_by_decoding_parameters(llm, scheduler):
+    gate, blocker = _block_worker(llm, scheduler)
+    futures = {
+        "greedy-1": scheduler.submit("greedy-1", **GREEDY),
+        "sampled-1": scheduler.submit("sampled-1", **SAMPLED),
+        "greedy-2": scheduler.submit("greedy-2", **GREEDY),
+        "sampled-2": scheduler.submit("sampled-2", **SAMPLED),
+    }
+    gate.set()
+    assert blocker.result(timeout=5) == "out:blocker"
+    for text, future in futures.items():
+        assert future.result(timeout=5) == f"out:{text}"
+    assert llm.batch_texts() == [["blocker"], ["greedy-1", "greedy-2"], ["sampled-1", "sampled-2"]]
+
+
+def test_requests_with_generation_options_run_alone(llm, scheduler):
+    gate, _ = _block_worker(llm, scheduler)
+    streamed = scheduler.submit("streamed", streamer=object(), **SAMPLED)
+    plain = scheduler.submit("plain", **SAMPLED)
+    gate.set()
+    assert streamed.result(timeout=5) == "out:streamed"
+    assert plain.result(timeout=5) == "out:plain"
+    assert ["streamed"] in llm.batch_texts()
+    assert ["plain"] in llm.batch_texts()
+    streamed_kwargs = next(kwargs for texts, kwargs in llm.batches if texts == ["streamed"])
+    assert "streamer" in streamed_kwargs
+
+
+def test_cancelled_queued_request_never_reaches_the_model(llm, scheduler):
+    gate, _ = _block_worker(llm, scheduler)
+    cancelled = scheduler.submit("cancelled", **SAMPLED)
+    kept = scheduler.submit("kept", **SAMPLED)
+    assert cancelled.cancel()
+    gate.set()
+    assert kept.result(timeout=5) == "out:kept"
+    assert cancelled.cancelled()
+    assert all("cancelled" not in texts for texts in llm.batch_texts())
+
+
+def test_abandon_while_queued_cancels(llm, scheduler):
+    gate, _ = _block_worker(llm, scheduler)
+    queued = scheduler.submit("queued", **SAMPLED)
+    queued.abandon()
+    gate.set()
+    scheduler.submit("after", **SAMPLED).result(timeout=5)
+    assert queued.cancelled()
+    assert all("queued" not in texts for texts in llm.batch_texts())
+
+
+def test_abandon_mid_batch_stops_only_that_request(llm, scheduler):
+    gate, _ = _block_worker(llm, scheduler)
+    row_gate = llm.gate("abandoned-row")
+    abandoned = scheduler.submit("abandoned-row", **SAMPLED)
+    neighbour = scheduler.submit("neighbour", **SAMPLED)
+    gate.set()
+    llm.wait_for_batch("abandoned-row")
+    assert llm.batch_texts()[-1] == ["abandoned-row", "neighbour"]
+
+    abandoned.abandon()  # already decoding: cannot be cancelled, stops at the next token
+    assert not abandoned.cancelled()
+    row_gate.set()
+    assert abandoned.result(timeout=5) == "abandoned"
+    assert neighbour.result(timeout=5) == "out:neighbour"
+
+
+def test_cancel_event_drops_a_queued_request(llm, scheduler):
+    gate, _ = _block_worker(llm, scheduler)
+    cancel = threading.Event()
+    queued = scheduler.submit("queued", cancel=cancel, **SAMPLED)
+    cancel.set()  # e.g. the router timed out waiting for it
+    gate.set()
+    scheduler.submit("after", **SAMPLED).result(timeout=5)
+    assert queued.cancelled()
+    assert all("queued" not in texts for texts in llm.batch_texts())
+
+
+def test_cancel_event_stops_a_decoding_request(llm, scheduler):
+    cancel = threading.Event()
+    row_gate = llm.gate("cancelled-row")
+    future = scheduler.submit("cancelled-row", cancel=cancel, **SAMPLED)
+    llm.wait_for_batch("cancelled-row")
+    cancel.set()
+    row_gate.set()
+    assert future.result(timeout=5) == "abandoned"
+
+
+def test_failed_batch_fails_each_of_its_futures():
+    class FailingLLM(StubLLM):
+        def generate_batch(self, texts, abandoned=None, **kwargs):
+            raise RuntimeError("out of memory")
+
+    failing = InferenceScheduler(FailingLLM(), max_batch_size=4, max_wait_ms=20)
+    try:
+        future = failing.submit("prompt", **SAMPLED)
+        with pytest.raises(RuntimeError, match="out of memory"):
+            future.result(timeout=5)
+    finally:
+        failing.shutdown(wait=True)
+
+
+def test_aging_promotes_long_waiting_requests():
+    now = time.perf_counter()
+    background = InferenceRequest("old", priority="background", enqueued_at=now - 11, **SAMPLED)
+    interactive = InferenceRequest("new", priority="interactive", enqueued_at=now, **SAMPLED)
+    # Two aging steps of 5s take background up to interactive; it arrived first
+    assert background.urgency(now, aging_seconds=5) < interactive.urgency(now, aging_seconds=5)
+    # Without aging the class alone decides
+    assert interactive.urgency(now, aging_seconds=0) < background.urgency(now, aging_seconds=0)
+
+
+def test_more_urgent_class_is_served_first(llm, scheduler):
+    gate, _ = _block_worker(llm, scheduler)
+    background = scheduler.submit("background", priority="background", **SAMPLED)
+    interactive = scheduler.submit("interactive", priority="interactive", **GREEDY)
+    gate.set()
+    background.result(timeout=5)
+    interactive.result(timeout=5)
+    assert llm.batch_texts()[1:] == [["interactive"], ["background"]]
+
+
+def test_estimate_wait_counts_requests_ahead(llm):
+    scheduler = InferenceScheduler(llm, max_batch_size=2, max_wait_ms=20, aging_seconds=0)
+    try:
+        gate, _ = _block_worker(llm, scheduler)
+        scheduler.submit("standard-1", priority="standard", agent="Agent", **SAMPLED)
+        scheduler.submit("standard-2", priority="standard", agent="Agent", **SAMPLED)
+        scheduler.submit("background", priority="background", agent="Agent", **SAMPLED)
+        running = 2.0  # left of the running batch at most, nothing measured yet
+
+        # Nothing queued is ahead of an interactive request
+        assert 0.0 < scheduler.estimate_wait("interactive", default_service_s=2.0) <= running
+        # Two standard requests at 2s each over two batch slots
+        assert 2.0 < scheduler.estimate_wait("standard", default_service_s=2.0) <= 2.0 + running
+        assert 3.0 < scheduler.estimate_wait("background", default_service_s=2.0) <= 3.0 + running
+        assert scheduler.queue_depth_by_class() == {"interactive": 0, "standard": 2, "background": 1}
+    finally:
+        gate.set()
+        scheduler.shutdown(wait=True)
+
+
+def _fair_scheduler(llm, max_batch_size=1, **fair_share):
+    return InferenceScheduler(
+        llm, max_batch_size=max_batch_size, max_wait_ms=20, aging_seconds=0, fair_share=FairShare(**fair_share)
+    )
+
+
+def _served(llm):
+    return [text for texts in llm.batch_texts()[1:] for text in texts]
+
+
+def test_backlogged_learner_takes_turns_with_another(llm):
+    scheduler = _fair_scheduler(llm)
+    try:
+        gate, _ = _block_worker(llm, scheduler)
+        futures = [scheduler.submit(f"a{index}", learner="a", **SAMPLED) for index in range(6)]
+        futures += [scheduler.submit(f"b{index}", learner="b", **SAMPLED) for index in range(2)]
+        gate.set()
+        for future in futures:
+            future.result(timeout=5)
+        # b queued behind six of a's requests but is served every other turn
+        assert _served(llm)[:4] == ["a0", "b0", "a1", "b1"]
+    finally:
+        scheduler.shutdown(wait=True)
+
+
+def test_learner_weights_set_the_share_of_turns(llm):
+    scheduler = _fair_scheduler(llm, weights={"a": 2.0})
+    try:
+        gate, _ = _block_worker(llm, scheduler)
+        futures = [scheduler.submit(f"a{index}", learner="a", **SAMPLED) for index in range(6)]
+        futures += [scheduler.submit(f"b{index}", learner="b", **SAMPLED) for index in range(6)]
+        gate.set()
+        for future in futures:
+            future.result(timeout=5)
+        first = _served(llm)[:6]
+        assert sum(text.startswith("a") for text in first) == 4
+        assert sum(text.startswith("b") for text in first) == 2
+    finally:
+        scheduler.shutdown(wait=True)
+
+
+def test_per_learner_cap_leaves_batch_slots_to_others(llm):
+    scheduler = _fair_scheduler(llm, max_batch_size=4, max_concurrent_per_learner=2)
+    try:
+        gate, _ = _block_worker(llm, scheduler)
+        futures = [scheduler.submit(f"a{index}", learner="a", **SAMPLED) for index in range(4)]
+        futures.append(scheduler.submit("b0", learner="b", **SAMPLED))
+        gate.set()
+        for future in futures:
+            future.result(timeout=5)
+        batches = llm.batch_texts()[1:]
+        assert batches[0] == ["a0", "b0", "a1"]
+        assert all(sum(text.startswith("a") for text in batch) <= 2 for batch in batches)
+    finally:
+        scheduler.shutdown(wait=True)
+
+
+def test_anonymous_requests_are_not_chained():
+    fair_share = FairShare()
+    assert [fair_share.start_tag("a") for _ in range(3)] == [0.0, 1.0, 2.0]
+    # Requests without a learner start at the current virtual time, not behind each other
+    assert [fair_share.start_tag(None) for _ in range(3)] == [0.0, 0.0, 0.0]
+    fair_share.served(2.0)
+    assert fair_share.start_tag("b") == 2.0
@@ -0,0 +1,132 @@
+"""
+Schema-constrained decoding (base/json_constraint.py): the matcher only
+accepts prefixes of JSON that fits the agents' schemas, and the logits
+processor falls back to the best-scoring token that fits when none of the
+top candidates do.
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("base.json_constraint")
+# The schema modules' packages pull in LangChain
+pytest.importorskip("modules.skill_gap_identification.schemas")
+pytest.importorskip("modules.personalized_resource_delivery.schemas")
+
+import torch
+
+from base.json_constraint import JSONSchemaLogitsProcessor, JSONSchemaMatcher, TokenVocabulary, compile_schema
+from modules.personalized_resource_delivery.schemas import LearningPath
+from modules.skill_gap_identification.schemas import SkillGaps
+
+SKILL_GAPS = {
+    "skill_gaps": [
+        {
+            "name": "SQL",
+            "is_gap": True,
+            "required_level": "advanced",
+            "current_level": "unlearned",
+            "reason": "No database work mentioned.",
+            "level_confidence": "high",
+        }
+    ]
+}
+
+LEARNING_PATH = {
+    "learning_path": [
+        {
+            "id": "Session 1",
+            "title": "Joins",
+            "abstract": "Combine tables.",
+            "if_learned": False,
+            "associated_skills": ["SQL"],
+            "desired_outcome_when_completed": [{"name": "SQL", "level": "intermediate"}],
+        }
+    ]
+}
+
+
+def _accepts(schema, text):
+    return JSONSchemaMatcher(compile_schema(schema)).feed(text)
+
+
+@pytest.mark.parametrize("schema, value", [(SkillGaps, SKILL_GAPS), (LearningPath, LEARNING_PATH)])
+def test_valid_output_completes(schema, value):
+    for text in (json.dumps(value), json.dumps(value, indent=2)):
+        matcher = JSONSchemaMatcher(compile_schema(schema))
+        for index in range(len(text)):
+            # Every prefix of a valid output is accepted
+            assert matcher.clone().feed(text[:index]), text[:index]
+        assert matcher.feed(text)
+        assert matcher.complete
+
+
+@pytest.mark.parametrize(
+    "prefix",
+    [
+        '[',
+        '{"skills"',
+        '{"skill_gaps": {',
+        '{"skill_gaps": [{"name": 3',
+        '{"skill_gaps": [{"name": "SQL", "is_gap": "yes"',
+        # required_level has no "unlearned"
+        '{"skill_gaps": [{"name": "SQL", "required_level": "unlearned"',
+        '{"skill_gaps": [{"name": "SQL", "level_confidence": "certain"',
+        '{"skill_gaps": [{"name": "SQL", "priority": 1',
+        '{"skill_gaps": []} {',
+    ],
+)
+def test_skill_gaps_reject_invalid_prefixes(prefix):
+    assert not _accepts(SkillGaps, prefix)
+
+
+@pytest.mark.parametrize(
+    "prefix",
+    [
+        '{"learning_path": [{"id": "Session 1", "if_learned": 1',
+        # The schema only lists the enum values, not the validator's synonyms
+        '{"learning_path": [{"desired_outcome_when_completed": [{"level": "expert"',
+        '{"learning_path": [{"associated_skills": [3',
+        # A session cannot close before its required keys
+        '{"learning_path": [{"id": "Session 1"}',
+    ],
+)
+def test_learning_path_rejects_invalid_prefixes(prefix):
+    assert not _accepts(LearningPath, prefix)
+
+
+class _CharTokenizer:
+    """Tokenizer whose tokens are the given strings; "a" is the anchor."""
+
+    all_special_ids = []
+
+    def __init__(self, tokens):
+        self.tokens = ["a"] + tokens
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __call__(self, text, add_special_tokens=False):
+        return {"input_ids": [self.tokens.index(text)]}
+
+    def decode(self, token_ids):
+        return "".join(self.tokens[token_id] for token_id in token_ids)
+
+    def batch_decode(self, sequences):
+        return [self.decode(token_ids) for token_ids in sequences]
+
+
+def test_vocabulary_indexes_tokens_by_first_character():
+    vocabulary = TokenVocabulary(_CharTokenizer(["{", '{"', "x", "xy"]))
+    assert vocabulary.by_first_char == {"a": [0], "{": [1, 2], "x": [3, 4]}
+
+
+def test_processor_falls_back_to_the_best_token_that_fits():
+    tokens = ["x", "y", "z", '{"', "{", " "]
+    vocabulary = TokenVocabulary(_CharTokenizer(tokens))
+    processor = JSONSchemaLogitsProcessor(compile_schema(SkillGaps), vocabulary, eos_token_ids=[0], candidate_tokens=2)
+    # "x" and "y" score highest but cannot open an object; '{"' outscores "{"
+    scores = torch.tensor([[0.0, 9.0, 8.0, 7.0, 3.0, 2.0, 1.0]])
+    masked = processor(torch.zeros((1, 0), dtype=torch.long), scores)
+    assert torch.isfinite(masked[0]).nonzero().flatten().tolist() == [4]
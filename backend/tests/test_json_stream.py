@@ -0,0 +1,89 @@
+"""
+Tolerant JSON parsing of LLM replies (utils/json_stream.py): repaired
+replies must parse to the intended value whether they arrive whole or in
+chunks, and values that cannot be placed must raise so the agents' repair
+path runs instead of silently losing data.
+"""
+
+import json
+
+import pytest
+
+# utils/__init__.py pulls in the PDF preprocessing dependencies
+pytest.importorskip("utils.json_stream")
+
+from utils.json_stream import StreamingJSONParser, json_start, parse_json_output
+
+
+def _streamed(text: str, chunk_size: int):
+    parser = StreamingJSONParser()
+    for index in range(0, len(text), chunk_size):
+        parser.feed(text[index:index + chunk_size])
+    return parser.close()
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"a": .5}', {"a": 0.5}),
+        ('{"a": 5.}', {"a": 5.0}),
+        ('{"a": -.5e1, "b": [.25, 3]}', {"a": -5.0, "b": [0.25, 3]}),
+        ('{"key": value, "b": 2}', {"key": "value", "b": 2}),
+        ("{a: 1}", {"a": 1}),
+        ("{level: beginner, done: false}", {"level": "beginner", "done": False}),
+        ("[1, v2, True, None]", [1, "v2", True, None]),
+        ("{'a': 'x', 'b': None,}", {"a": "x", "b": None}),
+        ('{"a": 1 "b": 2}', {"a": 1, "b": 2}),
+        ('Here you go:\n```json\n{"a": [1, 2]}\n```\nThanks', {"a": [1, 2]}),
+    ],
+)
+def test_repairs(text, expected):
+    assert parse_json_output(text) == expected
+    # Agent streams start at the JSON value
+    for chunk_size in (1, 2, 3, 7):
+        assert _streamed(text[json_start(text):], chunk_size) == expected
+
+
+def test_chunk_boundaries_inside_numbers_and_words():
+    text = '{"a": -.5, "b": 5., "c": value, "d": null}'
+    expected = {"a": -0.5, "b": 5.0, "c": "value", "d": None}
+    for split in range(len(text) + 1):
+        parser = StreamingJSONParser()
+        parser.feed(text[:split])
+        parser.feed(text[split:])
+        assert parser.close() == expected
+
+
+def test_truncated_reply_is_closed():
+    assert parse_json_output('{"a": [1, 2], "b": {"c": "par') == {"a": [1, 2], "b": {"c": "par"}}
+    # A literal cut off mid-word is dropped along with its key
+    assert parse_json_output('{"a": 1, "b": fal') == {"a": 1}
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"a": 1 2}',
+        '{"a": 1, {"b": 2}}',
+        '{"a": "x", 3: "y"}',
+        # A second word or string after a value would become a key without a value
+        '{"a": hello world}',
+        '{"a": "x" "y"}',
+        '{"a": 1, "b"}',
+        '{"a": , "b": 2}',
+    ],
+)
+def test_unplaceable_value_raises(text):
+    with pytest.raises(json.JSONDecodeError):
+        parse_json_output(text)
+    with pytest.raises(json.JSONDecodeError):
+        _streamed(text, 4)
+
+
+def test_on_value_reports_closed_items():
+    closed = []
+    parser = StreamingJSONParser(on_value=lambda path, value: closed.append((path, value)))
+    parser.feed('{"items": [{"id": 1}, {"id": 2}]}')
+    assert parser.done
+    assert closed[:2] == [(("items", 0), {"id": 1}), (("items", 1), {"id": 2})]
+    assert closed[-1] == ((), {"items": [{"id": 1}, {"id": 2}]})
@@ -0,0 +1,112 @@
+"""
+Partial repair of list outputs (modules/skill_gap_identification/agents/
+partial_repair.py): valid entries are kept, duplicates and offending ones
+dropped, the item bounds and required names decide whether a repair is
+needed, and the skill gap validator corrects what follows from the inputs.
+"""
+
+import pytest
+
+# The agents package pulls in LangChain and pydantic
+pytest.importorskip("modules.skill_gap_identification.agents.skill_gap_identifier")
+
+from modules.skill_gap_identification.agents.partial_repair import extract_items, review_items
+from modules.skill_gap_identification.agents.skill_gap_identifier import SkillGapIdentifier
+
+
+def _named(item):
+    """Accepts any dict with a non-empty name."""
+    if isinstance(item, dict) and str(item.get("name", "")).strip():
+        return dict(item), None
+    return None, "missing name"
+
+
+def _names(entries):
+    return [entry["name"] for entry in entries]
+
+
+def test_extract_items():
+    assert extract_items({"skill_gaps": [{"name": "a"}]}, "skill_gaps") == [{"name": "a"}]
+    assert extract_items({"skill_gaps": "a"}, "skill_gaps") is None
+    assert extract_items({}, "skill_gaps") is None
+    assert extract_items([{"name": "a"}], "skill_gaps") is None
+
+
+def test_valid_entries_are_kept_and_offending_ones_reported():
+    review = review_items([{"name": "SQL"}, {"level": "beginner"}, "text", {"name": "Python"}], _named, min_items=1, max_items=4)
+    assert _names(review.kept) == ["SQL", "Python"]
+    assert review.offending == [({"level": "beginner"}, "missing name"), ("text", "missing name")]
+    # Offending entries are dropped once the kept ones are enough
+    assert review.ok
+    assert review.needed == 2
+
+
+def test_duplicate_names_are_dropped():
+    review = review_items([{"name": "SQL"}, {"name": " sql "}, {"name": "Python"}], _named, min_items=1, max_items=4)
+    assert _names(review.kept) == ["SQL", "Python"]
+    assert review.offending == []
+
+
+def test_too_few_entries_need_a_repair():
+    review = review_items([{"name": "SQL"}, {"name": "sql"}], _named, min_items=3, max_items=6)
+    assert not review.ok
+    assert review.needed == 2
+    assert "1 valid entries, expected 3-6" in review.problems()
+
+
+def test_extra_entries_are_cut_keeping_required_names():
+    items = [{"name": name} for name in ("a", "b", "c", "Required")]
+    review = review_items(items, _named, min_items=1, max_items=2, required_names=["required"])
+    assert _names(review.kept) == ["Required", "a"]
+    assert review.ok
+    assert review.needed == 0
+
+
+def test_missing_required_names_are_reported():
+    review = review_items([{"name": "SQL"}], _named, min_items=1, max_items=4, required_names=["SQL", "Statistics"])
+    assert review.missing == ["Statistics"]
+    assert not review.ok
+    assert review.needed == 1
+    assert "Statistics" in review.repair_variables()["missing_note"]
+
+
+def _gap(**overrides):
+    gap = {
+        "name": "SQL",
+        "is_gap": True,
+        "required_level": "advanced",
+        "current_level": "beginner",
+        "reason": "Wrote simple queries in one project.",
+        "level_confidence": "medium",
+    }
+    gap.update(overrides)
+    return gap
+
+
+def _level(value):
+    return getattr(value, "value", value)
+
+
+def test_gap_validator_takes_required_level_from_the_requirement():
+    validate = SkillGapIdentifier._gap_validator({"sql": {"name": "SQL", "required_level": "intermediate"}})
+    entry, rule = validate(_gap(name=" sql ", required_level="advanced"))
+    assert rule is None
+    assert _level(entry["required_level"]) == "intermediate"
+
+
+def test_gap_validator_derives_is_gap_from_the_levels():
+    validate = SkillGapIdentifier._gap_validator({})
+    entry, rule = validate(_gap(is_gap=False, current_level="beginner", required_level="advanced"))
+    assert rule is None
+    assert entry["is_gap"] is True
+    entry, rule = validate(_gap(is_gap=True, current_level="advanced", required_level="beginner"))
+    assert rule is None
+    assert entry["is_gap"] is False
+
+
+def test_gap_validator_reports_schema_violations():
+    validate = SkillGapIdentifier._gap_validator({})
+    assert validate("SQL") == (None, "not a skill gap object")
+    entry, rule = validate(_gap(reason="word " * 25))
+    assert entry is None
+    assert "20 words or fewer" in rule
@@ -0,0 +1,150 @@
+"""
+Speculative attempts (base/speculative.py): the first attempt that passes
+validation wins, the losers are stopped, and the extra attempts go through
+the bounded inference executor without ever waiting on it.
+"""
+
+import threading
+
+import pytest
+
+speculative = pytest.importorskip("base.speculative")
+
+from base.inference_executor import InferenceExecutor
+from base.inference_scheduler import InferenceFuture
+from base.speculative import AttemptsExhausted, SpeculativeAttempts, current_attempt
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = InferenceExecutor(max_workers=4, max_pending=4)
+    monkeypatch.setattr(speculative, "get_inference_executor", lambda: executor)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def _decode_until_abandoned():
+    """A generation that only ends once its attempt is abandoned."""
+    attempt = current_attempt()
+    assert attempt.stop_decoding.wait(timeout=5)
+    return "truncated"
+
+
+def test_single_attempt_runs_inline():
+    caller = threading.current_thread()
+    threads = []
+
+    def attempt(index):
+        threads.append(threading.current_thread())
+        return "ok"
+
+    assert SpeculativeAttempts(attempts=1).run(attempt) == "ok"
+    assert threads == [caller]
+    with pytest.raises(AttemptsExhausted) as exc:
+        SpeculativeAttempts(attempts=1).run(lambda index: "", accept=bool)
+    assert exc.value.rejected == [""]
+
+
+def test_several_attempts_all_sample():
+    assert SpeculativeAttempts(attempts=1).model_kwargs(0) == {}
+    settings = SpeculativeAttempts(attempts=3)
+    assert [settings.model_kwargs(index) for index in range(3)] == [{"greedy": False}] * 3
+
+
+def test_first_valid_attempt_wins_and_losers_are_stopped(executor):
+    handles = {}
+    # The caller's attempt returns once the others are decoding on workers
+    all_started = threading.Barrier(3, timeout=5)
+
+    def attempt(index):
+        handles[index] = current_attempt()
+        all_started.wait()
+        if index == 1:
+            return "valid"
+        if index == 0:
+            return "invalid"
+        return _decode_until_abandoned()
+
+    result = SpeculativeAttempts(attempts=3).run(attempt, accept=lambda output: output == "valid")
+    assert result == "valid"
+    for handle in handles.values():
+        assert handle.abandoned
+        assert handle.stop_decoding.is_set()
+
+
+def test_exhausted_attempts_report_rejected_outputs_and_errors(executor):
+    def attempt(index):
+        if index == 2:
+            raise ValueError("bad json")
+        return f"rejected-{index}"
+
+    with pytest.raises(AttemptsExhausted) as exc:
+        SpeculativeAttempts(attempts=3).run(attempt, accept=lambda output: False)
+    assert sorted(exc.value.rejected) == ["rejected-0", "rejected-1"]
+    assert [str(error) for error in exc.value.errors] == ["bad json"]
+
+
+def test_queued_requests_of_losing_attempts_are_abandoned(executor):
+    queued = []
+
+    def attempt(index):
+        if index == 0:
+            return "valid"
+        future = InferenceFuture()
+        current_attempt().track(future)
+        queued.append(future)
+        return _decode_until_abandoned()
+
+    assert SpeculativeAttempts(attempts=3).run(attempt, accept=lambda output: output == "valid") == "valid"
+    for future in queued:
+        assert future.cancelled() or future.abandoned.is_set()
+
+
+def test_request_tracked_after_abandonment_is_stopped():
+    handle = speculative._Attempt()
+    handle.abandon()
+    future = InferenceFuture()
+    handle.track(future)
+    assert future.cancelled()
+
+
+def test_unstarted_attempts_run_on_the_caller_when_workers_are_busy(monkeypatch):
+    # Every worker is taken (e.g. by other callers waiting on their own attempts)
+    executor = InferenceExecutor(max_workers=1, max_pending=4)
+    monkeypatch.setattr(speculative, "get_inference_executor", lambda: executor)
+    release = threading.Event()
+    executor.submit(release.wait)
+    try:
+        caller = threading.current_thread()
+        ran_on = {}
+
+        def attempt(index):
+            ran_on[index] = threading.current_thread()
+            return "valid" if index == 2 else "invalid"
+
+        assert SpeculativeAttempts(attempts=3).run(attempt, accept=lambda output: output == "valid") == "valid"
+        assert ran_on == {0: caller, 1: caller, 2: caller}
+    finally:
+        release.set()
+        executor.shutdown(wait=True)
+
+
+def test_saturated_executor_runs_fewer_attempts(monkeypatch):
+    executor = InferenceExecutor(max_workers=1, max_pending=0)
+    monkeypatch.setattr(speculative, "get_inference_executor", lambda: executor)
+    release = threading.Event()
+    executor.submit(release.wait)
+    try:
+        calls = []
+
+        def attempt(index):
+            calls.append(index)
+            return "invalid"
+
+        with pytest.raises(AttemptsExhausted) as exc:
+            SpeculativeAttempts(attempts=3).run(attempt, accept=lambda output: False)
+        assert calls == [0]
+        assert exc.value.rejected == ["invalid"]
+    finally:
+        release.set()
+        executor.shutdown(wait=True)
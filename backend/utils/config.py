@@ -13,3 +13,13 @@ def ensure_config_dict(
     else:
         raise ValueError("Unsupported config type.")
     return config
+
+
+def get_config_section(name: str) -> Dict[str, Any]:
+    """Return a top-level section of the default app config as a plain dict."""
+    from config.loader import default_config
+
+    section = default_config.get(name)
+    if section is None:
+        return {}
+    return ensure_config_dict(section)
@@ -0,0 +1,340 @@
+"""
+Single-pass, tolerant JSON parsing of LLM output.
+
+`StreamingJSONParser` accepts the reply in chunks as it is generated and
+builds the value while tracking string, escape and nesting state once. It
+repairs the usual defects on the fly:
+
+- text before the JSON (prose, code fences) and after it (extra data,
+  trailing instructions) is ignored;
+- strings may be single-quoted and may contain raw newlines or unescaped
+  quotes (a quote only closes a string if a delimiter follows it);
+- trailing and missing commas are tolerated, as are Python literals
+  (`True`, `False`, `None`), numbers like `.5` or `5.`, and bare words
+  (unquoted keys, and unquoted values kept as strings);
+- a truncated reply is closed: open strings end, keys without a value are
+  dropped and open containers are closed.
+
+A value that cannot be placed (e.g. a second value after a key's value)
+and a key closed by `,` or `}` before it got a value (e.g. the second word
+of an unquoted `"a": hello world`) raise `json.JSONDecodeError`, so callers
+fall back to their repair path rather than receiving an object with data
+silently dropped.
+
+`on_value(path, value)` is called whenever an object or array closes, with
+its path from the root (keys and list indices), so callers can act on
+items before the whole reply is complete.
+"""
+
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+Path = Tuple[Union[str, int], ...]
+
+_WS = re.compile(r"[ \t\r\n]*")
+_VALUE_START = re.compile(r"[{\[]")
+_LEADING = re.compile(r"\s*(?:```[A-Za-z]*\s*)?")
+_NUMBER_RUN = re.compile(r"[-+0-9.eE]*")
+# One token after optional whitespace; the group that matched gives its kind
+_TOKEN = re.compile(
+    r"[ \t\r\n]*(?:([{\[])|([}\]])|(,)|(:)|([\"'])|(-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(.))",
+    re.DOTALL,
+)
+_T_OPEN, _T_CLOSE, _T_COMMA, _T_COLON, _T_QUOTE, _T_NUMBER, _T_WORD, _T_OTHER = range(1, 9)
+_STRING_RUNS = {'"': re.compile(r'[^"\\]*'), "'": re.compile(r"[^'\\]*")}
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "/": "/", "\\": "\\", '"': '"', "'": "'"}
+_LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+# Characters that confirm a quote really closed a key / a value string
+_KEY_END = frozenset(":,}")
+_VALUE_END = frozenset(",}]\"'")
+
+# What a container expects next
+_KEY, _COLON, _VALUE, _COMMA = range(4)
+# What the string being read is
+_ROLE_KEY, _ROLE_VALUE = range(2)
+
+_MISSING = object()
+_DECODER = json.JSONDecoder()
+
+
+class _Frame:
+    __slots__ = ("container", "is_dict", "expect", "key", "slot")
+
+    def __init__(self, container: Union[dict, list], slot: Union[str, int, None]):
+        self.container = container
+        self.is_dict = isinstance(container, dict)
+        self.expect = _KEY if self.is_dict else _VALUE
+        self.key: Optional[str] = None  # key awaiting its value
+        self.slot = slot  # key or index in the parent
+
+
+class StreamingJSONParser:
+    """Incremental tolerant JSON parser; see the module docstring."""
+
+    def __init__(self, on_value: Optional[Callable[[Path, Any], None]] = None):
+        self._on_value = on_value
+        self._buf = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._root: Any = _MISSING
+        self._started = False
+        self.done = False  # the top-level value is complete; later input is ignored
+        # String being read
+        self._quote: Optional[str] = None
+        self._role = _ROLE_VALUE
+        self._parts: List[str] = []
+        self._closing: Optional[str] = None  # whitespace after a quote that may close the string
+        self._surrogates = False
+
+    def feed(self, chunk: str) -> None:
+        if self.done or not chunk:
+            return
+        # Only an unfinished token (number, literal, escape) is carried over
+        self._buf = self._buf[self._pos:] + chunk if self._pos < len(self._buf) else chunk
+        self._pos = 0
+        self._consume(final=False)
+
+    def close(self) -> Any:
+        """End of input: finish any truncated value and return the result."""
+        if not self.done:
+            self._consume(final=True)
+            if self._quote is not None:
+                self._end_string()
+            self._stack.clear()  # containers are attached on open, so the root already holds them
+            self.done = True
+        if self._root is _MISSING:
+            raise json.JSONDecodeError("No JSON object or array found", self._buf, 0)
+        return self._root
+
+    def _consume(self, final: bool) -> None:
+        buf = self._buf
+        n = len(buf)
+        pos = self._pos
+        while pos < n and not self.done:
+            if self._quote is not None:
+                pos = self._scan_string(buf, pos)
+                if self._quote is not None:
+                    break
+                continue
+            if not self._started:
+                match = _VALUE_START.search(buf, pos)
+                if match is None:
+                    pos = n
+                    break
+                pos = match.start()
+                self._started = True
+
+            match = _TOKEN.match(buf, pos)
+            if match is None:  # only whitespace left
+                pos = n
+                break
+            kind = match.lastindex
+            token_start = match.start(kind)
+            pos = match.end()
+            frame = self._stack[-1] if self._stack else None
+            if kind == _T_OPEN:
+                self._check_value(frame, buf, token_start)
+                self._open(frame, {} if buf[token_start] == "{" else [])
+            elif kind == _T_CLOSE:
+                if frame is not None:
+                    self._check_key_has_value(frame, buf, token_start)
+                    self._close_frame()
+            elif kind == _T_COMMA:
+                if frame is not None:
+                    self._check_key_has_value(frame, buf, token_start)
+                    frame.expect = _KEY if frame.is_dict else _VALUE
+            elif kind == _T_COLON:
+                if frame is not None and frame.is_dict and frame.key is not None:
+                    frame.expect = _VALUE
+            elif kind == _T_QUOTE:
+                if self._expects_key(frame):
+                    self._role = _ROLE_KEY
+                else:
+                    self._check_value(frame, buf, token_start)
+                    self._role = _ROLE_VALUE
+                self._quote = buf[token_start]
+            elif kind == _T_NUMBER:
+                if not final and _NUMBER_RUN.match(buf, token_start).end() == n:
+                    pos = token_start  # the number may continue in the next chunk
+                    break
+                text = match.group(kind)
+                self._check_value(frame, buf, token_start)
+                self._put(frame, float(text) if ("." in text or "e" in text or "E" in text) else int(text))
+            elif kind == _T_WORD:
+                if pos == n and not final:
+                    pos = token_start
+                    break
+                word = match.group(kind)
+                if self._expects_key(frame):
+                    frame.key = word  # unquoted key
+                    frame.expect = _COLON
+                    continue
+                literal = _LITERALS.get(word, _MISSING)
+                if literal is _MISSING and pos == n and any(name.startswith(word) for name in _LITERALS):
+                    break  # a literal cut off by truncation: its key is dropped
+                self._check_value(frame, buf, token_start)
+                self._put(frame, word if literal is _MISSING else literal)
+            elif buf[token_start] in "-." and _NUMBER_RUN.match(buf, token_start).end() == n and not final:
+                pos = token_start  # a sign or point whose digits are still to come
+                break
+        self._pos = pos
+
+    def _scan_string(self, buf: str, pos: int) -> int:
+        """Read string content from `pos`; returns where reading stopped."""
+        n = len(buf)
+        quote = self._quote
+        parts = self._parts
+        run = _STRING_RUNS[quote]
+        while True:
+            if self._closing is not None:
+                end = _WS.match(buf, pos).end()
+                self._closing += buf[pos:end]
+                pos = end
+                if pos >= n:
+                    return pos
+                if buf[pos] in (_KEY_END if self._role == _ROLE_KEY else _VALUE_END):
+                    self._end_string()
+                    return pos
+                # No delimiter follows: the quote was part of the text
+                parts.append(quote + self._closing)
+                self._closing = None
+
+            if quote == '"' and not parts and buf.find('"', pos) != -1:
+                # Well-formed strings are decoded in C; the rest take the slow path below
+                try:
+                    text, end = scanstring(buf, pos, False)
+                except ValueError:
+                    pass
+                else:
+                    parts.append(text)
+                    pos = end
+                    self._closing = ""
+                    continue
+
+            match = run.match(buf, pos)
+            parts.append(match.group())
+            pos = match.end()
+            if pos >= n:
+                return pos
+            if buf[pos] == "\\":
+                if pos + 1 >= n:
+                    return pos
+                escaped = buf[pos + 1]
+                if escaped == "u":
+                    digits = buf[pos + 2:pos + 6]
+                    if len(digits) < 4:
+                        return pos
+                    try:
+                        code = int(digits, 16)
+                    except ValueError:
+                        parts.append("u")
+                        pos += 2
+                        continue
+                    self._surrogates |= 0xD800 <= code <= 0xDFFF
+                    parts.append(chr(code))
+                    pos += 6
+                else:
+                    parts.append(_ESCAPES.get(escaped, escaped))
+                    pos += 2
+                continue
+            # A quote: it closes the string if a delimiter follows
+            pos += 1
+            self._closing = ""
+
+    def _end_string(self) -> None:
+        text = "".join(self._parts)
+        if self._surrogates:
+            text = text.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+        self._quote = None
+        self._parts = []
+        self._closing = None
+        self._surrogates = False
+        frame = self._stack[-1] if self._stack else None
+        if self._role == _ROLE_KEY:
+            frame.key = text
+            frame.expect = _COLON
+        elif self._role == _ROLE_VALUE:
+            self._put(frame, text)
+
+    @staticmethod
+    def _expects_key(frame: Optional[_Frame]) -> bool:
+        return frame is not None and frame.is_dict and frame.expect in (_KEY, _COMMA)
+
+    def _check_value(self, frame: Optional[_Frame], buf: str, pos: int) -> None:
+        if not self._accepts_value(frame):
+            raise json.JSONDecodeError("Unexpected value", buf, pos)
+
+    @staticmethod
+    def _check_key_has_value(frame: _Frame, buf: str, pos: int) -> None:
+        if frame.is_dict and frame.key is not None:
+            raise json.JSONDecodeError(f"Key {frame.key!r} has no value", buf, pos)
+
+    def _accepts_value(self, frame: Optional[_Frame]) -> bool:
+        if frame is None:
+            return self._root is _MISSING
+        if frame.is_dict:
+            return frame.key is not None and frame.expect in (_COLON, _VALUE)
+        return True  # a list accepts a value even when the comma is missing
+
+    def _put(self, frame: Optional[_Frame], value: Any) -> Union[str, int, None]:
+        """Attach `value` to the open container; returns its key or index there."""
+        if frame is None:
+            self._root = value
+            return None
+        container = frame.container
+        if frame.is_dict:
+            if frame.key is None or frame.expect not in (_COLON, _VALUE):
+                return None
+            slot = frame.key
+            container[slot] = value
+            frame.key = None
+        else:
+            slot = len(container)
+            container.append(value)
+        frame.expect = _COMMA
+        return slot
+
+    def _open(self, frame: Optional[_Frame], container: Union[dict, list]) -> None:
+        self._stack.append(_Frame(container, self._put(frame, container)))
+
+    def _close_frame(self) -> None:
+        if self._on_value is not None:
+            path = tuple(frame.slot for frame in self._stack[1:])
+            self._on_value(path, self._stack[-1].container)
+        self._stack.pop()
+        if not self._stack:
+            self.done = True
+
+
+def json_start(text: str) -> Optional[int]:
+    """Index where the JSON value of a reply starts: right after any code
+    fence if the reply begins with it, else the first object, else the
+    first array."""
+    start = _LEADING.match(text).end()
+    if text[start:start + 1] in ("{", "["):
+        return start
+    for opener in ("{", "["):
+        index = text.find(opener, start)
+        if index != -1:
+            return index
+    return None
+
+
+def parse_json_output(text: str) -> Any:
+    """Parse the JSON value of a complete reply.
+
+    Well-formed JSON is decoded directly (trailing text is ignored); only
+    malformed replies go through the tolerant parser.
+    """
+    start = json_start(text)
+    if start is None:
+        raise json.JSONDecodeError("No JSON object or array found", text, 0)
+    try:
+        return _DECODER.raw_decode(text, start)[0]
+    except json.JSONDecodeError:
+        pass
+    parser = StreamingJSONParser()
+    parser.feed(text[start:])
+    return parser.close()
@@ -90,18 +90,75 @@ export class API {
         }
     }
 
+    // POST to a Server-Sent Events endpoint: calls onEvent(event, data) per event and
+    // resolves with the `done` payload (rejects on an `error` event).
+    static async postEventStream(endpoint, data, onEvent) {
+        const url = withNormalizedUrl(endpoint);
+        const body = JSON.stringify(data);
+        logApi('POST (stream) →', url, summarizeBodyForLog(body));
+        try {
+            const response = await fetch(url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    Accept: 'text/event-stream',
+                },
+                body,
+            });
+            logApi('POST (stream) ←', url, response.status);
+            if (!response.ok || !response.body) throw new Error('Network response was not ok');
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            for (;;) {
+                const { value, done } = await reader.read();
+                buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+                let boundary = buffer.indexOf('\n\n');
+                while (boundary !== -1) {
+                    const message = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+                    boundary = buffer.indexOf('\n\n');
+
+                    let event = 'message';
+                    const dataLines = [];
+                    message.split('\n').forEach((line) => {
+                        if (line.startsWith('event:')) event = line.slice(6).trim();
+                        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+                    });
+                    if (!dataLines.length) continue;
+                    const payload = JSON.parse(dataLines.join('\n'));
+                    if (event === 'error') throw new Error(payload?.detail || 'Streaming request failed');
+                    if (event === 'done') {
+                        reader.cancel().catch(() => {});
+                        return payload;
+                    }
+                    onEvent?.(event, payload);
+                }
+                if (done) break;
+            }
+            throw new Error('Stream ended before completion');
+        } catch (error) {
+            logApi('POST (stream) ✖', url, error?.message ?? error);
+            console.error('API Stream Error:', error);
+            throw error;
+        }
+    }
+
     // LLM Models
     static async listLLMModels() {
         return await this.get('/list-llm-models');
     }
 
     // Chat with Tutor
-    static async chatWithTutor(messages, learnerProfile, modelProvider = 'gpt-oss', modelName = 'gpt-oss-120b') {
+    // conversationId lets the backend reuse the session's KV cache between turns
+    static async chatWithTutor(messages, learnerProfile, modelProvider = 'gpt-oss', modelName = 'gpt-oss-120b', conversationId = null) {
         return await this.post('/chat-with-tutor', {
             messages: JSON.stringify(messages),
             learner_profile: learnerProfile,
             model_provider: modelProvider,
-            model_name: modelName
+            model_name: modelName,
+            conversation_id: conversationId
         });
     }
 
@@ -177,6 +234,19 @@ export class API {
         });
     }
 
+    // Streams sessions as they are validated: onSession(session, index) per session,
+    // resolves with the same payload as scheduleLearningPath.
+    static async scheduleLearningPathStream(learnerProfile, sessionCount, modelProvider = 'shared', modelName = 'qwen-instruct', onSession = null) {
+        return await this.postEventStream('/schedule-learning-path/stream', {
+            learner_profile: learnerProfile,
+            session_count: sessionCount,
+            model_provider: modelProvider,
+            model_name: modelName
+        }, (event, data) => {
+            if (event === 'session') onSession?.(data.session, data.index);
+        });
+    }
+
     static async rescheduleLearningPath(learnerProfile, learningPath, sessionCount, otherFeedback = null, modelProvider = 'shared', modelName = 'qwen-instruct') {
         return await this.post('/reschedule-learning-path', {
             learner_profile: learnerProfile,
@@ -242,6 +312,21 @@ export class API {
         });
     }
 
+    // Streams questions as they are validated: onQuestion(question, questionType, index) per question,
+    // resolves with the same payload as generateDocumentQuizzes.
+    static async generateDocumentQuizzesStream(learnerProfile, learningDocument, singleChoiceCount = 2, multipleChoiceCount = 2, trueFalseCount = 2, shortAnswerCount = 2, onQuestion = null) {
+        return await this.postEventStream('/generate-document-quizzes/stream', {
+            learner_profile: learnerProfile,
+            learning_document: learningDocument,
+            single_choice_count: singleChoiceCount,
+            multiple_choice_count: multipleChoiceCount,
+            true_false_count: trueFalseCount,
+            short_answer_count: shortAnswerCount
+        }, (event, data) => {
+            if (event === 'question') onQuestion?.(data.question, data.question_type, data.index);
+        });
+    }
+
     // Content Generation
     static async tailorKnowledgeContent(learningPath, learnerProfile, learningSession, useSearch = true, allowParallel = true, withQuiz = true, modelProvider = 'shared', modelName = 'qwen-instruct') {
         return await this.post('/tailor-knowledge-content', {
@@ -257,12 +342,13 @@ export class API {
     }
 
     // Socratic Tutor
-    static async assessWithSocraticTutor(learningTopic, messages, modelProvider = 'gpt-oss', modelName = 'gpt-oss-120b') {
+    static async assessWithSocraticTutor(learningTopic, messages, modelProvider = 'gpt-oss', modelName = 'gpt-oss-120b', conversationId = null) {
         return await this.post('/assess-with-socratic-tutor', {
             learning_topic: learningTopic,
             messages: JSON.stringify(messages),
             model_provider: modelProvider,
-            model_name: modelName
+            model_name: modelName,
+            conversation_id: conversationId
         });
     }
 }
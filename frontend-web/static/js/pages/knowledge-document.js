@@ -72,6 +72,8 @@ class KnowledgeDocumentPage {
         this.sidebarTab = 'tutor';
         this.tutorMessages = [];
         this.assessmentState = this._getEmptyAssessmentState();
+        // Backend conversation ids (KV cache reuse across turns), one per chat
+        this.conversationIds = new Map();
 
         this.feedbackDraft = {
             clarity: '',
@@ -1794,7 +1796,8 @@ class KnowledgeDocumentPage {
                 introContext,
                 [],
                 CHAT_MODEL_PROVIDER,
-                CHAT_MODEL_NAME
+                CHAT_MODEL_NAME,
+                this._conversationId(`coach:${questionId}`)
             );
 
             const normalizedResponse = this._normalizeTutorResponse(response);
@@ -1885,7 +1888,8 @@ class KnowledgeDocumentPage {
                 topic,
                 messages.slice(-10),
                 CHAT_MODEL_PROVIDER,
-                CHAT_MODEL_NAME
+                CHAT_MODEL_NAME,
+                this._conversationId(`coach:${questionId}`)
             );
             const normalizedResponse = this._normalizeTutorResponse(response);
             this._appendCoachMessage(questionId, { role: 'assistant', content: normalizedResponse });
@@ -1897,6 +1901,7 @@ class KnowledgeDocumentPage {
 
     _resetCoach(questionId) {
         if (!this.quizState[questionId]) return;
+        this._endConversation(`coach:${questionId}`);
         this.quizState[questionId] = {
             ...this.quizState[questionId],
             coach: {
@@ -1911,6 +1916,20 @@ class KnowledgeDocumentPage {
         this.render(this.container);
     }
 
+    // Id of one chat of this learning session; a new id starts a fresh server-side conversation
+    _conversationId(scope) {
+        const key = `${this.sessionUid || 'default'}:${scope}`;
+        if (!this.conversationIds.has(key)) {
+            const random = window.crypto?.randomUUID?.() || `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+            this.conversationIds.set(key, `${key}:${random}`);
+        }
+        return this.conversationIds.get(key);
+    }
+
+    _endConversation(scope) {
+        this.conversationIds.delete(`${this.sessionUid || 'default'}:${scope}`);
+    }
+
     /* ------------------------------------------------------------------ */
     /* Feedback Handling                                                   */
     /* ------------------------------------------------------------------ */
@@ -2000,7 +2019,8 @@ class KnowledgeDocumentPage {
                 this.tutorMessages.slice(-20),
                 JSON.stringify(this.goal?.learnerProfile || {}),
                 CHAT_MODEL_PROVIDER,
-                CHAT_MODEL_NAME
+                CHAT_MODEL_NAME,
+                this._conversationId('tutor')
             );
             const normalized = this._normalizeTutorResponse(response);
             this.tutorMessages = [...this.tutorMessages, { role: 'assistant', content: normalized }];
@@ -2030,6 +2050,7 @@ class KnowledgeDocumentPage {
             return;
         }
 
+        this._endConversation('assessment');
         this.assessmentState = this._getEmptyAssessmentState({
             topic,
             isLoading: true,
@@ -2042,7 +2063,8 @@ class KnowledgeDocumentPage {
                 topic,
                 [],
                 CHAT_MODEL_PROVIDER,
-                CHAT_MODEL_NAME
+                CHAT_MODEL_NAME,
+                this._conversationId('assessment')
             );
             const normalized = this._normalizeTutorResponse(response);
             this.assessmentState = {
@@ -2095,7 +2117,8 @@ class KnowledgeDocumentPage {
                 this.assessmentState.topic,
                 messages.slice(-10),
                 CHAT_MODEL_PROVIDER,
-                CHAT_MODEL_NAME
+                CHAT_MODEL_NAME,
+                this._conversationId('assessment')
             );
 
             const normalizedResponse = this._normalizeTutorResponse(response);
@@ -2118,6 +2141,7 @@ class KnowledgeDocumentPage {
     }
 
     _restartAssessment() {
+        this._endConversation('assessment');
         // 주제를 초기화하고 상태를 리셋
         this.assessmentState = this._getEmptyAssessmentState();
         this._persistKnowledgeState({ assessmentState: this.assessmentState });
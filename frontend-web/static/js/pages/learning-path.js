@@ -6,6 +6,7 @@ const MODEL_PROVIDER = 'shared';
 const MODEL_NAME = 'gpt-oss-120b';
 const MIN_SESSIONS = 1;
 const MAX_SESSIONS = 10;
+const ROUTE_HASH = '#/learning-path';
 
 class LearningPathPage {
     constructor() {
@@ -18,9 +19,14 @@ class LearningPathPage {
         this.rescheduleOpen = false;
         this.expectedSessions = 6;
         this.openSessions = new Set();
+        this.streaming = false;
+        this.routeToken = null;
     }
 
-    async initialize() {
+    async initialize(container = null) {
+        // Sessions are rendered as they stream in, before initialization completes
+        if (container) this.container = container;
+        this.routeToken = {};
         this.loading = true;
         this.error = null;
         this.skillDetailsOpen = false;
@@ -148,10 +154,15 @@ class LearningPathPage {
                 <section class="lp-card">
                     <div class="lp-card-header">
                         <h2>📖 Learning Sessions</h2>
+                        ${this.streaming ? '' : `
                         <button class="button outline" data-action="toggle-reschedule">
                             ${this.rescheduleOpen ? 'Close' : 'Re-schedule Learning Path'}
-                        </button>
+                        </button>`}
                     </div>
+                    ${this.streaming ? `
+                    <p class="lp-reschedule-hint">
+                        Scheduling more sessions... (${this.learningPath.length}/${this.expectedSessions})
+                    </p>` : ''}
                     ${this.rescheduleOpen ? this._renderReschedulePanel() : ''}
                     <div class="lp-session-grid">
                         ${this.learningPath.map((session, index) => this._renderSessionCard(session, index)).join('')}
@@ -202,6 +213,13 @@ class LearningPathPage {
         this.selectedGoalId = selectedGoalId || null;
     }
 
+    // The router shares its page container between pages and only updates
+    // selectedPage after initialize() resolves, so a stream that outlives a
+    // navigation is detected by the hash and by the visit that started it.
+    _isCurrentVisit(routeToken) {
+        return routeToken === this.routeToken && router.currentHash() === ROUTE_HASH;
+    }
+
     async _ensureGoalData() {
         if (!this.goal) return;
         if (!Array.isArray(this.goal.learningPath) || !this.goal.learningPath.length) {
@@ -224,12 +242,40 @@ class LearningPathPage {
 
         const normalizedCount = Math.min(MAX_SESSIONS, Math.max(MIN_SESSIONS, sessionCount || 6));
 
-        const response = await API.scheduleLearningPath(
-            JSON.stringify(learnerProfile),
-            normalizedCount,
-            MODEL_PROVIDER,
-            MODEL_NAME
-        );
+        // Show each session as soon as the scheduler has validated it; fall back to the
+        // blocking endpoint when streaming fails before any session arrived.
+        const streamedSessions = [];
+        const routeToken = this.routeToken;
+        let response;
+        try {
+            response = await API.scheduleLearningPathStream(
+                JSON.stringify(learnerProfile),
+                normalizedCount,
+                MODEL_PROVIDER,
+                MODEL_NAME,
+                (session, index) => {
+                    streamedSessions[index] = this._normalizeSession(session, index);
+                    // After navigating away the container belongs to another page
+                    if (!this._isCurrentVisit(routeToken)) return;
+                    this.learningPath = streamedSessions.filter(Boolean);
+                    this.expectedSessions = normalizedCount;
+                    this.streaming = true;
+                    this.loading = false;
+                    if (this.container) this.render(this.container);
+                }
+            );
+        } catch (error) {
+            if (streamedSessions.length) throw error;
+            console.warn('[LearningPath] Streaming schedule failed, retrying without streaming', error);
+            response = await API.scheduleLearningPath(
+                JSON.stringify(learnerProfile),
+                normalizedCount,
+                MODEL_PROVIDER,
+                MODEL_NAME
+            );
+        } finally {
+            this.streaming = false;
+        }
 
         const { sessions, raw } = this._normalizeLearningPathResponse(response);
         const normalizedSessions = sessions.map((session, index) => this._normalizeSession(session, index));
@@ -41,8 +41,12 @@ class Router {
         window.location.hash = `#/${pageName}`;
     }
 
+    currentHash() {
+        return window.location.hash || '#/onboarding';
+    }
+
     async handleRoute() {
-        const hash = window.location.hash || '#/onboarding';
+        const hash = this.currentHash();
         const pageName = hash.slice(2); // Remove '#/' from the hash
 
         // Clear current page content
@@ -64,14 +68,16 @@ class Router {
                 if (typeof pageInstance.initialize === 'function') {
                     await pageInstance.initialize();
                 }
+                if (this.currentHash() !== hash) return; // navigated away while initializing
                 if (typeof pageInstance.render === 'function') {
                     await pageInstance.render(this.pageContent);
                 }
             } else if (typeof PageModule === 'object') {
                 // If it's an object instance exported as default from module
                 if (typeof PageModule.initialize === 'function') {
-                    await PageModule.initialize();
+                    await PageModule.initialize(this.pageContent);
                 }
+                if (this.currentHash() !== hash) return; // navigated away while initializing
                 if (typeof PageModule.render === 'function') {
                     await PageModule.render(this.pageContent);
                 }